@@ -12,11 +12,45 @@ class Settings(BaseSettings):
     database_name: str = "wangfeng_fan_website"
     database_url: Optional[str] = None  # 完整数据库 URL（可选）
 
+    # 数据库连接池配置
+    # 同步引擎 pool_size + max_overflow 应不小于 FastAPI 线程池大小（40），
+    # 否则 get_db 的清理阶段会与等待连接的线程互相阻塞
+    db_pool_size: int = 20  # 同步引擎常驻连接数
+    db_max_overflow: int = 30  # 同步引擎允许临时超出的连接数
+    db_async_pool_size: int = 20  # 异步引擎常驻连接数
+    db_async_max_overflow: int = 20  # 异步引擎允许临时超出的连接数
+    db_pool_timeout: int = 30  # 获取连接的等待超时（秒）
+    db_pool_recycle: int = 3600  # 连接回收周期（秒）
+
     # JWT 配置
     secret_key: str = "super-secret-key-for-wangfeng-fan-website"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7天 = 7 * 24 * 60 = 10080 分钟
 
+    # 认证用户缓存（token subject -> 用户快照），设为 0 可关闭
+    auth_user_cache_ttl_seconds: int = 60
+    auth_user_cache_max_size: int = 1024
+
+    # 标签内容页缓存（/api/tags/by-name/{tag_name}/contents），设为 0 可关闭
+    tag_contents_cache_ttl_seconds: int = 300
+    tag_contents_cache_max_size: int = 512
+
+    # 审核统计缓存（/api/admin/reviews/statistics），审核操作时主动失效，设为 0 可关闭
+    review_stats_cache_ttl_seconds: int = 5
+
+    # 仪表盘每日汇总的定时整理间隔（秒），设为 0 只在读取时处理本进程的变更
+    dashboard_rollup_interval_seconds: int = 60
+
+    # 文章浏览次数在内存中累加后定时批量写回（秒），设为 0 每次浏览立即写回
+    article_view_flush_interval_seconds: float = 5.0
+    article_view_counter_shards: int = 16
+
+    # 投票计数在内存中累加后定时批量写回（秒），设为 0 每票立即写回；结果快照缓存，设为 0 可关闭
+    poll_vote_flush_interval_seconds: float = 1.0
+    poll_vote_counter_shards: int = 16
+    poll_snapshot_cache_ttl_seconds: float = 2.0
+    poll_snapshot_cache_max_size: int = 256
+
     # 阿里云邮件服务配置
     smtp_host: str = "smtpdm.aliyun.com"  # 阿里云DirectMail SMTP服务器
     smtp_port: int = 25  # 端口: 25, 80, 或 465(SSL)
@@ -27,6 +61,50 @@ class Settings(BaseSettings):
 
     # 存储配置
     storage_type: str = "local"  # 可选: local, minio, r2, oss
+    # 流式上传的分片大小（MB），超过一个分片的数据走 OSS 分片上传
+    storage_multipart_part_size_mb: int = 8
+    # 大文件上传器（MultipartUploader）：并行分片数 / 同时上传的文件数 / 断点文件目录
+    storage_upload_part_workers: int = 4
+    storage_upload_file_workers: int = 2
+    storage_upload_checkpoint_dir: str = "./.upload-checkpoints"
+    # 按内容哈希复用已上传的图片（image_assets 表），删除时按引用计数
+    image_dedup_enabled: bool = True
+
+    # 上传图片编码进程数（原图/中图/缩略图并发编码），设为 1 则在请求线程内串行处理
+    image_pipeline_workers: int = 3
+    # 图廊图片的中等尺寸和缩略图额外生成的格式（逗号分隔，可选 webp / avif，留空则只生成 JPEG）
+    image_alternate_formats: str = "webp"
+    # 图廊批量上传时同时处理的图片数
+    gallery_batch_upload_concurrency: int = 4
+
+    # 按需缩放图片（/img/{key}?w=&fmt=，services.image_derivatives）
+    image_derivative_widths: str = "160,320,400,480,640,800,1200,1600,2400"  # 允许的宽度（逗号分隔）
+    image_derivative_quality: int = 82
+    image_derivative_prefix: str = "derivatives"  # 衍生图写回存储时的前缀
+    image_derivative_cache_dir: str = "./.derivative-cache"  # 本地磁盘 LRU 缓存目录
+    image_derivative_cache_max_mb: int = 512
+    image_derivative_max_age_seconds: int = 30 * 86400  # 响应的 Cache-Control max-age
+    image_derivative_source_ttl_seconds: int = 60  # 源图版本（修改时间 / ETag）的缓存时间
+    image_derivative_source_cache_max_size: int = 10000
+
+    # async 路由中阻塞任务的执行器（线程数 / 最多排队的任务数，超出返回 503）
+    image_executor_workers: int = 2  # 图片压缩、解码等 CPU 任务
+    image_executor_max_pending: int = 32
+    storage_executor_workers: int = 16  # OSS / 本地磁盘等阻塞 I/O
+    storage_executor_max_pending: int = 256
+
+    # B站接口抓取（services.bilibili_fetcher）
+    bilibili_api_base: str = "https://api.bilibili.com"  # 本地联调时可指向 mock 服务
+    bilibili_requests_per_second: float = 5.0  # 全局限速（令牌桶）
+    bilibili_rate_burst: int = 5
+    bilibili_max_concurrency: int = 8
+    bilibili_max_retries: int = 3
+    bilibili_max_retry_after_seconds: float = 5.0  # Retry-After 的上限，避免一次限流挂起请求过久
+    bilibili_request_timeout_seconds: float = 10.0
+    bilibili_video_cache_ttl_seconds: int = 600
+    bilibili_video_cache_max_size: int = 1024
+    bilibili_negative_cache_ttl_seconds: int = 60  # 不存在 / 无效的BV号
+    bilibili_short_link_cache_ttl_seconds: int = 86400  # b23.tv 短链接 -> BV号
 
     # 阿里云 OSS 配置
     oss_endpoint: str = ""
@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from .security import verify_token
+from .user_cache import token_user_cache, snapshot_user, attach_cached_user
 from ..services.user_service_mysql import UserServiceMySQL
 from ..services.schedule_service_mysql import ScheduleServiceMySQL
 from ..models.user_db import User
@@ -17,6 +18,18 @@ def get_user_service(db: Session = Depends(get_db)) -> UserServiceMySQL:
     return UserServiceMySQL(db)
 
 
+def _load_user_for_token(username: str, user_service: UserServiceMySQL) -> Optional[User]:
+    """根据 token subject 获取用户，优先命中进程内缓存"""
+    snapshot = token_user_cache.get(username)
+    if snapshot is not None:
+        return attach_cached_user(user_service.db, snapshot)
+
+    user = user_service.get_user_by_username(username)
+    if user is not None:
+        token_user_cache.set(username, snapshot_user(user))
+    return user
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_service: UserServiceMySQL = Depends(get_user_service)
@@ -34,7 +47,7 @@ def get_current_user(
     if username is None:
         raise credentials_exception
 
-    user = user_service.get_user_by_username(username)
+    user = _load_user_for_token(username, user_service)
     if user is None:
         raise credentials_exception
 
@@ -67,5 +80,5 @@ def get_optional_current_user(
     if username is None:
         return None
 
-    user = user_service.get_user_by_username(username)
+    user = _load_user_for_token(username, user_service)
     return user
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+阻塞任务执行器
+
+async 路由中的阻塞操作（PIL 解码/编码、oss2 同步上传等）不能直接在事件循环里执行，
+否则一次大图上传会卡住同一 worker 上的所有请求。这里提供两个独立、有界的线程池：
+- image_executor：CPU 密集的图片处理，线程数较少
+- storage_executor：阻塞的存储 I/O（OSS / 本地磁盘），线程数较多
+
+等待中的任务数超过上限时直接返回 503，而不是无限排队；
+executor_stats() 提供队列深度、等待耗时等指标（见 /health/executors）。
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from fastapi import HTTPException
+
+from .config import get_settings
+
+T = TypeVar("T")
+
+
+class ExecutorBusyError(HTTPException):
+    """执行器排队已满"""
+
+    def __init__(self, name: str):
+        super().__init__(status_code=503, detail=f"服务器繁忙（{name} 任务排队已满），请稍后重试")
+
+
+class BoundedExecutor:
+    """有界线程池：限制同时提交的任务数，并记录运行指标"""
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0  # 已提交未完成（排队中 + 执行中）
+        self._running = 0
+        self._peak_pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在线程池中执行阻塞函数并等待结果"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise ExecutorBusyError(self.name)
+            self._pending += 1
+            self._submitted += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        enqueued_at = time.monotonic()
+
+        def task() -> T:
+            started_at = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started_at - enqueued_at
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.monotonic() - started_at
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        succeeded = False
+        try:
+            result = await loop.run_in_executor(self._executor, functools.partial(context.run, task))
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if succeeded:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """运行指标快照"""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "peak_pending": self._peak_pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds * 1000 / finished, 2) if finished else 0.0,
+                "avg_run_ms": round(self._run_seconds * 1000 / finished, 2) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_settings = get_settings()
+
+image_executor = BoundedExecutor(
+    "image",
+    max_workers=_settings.image_executor_workers,
+    max_pending=_settings.image_executor_max_pending,
+)
+storage_executor = BoundedExecutor(
+    "storage",
+    max_workers=_settings.storage_executor_workers,
+    max_pending=_settings.storage_executor_max_pending,
+)
+
+
+async def run_image_task(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """执行 CPU 密集的图片处理"""
+    return await image_executor.run(func, *args, **kwargs)
+
+
+async def run_storage_task(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """执行阻塞的存储 I/O"""
+    return await storage_executor.run(func, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        image_executor.name: image_executor.stats(),
+        storage_executor.name: storage_executor.stats(),
+    }
+
+
+def shutdown_executors() -> None:
+    image_executor.shutdown()
+    storage_executor.shutdown()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+分片内存计数器
+
+高频计数（文章浏览、投票）先在内存中累加，再由后台任务批量写回数据库。
+按 key 分片加锁，不同 key 之间互不阻塞；drain() 取出全部增量，写回失败时用 restore() 放回。
+"""
+import threading
+from typing import Dict, Hashable, List
+
+
+class ShardedCounter:
+    """按 key 分片的内存计数器"""
+
+    def __init__(self, shards: int = 16) -> None:
+        self._shards: List[Dict[Hashable, int]] = [{} for _ in range(max(1, shards))]
+        self._locks = [threading.Lock() for _ in self._shards]
+
+    def _index(self, key: Hashable) -> int:
+        return hash(key) % len(self._shards)
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """累加并返回该 key 尚未写回的增量"""
+        index = self._index(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            shard[key] = shard.get(key, 0) + count
+            return shard[key]
+
+    def pending(self, key: Hashable) -> int:
+        index = self._index(key)
+        with self._locks[index]:
+            return self._shards[index].get(key, 0)
+
+    def drain(self) -> Dict[Hashable, int]:
+        """取出全部增量并清空"""
+        drained: Dict[Hashable, int] = {}
+        for index, lock in enumerate(self._locks):
+            with lock:
+                shard, self._shards[index] = self._shards[index], {}
+            drained.update(shard)
+        return drained
+
+    def restore(self, counts: Dict[Hashable, int]) -> None:
+        """写回失败时把增量放回"""
+        for key, count in counts.items():
+            self.add(key, count)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+认证用户缓存
+
+将 JWT subject（用户名）映射到用户行数据的快照，避免每个认证请求都查询 users 表。
+- 进程内 TTL + LRU，容量有上限
+- 缓存的是列值快照而不是 ORM 实例，命中时重新挂到当前请求的会话上（不发 SELECT）
+- 封禁、改角色、改密码、停用等操作会主动失效对应条目
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from .config import get_settings
+from ..models.user_db import User
+
+
+class TokenUserCache:
+    """线程安全的 TTL/LRU 用户缓存"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60.0) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._usernames_by_id: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """获取用户快照，过期或不存在时返回 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                self._remove(username)
+                return None
+            self._entries.move_to_end(username)
+            return snapshot
+
+    def set(self, username: str, snapshot: Dict[str, Any]) -> None:
+        """写入用户快照"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remove(username)
+            self._entries[username] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._usernames_by_id[str(snapshot.get("id"))] = username
+            while len(self._entries) > self.max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                self._discard_id_mapping(oldest)
+
+    def invalidate_username(self, username: Optional[str]) -> None:
+        """按用户名失效"""
+        if not username:
+            return
+        with self._lock:
+            self._remove(username)
+
+    def invalidate_user_id(self, user_id: Any) -> None:
+        """按用户ID失效"""
+        if user_id is None:
+            return
+        with self._lock:
+            username = self._usernames_by_id.get(str(user_id))
+            if username is not None:
+                self._remove(username)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._usernames_by_id.clear()
+
+    def _remove(self, username: str) -> None:
+        if self._entries.pop(username, None) is not None:
+            self._discard_id_mapping(username)
+
+    def _discard_id_mapping(self, username: str) -> None:
+        stale_ids = [uid for uid, name in self._usernames_by_id.items() if name == username]
+        for uid in stale_ids:
+            del self._usernames_by_id[uid]
+
+
+_settings = get_settings()
+token_user_cache = TokenUserCache(
+    max_size=_settings.auth_user_cache_max_size,
+    ttl_seconds=_settings.auth_user_cache_ttl_seconds,
+)
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    """提取用户的列值快照"""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def attach_cached_user(db: Session, snapshot: Dict[str, Any]) -> User:
+    """
+    将快照还原为挂在当前会话上的 User 实例（不发出 SELECT）
+
+    还原后的实例与正常查询得到的实例行为一致，路由中修改并 commit 也会正常写回。
+    """
+    existing = db.identity_map.get(inspect(User).identity_key_from_primary_key((snapshot["id"],)))
+    if existing is not None:
+        return existing
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def invalidate_cached_user(user: Optional[User] = None, *, user_id: Any = None) -> None:
+    """用户数据变更后调用，失效缓存"""
+    if user is not None:
+        token_user_cache.invalidate_username(user.username)
+        token_user_cache.invalidate_user_id(user.id)
+    if user_id is not None:
+        token_user_cache.invalidate_user_id(user_id)
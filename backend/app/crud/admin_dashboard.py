@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
-"""仪表盘统计数据CRUD操作"""
+"""
+仪表盘统计数据CRUD操作
+
+统计数据从每日汇总表 daily_stats 读取（维护方式见 services/dashboard_rollup），
+读取代价与用户表、文章表的大小无关。
+"""
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func
 from typing import List, Dict
 from datetime import datetime, timedelta
 
-from ..models.user_db import User
-from ..models.article import Article, ReviewStatus
-from ..models.schedule_db import Schedule
+from ..models.article import ReviewStatus
+from ..models.daily_stat import DailyStat
+from ..services.dashboard_rollup import (
+    METRIC_ARTICLES,
+    METRIC_SCHEDULES,
+    METRIC_USERS,
+    flush_pending_rollups,
+)
 
 
 def get_dashboard_stats(db: Session) -> Dict:
@@ -17,48 +27,49 @@ def get_dashboard_stats(db: Session) -> Dict:
     Returns:
         包含各种统计数据的字典
     """
-    now = datetime.utcnow()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    flush_pending_rollups(db)
+
+    today_start = datetime.utcnow().date()
     week_start = today_start - timedelta(days=7)
     month_start = today_start - timedelta(days=30)
 
-    # 总数统计
-    total_users = db.query(User).count()
-    total_articles = db.query(Article).filter(Article.is_deleted == False).count()
-    total_schedules = db.query(Schedule).count()
-
-    # 待审核文章数量
-    pending_articles = db.query(Article).filter(
-        Article.is_deleted == False,
-        Article.review_status == ReviewStatus.PENDING
-    ).count()
-
-    # 今日新增
-    today_new_users = db.query(User).filter(User.created_at >= today_start).count()
-    today_new_articles = db.query(Article).filter(
-        Article.created_at >= today_start,
-        Article.is_deleted == False
-    ).count()
-
-    # 本周新增
-    week_new_users = db.query(User).filter(User.created_at >= week_start).count()
-    week_new_articles = db.query(Article).filter(
-        Article.created_at >= week_start,
-        Article.is_deleted == False
-    ).count()
-
-    # 本月新增
-    month_new_users = db.query(User).filter(User.created_at >= month_start).count()
-    month_new_articles = db.query(Article).filter(
-        Article.created_at >= month_start,
-        Article.is_deleted == False
-    ).count()
+    # 总数统计（文章按审核状态拆分，顺带得到待审核数量）
+    totals = {METRIC_USERS: 0, METRIC_ARTICLES: 0, METRIC_SCHEDULES: 0}
+    pending_articles = 0
+    for metric, status, count in db.query(
+        DailyStat.metric,
+        DailyStat.review_status,
+        func.sum(DailyStat.count),
+    ).group_by(DailyStat.metric, DailyStat.review_status).all():
+        count = int(count or 0)
+        totals[metric] = totals.get(metric, 0) + count
+        if metric == METRIC_ARTICLES and status == ReviewStatus.PENDING.value:
+            pending_articles += count
+
+    # 今日 / 本周 / 本月新增
+    def _since(start):
+        return func.sum(case((DailyStat.stat_date >= start, DailyStat.count), else_=0))
+
+    recent = {
+        metric: (int(today or 0), int(week or 0), int(month or 0))
+        for metric, today, week, month in db.query(
+            DailyStat.metric,
+            _since(today_start),
+            _since(week_start),
+            _since(month_start),
+        ).filter(
+            DailyStat.metric.in_([METRIC_USERS, METRIC_ARTICLES]),
+            DailyStat.stat_date >= month_start,
+        ).group_by(DailyStat.metric).all()
+    }
+    today_new_users, week_new_users, month_new_users = recent.get(METRIC_USERS, (0, 0, 0))
+    today_new_articles, week_new_articles, month_new_articles = recent.get(METRIC_ARTICLES, (0, 0, 0))
 
     return {
-        "total_users": total_users,
-        "total_articles": total_articles,
+        "total_users": totals[METRIC_USERS],
+        "total_articles": totals[METRIC_ARTICLES],
         "total_comments": 0,  # MongoDB评论数据，需要单独查询
-        "total_schedules": total_schedules,
+        "total_schedules": totals[METRIC_SCHEDULES],
         "pending_articles": pending_articles,
         "today_new_users": today_new_users,
         "today_new_articles": today_new_articles,
@@ -83,17 +94,17 @@ def get_user_growth_data(db: Session, days: int = 30) -> List[Dict]:
     Returns:
         用户增长数据列表
     """
-    start_date = datetime.utcnow() - timedelta(days=days)
+    flush_pending_rollups(db)
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
 
-    # 按日期分组统计
     results = db.query(
-        func.date(User.created_at).label('date'),
-        func.count(User.id).label('count')
+        DailyStat.stat_date.label('date'),
+        DailyStat.count.label('count')
     ).filter(
-        User.created_at >= start_date
-    ).group_by(
-        func.date(User.created_at)
-    ).order_by('date').all()
+        DailyStat.metric == METRIC_USERS,
+        DailyStat.stat_date >= start_date,
+        DailyStat.count > 0
+    ).order_by(DailyStat.stat_date).all()
 
     return [{"date": str(row.date), "count": row.count} for row in results]
 
@@ -105,16 +116,18 @@ def get_article_stats_by_category(db: Session) -> List[Dict]:
     Returns:
         文章分类统计数据
     """
+    flush_pending_rollups(db)
     results = db.query(
-        Article.category_primary.label('category'),
-        func.count(Article.id).label('count')
+        DailyStat.category.label('category'),
+        func.sum(DailyStat.count).label('count')
     ).filter(
-        Article.is_deleted == False
+        DailyStat.metric == METRIC_ARTICLES
     ).group_by(
-        Article.category_primary
+        DailyStat.category
     ).all()
 
-    return [{"category": row.category, "count": row.count} for row in results]
+    # 汇总表中未分类存为空字符串
+    return [{"category": row.category or None, "count": int(row.count)} for row in results]
 
 
 def get_article_stats_by_status(db: Session) -> Dict[str, int]:
@@ -124,13 +137,14 @@ def get_article_stats_by_status(db: Session) -> Dict[str, int]:
     Returns:
         文章状态统计数据
     """
+    flush_pending_rollups(db)
     results = db.query(
-        Article.review_status.label('status'),
-        func.count(Article.id).label('count')
+        DailyStat.review_status.label('status'),
+        func.sum(DailyStat.count).label('count')
     ).filter(
-        Article.is_deleted == False
+        DailyStat.metric == METRIC_ARTICLES
     ).group_by(
-        Article.review_status
+        DailyStat.review_status
     ).all()
 
-    return {row.status.value: row.count for row in results}
+    return {row.status: int(row.count) for row in results}
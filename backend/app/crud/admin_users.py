@@ -6,6 +6,7 @@ from datetime import datetime
 
 from ..models.user_db import User, UserStatus
 from ..models.roles import UserRole
+from ..core.user_cache import invalidate_cached_user
 
 
 def get_users(
@@ -92,6 +93,7 @@ def update_user_role(db: Session, user_id: str, new_role: UserRole) -> Optional[
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user)
     return user
 
 
@@ -116,6 +118,7 @@ def ban_user(db: Session, user_id: str) -> Optional[User]:
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user)
     return user
 
 
@@ -140,6 +143,7 @@ def unban_user(db: Session, user_id: str) -> Optional[User]:
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user)
     return user
 
 
@@ -164,6 +168,7 @@ def activate_user(db: Session, user_id: str) -> Optional[User]:
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user)
     return user
 
 
@@ -188,6 +193,7 @@ def deactivate_user(db: Session, user_id: str) -> Optional[User]:
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user)
     return user
 
 
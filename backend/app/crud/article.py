@@ -1,3 +1,5 @@
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.article import Article
 from app.schemas.article import ArticleCreate, ArticleUpdate
@@ -7,6 +9,8 @@ from slugify import slugify
 import uuid
 
 from app.utils.article_cover import resolve_article_cover
+from app.services import article_search, view_counter
+from app.schemas.article import ArticleSearchResult
 
 def create_article(db: Session, article: ArticleCreate) -> Article:
     # 生成唯一ID和slug
@@ -58,17 +62,61 @@ def create_article(db: Session, article: ArticleCreate) -> Article:
     db.refresh(db_article)
     return db_article
 
-def get_article(db: Session, article_id: str) -> Optional[Article]:
-    return db.query(Article).filter(
+# ========== 只读查询（同步与异步路由共用同一条语句） ==========
+
+def _article_by_id_stmt(article_id: str) -> Select:
+    return select(Article).where(
         Article.id == article_id,
         Article.is_deleted == False
-    ).first()
+    )
 
-def get_article_by_slug(db: Session, slug: str) -> Optional[Article]:
-    return db.query(Article).filter(
+def _article_by_slug_stmt(slug: str) -> Select:
+    return select(Article).where(
         Article.slug == slug,
         Article.is_deleted == False
-    ).first()
+    )
+
+def _articles_stmt(
+    skip: int,
+    limit: int,
+    category: Optional[str],
+    published_only: bool
+) -> Select:
+    stmt = select(Article).where(Article.is_deleted == False)
+
+    if published_only:
+        stmt = stmt.where(
+            Article.is_published == True,
+            Article.review_status == 'approved'
+        )
+
+    if category:
+        stmt = stmt.where(Article.category == category)
+
+    return stmt.order_by(Article.published_at.desc()).offset(skip).limit(limit)
+
+def _article_count_stmt(category: Optional[str]) -> Select:
+    stmt = select(func.count(Article.id)).where(
+        Article.is_deleted == False,
+        Article.is_published == True
+    )
+
+    if category:
+        stmt = stmt.where(Article.category == category)
+
+    return stmt
+
+def _categories_stmt() -> Select:
+    return select(Article.category).where(
+        Article.is_deleted == False,
+        Article.is_published == True
+    ).distinct()
+
+def get_article(db: Session, article_id: str) -> Optional[Article]:
+    return db.scalars(_article_by_id_stmt(article_id)).first()
+
+def get_article_by_slug(db: Session, slug: str) -> Optional[Article]:
+    return db.scalars(_article_by_slug_stmt(slug)).first()
 
 def get_articles(
     db: Session, 
@@ -77,30 +125,45 @@ def get_articles(
     category: Optional[str] = None,
     published_only: bool = True
 ) -> List[Article]:
-    query = db.query(Article).filter(Article.is_deleted == False)
-
-    if published_only:
-        query = query.filter(
-            Article.is_published == True,
-            Article.review_status == 'approved'
-        )
-    
-    if category:
-        query = query.filter(Article.category == category)
-    
-    return query.order_by(Article.published_at.desc()).offset(skip).limit(limit).all()
+    return db.scalars(_articles_stmt(skip, limit, category, published_only)).all()
 
 def search_articles(
     db: Session,
     query_text: str,
     skip: int = 0,
     limit: int = 50
+) -> List[ArticleSearchResult]:
+    return article_search.search_articles(db, query_text, skip=skip, limit=limit)
+
+async def get_article_async(db: AsyncSession, article_id: str) -> Optional[Article]:
+    return (await db.scalars(_article_by_id_stmt(article_id))).first()
+
+async def get_article_by_slug_async(db: AsyncSession, slug: str) -> Optional[Article]:
+    return (await db.scalars(_article_by_slug_stmt(slug))).first()
+
+async def get_articles_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 50,
+    category: Optional[str] = None,
+    published_only: bool = True
 ) -> List[Article]:
-    return db.query(Article).filter(
-        Article.is_deleted == False,
-        Article.is_published == True,
-        Article.title.contains(query_text) | Article.content.contains(query_text)
-    ).order_by(Article.published_at.desc()).offset(skip).limit(limit).all()
+    return (await db.scalars(_articles_stmt(skip, limit, category, published_only))).all()
+
+async def search_articles_async(
+    db: AsyncSession,
+    query_text: str,
+    skip: int = 0,
+    limit: int = 50
+) -> List[ArticleSearchResult]:
+    return await article_search.search_articles_async(db, query_text, skip=skip, limit=limit)
+
+async def get_article_count_async(db: AsyncSession, category: Optional[str] = None) -> int:
+    return (await db.scalar(_article_count_stmt(category))) or 0
+
+async def get_categories_async(db: AsyncSession) -> List[str]:
+    categories = (await db.execute(_categories_stmt())).all()
+    return [cat[0] for cat in categories if cat[0]]
 
 def update_article(db: Session, article_id: str, article_update: ArticleUpdate) -> Optional[Article]:
     db_article = get_article(db, article_id)
@@ -142,31 +205,15 @@ def delete_article(db: Session, article_id: str) -> bool:
     db.commit()
     return True
 
-def increase_view_count(db: Session, article_id: str) -> Optional[Article]:
-    db_article = get_article(db, article_id)
-    if db_article:
-        db_article.view_count += 1
-        db.commit()
-        db.refresh(db_article)
-    return db_article
+def increase_view_count(db: Session, article_id: str) -> Optional[int]:
+    """记录一次浏览（内存累加、定时批量写回），返回当前浏览次数；文章不存在时返回 None"""
+    return view_counter.record_view(db, article_id)
 
 def get_article_count(db: Session, category: Optional[str] = None) -> int:
-    query = db.query(Article).filter(
-        Article.is_deleted == False,
-        Article.is_published == True
-    )
-    
-    if category:
-        query = query.filter(Article.category == category)
-    
-    return query.count()
+    return db.scalar(_article_count_stmt(category)) or 0
 
 def get_categories(db: Session) -> List[str]:
-    categories = db.query(Article.category).filter(
-        Article.is_deleted == False,
-        Article.is_published == True
-    ).distinct().all()
-
+    categories = db.execute(_categories_stmt()).all()
     return [cat[0] for cat in categories if cat[0]]
 
 def get_articles_by_author(
@@ -1,26 +1,71 @@
 # -*- coding: utf-8 -*-
 """图片画廊 CRUD 操作"""
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 import uuid
 from datetime import datetime
 
 from ..models.gallery_db import PhotoGroup, Photo
+from ..models.image_asset import ImageAsset
+from ..models.user_db import User
 from ..schemas.gallery import (
     PhotoGroupCreate,
     PhotoGroupUpdate,
     PhotoCreate,
     PhotoUpdate
 )
+from ..services.image_dedup import KIND_VARIANTS
+
+# 替代格式字段 -> image_assets 中的名称（照片有中等尺寸和缩略图，照片组封面只有缩略图）
+_PHOTO_ALTERNATE_FIELDS = {
+    f"image_{name}_url": name for name in ("thumb_webp", "medium_webp", "thumb_avif", "medium_avif")
+}
+_COVER_ALTERNATE_FIELDS = {
+    "cover_image_thumb_webp_url": "thumb_webp",
+    "cover_image_thumb_avif_url": "thumb_avif",
+}
+
+
+def _alternates_by_thumb_url(db: Session, thumb_urls: Iterable[Optional[str]]) -> Dict[str, Dict[str, str]]:
+    """按缩略图URL一次查出上传时生成的替代格式URL"""
+    thumb_urls = {url for url in thumb_urls if url}
+    if not thumb_urls:
+        return {}
+    assets = db.query(ImageAsset).filter(
+        ImageAsset.kind == KIND_VARIANTS,
+        ImageAsset.thumb_url.in_(thumb_urls),
+        ImageAsset.alternate_urls.isnot(None)
+    ).all()
+    return {asset.thumb_url: asset.alternates for asset in assets}
+
+
+def _fill_alternates(
+    db: Session,
+    rows: List[dict],
+    thumb_field: str,
+    fields: Dict[str, str]
+) -> List[dict]:
+    """补全请求中未提供的替代格式URL（旧版前端只提交 JPEG 地址）"""
+    missing = [row for row in rows if any(not row.get(field) for field in fields)]
+    alternates_by_thumb = _alternates_by_thumb_url(db, (row.get(thumb_field) for row in missing))
+    for row in missing:
+        alternates = alternates_by_thumb.get(row.get(thumb_field)) or {}
+        for field, name in fields.items():
+            if not row.get(field) and alternates.get(name):
+                row[field] = alternates[name]
+    return rows
 
 
 # ========== PhotoGroup CRUD ==========
 
 def create_photo_group(db: Session, photo_group: PhotoGroupCreate) -> PhotoGroup:
     """创建照片组"""
+    [data] = _fill_alternates(db, [photo_group.model_dump()], "cover_image_thumb_url", _COVER_ALTERNATE_FIELDS)
     db_photo_group = PhotoGroup(
         id=str(uuid.uuid4()),
-        **photo_group.model_dump()
+        **data
     )
     db.add(db_photo_group)
     db.commit()
@@ -28,37 +73,66 @@ def create_photo_group(db: Session, photo_group: PhotoGroupCreate) -> PhotoGroup
     return db_photo_group
 
 
-def get_photo_group(db: Session, photo_group_id: str) -> Optional[PhotoGroup]:
-    """获取单个照片组"""
-    return db.query(PhotoGroup).filter(
+def _photo_group_by_id_stmt(photo_group_id: str) -> Select:
+    return select(PhotoGroup).where(
         PhotoGroup.id == photo_group_id,
         PhotoGroup.is_deleted == False
-    ).first()
+    )
 
 
-def get_photo_groups(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
-    category: Optional[str] = None,
-    published_only: bool = True
-) -> List[PhotoGroup]:
-    """获取照片组列表（只返回云端存储，过滤掉 legacy）"""
-    query = db.query(PhotoGroup).filter(
+def _photo_groups_stmt(
+    skip: int,
+    limit: int,
+    category: Optional[str],
+    published_only: bool
+) -> Select:
+    stmt = select(PhotoGroup).where(
         PhotoGroup.is_deleted == False,
         PhotoGroup.storage_type != 'legacy'  # 只返回云端存储的照片组
     )
 
     if published_only:
-        query = query.filter(
+        stmt = stmt.where(
             PhotoGroup.is_published == True,
             PhotoGroup.review_status == 'approved'
         )
 
     if category:
-        query = query.filter(PhotoGroup.category == category)
+        stmt = stmt.where(PhotoGroup.category == category)
+
+    return stmt.order_by(PhotoGroup.date.desc()).offset(skip).limit(limit)
+
+
+def get_photo_group(db: Session, photo_group_id: str) -> Optional[PhotoGroup]:
+    """获取单个照片组"""
+    return db.scalars(_photo_group_by_id_stmt(photo_group_id)).first()
 
-    return query.order_by(PhotoGroup.date.desc()).offset(skip).limit(limit).all()
+
+def get_photo_groups(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    published_only: bool = True
+) -> List[PhotoGroup]:
+    """获取照片组列表（只返回云端存储，过滤掉 legacy）"""
+    return db.scalars(_photo_groups_stmt(skip, limit, category, published_only)).all()
+
+
+async def get_photo_group_async(db: AsyncSession, photo_group_id: str) -> Optional[PhotoGroup]:
+    """获取单个照片组（异步）"""
+    return (await db.scalars(_photo_group_by_id_stmt(photo_group_id))).first()
+
+
+async def get_photo_groups_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    published_only: bool = True
+) -> List[PhotoGroup]:
+    """获取照片组列表（异步）"""
+    return (await db.scalars(_photo_groups_stmt(skip, limit, category, published_only))).all()
 
 
 def update_photo_group(
@@ -93,33 +167,47 @@ def delete_photo_group(db: Session, photo_group_id: str) -> bool:
     return True
 
 
-def get_photo_group_count(
-    db: Session,
-    category: Optional[str] = None,
-    published_only: bool = True
-) -> int:
-    """获取照片组总数（只计算云端存储，过滤掉 legacy）"""
-    query = db.query(PhotoGroup).filter(
+def _photo_group_count_stmt(category: Optional[str], published_only: bool) -> Select:
+    stmt = select(func.count(PhotoGroup.id)).where(
         PhotoGroup.is_deleted == False,
         PhotoGroup.storage_type != 'legacy'  # 只计算云端存储的照片组
     )
 
     if published_only:
-        query = query.filter(PhotoGroup.is_published == True)
+        stmt = stmt.where(PhotoGroup.is_published == True)
 
     if category:
-        query = query.filter(PhotoGroup.category == category)
+        stmt = stmt.where(PhotoGroup.category == category)
+
+    return stmt
+
+
+def get_photo_group_count(
+    db: Session,
+    category: Optional[str] = None,
+    published_only: bool = True
+) -> int:
+    """获取照片组总数（只计算云端存储，过滤掉 legacy）"""
+    return db.scalar(_photo_group_count_stmt(category, published_only)) or 0
 
-    return query.count()
+
+async def get_photo_group_count_async(
+    db: AsyncSession,
+    category: Optional[str] = None,
+    published_only: bool = True
+) -> int:
+    """获取照片组总数（异步）"""
+    return (await db.scalar(_photo_group_count_stmt(category, published_only))) or 0
 
 
 # ========== Photo CRUD ==========
 
 def create_photo(db: Session, photo: PhotoCreate) -> Photo:
     """创建照片"""
+    [data] = _fill_alternates(db, [photo.model_dump()], "image_thumb_url", _PHOTO_ALTERNATE_FIELDS)
     db_photo = Photo(
         id=str(uuid.uuid4()),
-        **photo.model_dump()
+        **data
     )
     db.add(db_photo)
     db.commit()
@@ -135,6 +223,13 @@ def get_photo(db: Session, photo_id: str) -> Optional[Photo]:
     ).first()
 
 
+def _photos_by_group_stmt(photo_group_id: str, skip: int, limit: int) -> Select:
+    return select(Photo).where(
+        Photo.photo_group_id == photo_group_id,
+        Photo.is_deleted == False
+    ).order_by(Photo.sort_order.asc(), Photo.created_at.asc()).offset(skip).limit(limit)
+
+
 def get_photos_by_group(
     db: Session,
     photo_group_id: str,
@@ -142,10 +237,17 @@ def get_photos_by_group(
     limit: int = 100
 ) -> List[Photo]:
     """获取照片组的所有照片"""
-    return db.query(Photo).filter(
-        Photo.photo_group_id == photo_group_id,
-        Photo.is_deleted == False
-    ).order_by(Photo.sort_order.asc(), Photo.created_at.asc()).offset(skip).limit(limit).all()
+    return db.scalars(_photos_by_group_stmt(photo_group_id, skip, limit)).all()
+
+
+async def get_photos_by_group_async(
+    db: AsyncSession,
+    photo_group_id: str,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Photo]:
+    """获取照片组的所有照片（异步）"""
+    return (await db.scalars(_photos_by_group_stmt(photo_group_id, skip, limit))).all()
 
 
 def update_photo(
@@ -183,10 +285,11 @@ def delete_photo(db: Session, photo_id: str) -> bool:
 def batch_create_photos(db: Session, photos: List[PhotoCreate]) -> List[Photo]:
     """批量创建照片"""
     db_photos = []
-    for photo in photos:
+    rows = _fill_alternates(db, [photo.model_dump() for photo in photos], "image_thumb_url", _PHOTO_ALTERNATE_FIELDS)
+    for data in rows:
         db_photo = Photo(
             id=str(uuid.uuid4()),
-            **photo.model_dump()
+            **data
         )
         db_photos.append(db_photo)
 
@@ -235,3 +338,30 @@ def get_all_photo_groups_admin(
         query = query.filter(PhotoGroup.review_status == review_status)
 
     return query.order_by(PhotoGroup.updated_at.desc()).offset(skip).limit(limit).all()
+
+
+def get_photo_counts_by_group(db: Session, photo_group_ids: Iterable[str]) -> Dict[str, int]:
+    """批量统计多个照片组的照片数量（一次 GROUP BY 查询）"""
+    ids = list(set(photo_group_ids))
+    if not ids:
+        return {}
+
+    rows = db.execute(
+        select(Photo.photo_group_id, func.count(Photo.id))
+        .where(
+            Photo.photo_group_id.in_(ids),
+            Photo.is_deleted == False
+        )
+        .group_by(Photo.photo_group_id)
+    ).all()
+    return {group_id: count for group_id, count in rows}
+
+
+def get_usernames_by_ids(db: Session, user_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+    """批量获取用户名（一次 IN 查询），返回 {用户ID字符串: 用户名}"""
+    ids = {int(user_id) for user_id in user_ids if user_id and str(user_id).isdigit()}
+    if not ids:
+        return {}
+
+    rows = db.execute(select(User.id, User.username).where(User.id.in_(ids))).all()
+    return {str(user_id): username for user_id, username in rows}
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import uuid4
@@ -8,9 +10,30 @@ from ..models.video import Video as VideoModel
 from ..schemas.video import VideoCreate, VideoUpdate
 
 
+def _video_by_id_stmt(video_id: str) -> Select:
+    return select(VideoModel).where(VideoModel.id == video_id)
+
+
+def _public_videos_stmt(skip: int, limit: int, category: Optional[str]) -> Select:
+    stmt = select(VideoModel).where(
+        VideoModel.review_status == 'approved',
+        VideoModel.is_published == True
+    )
+    if category:
+        stmt = stmt.where(VideoModel.category == category)
+    return stmt.order_by(VideoModel.created_at.desc()).offset(skip).limit(limit)
+
+
+def _videos_count_stmt(category: Optional[str]) -> Select:
+    stmt = select(func.count(VideoModel.id))
+    if category:
+        stmt = stmt.where(VideoModel.category == category)
+    return stmt
+
+
 def get_video(db: Session, video_id: str) -> Optional[VideoModel]:
     """根据ID获取视频"""
-    return db.query(VideoModel).filter(VideoModel.id == video_id).first()
+    return db.scalars(_video_by_id_stmt(video_id)).first()
 
 
 def get_videos(
@@ -20,21 +43,32 @@ def get_videos(
     category: Optional[str] = None
 ) -> List[VideoModel]:
     """获取视频列表（公开接口，只返回已审核通过且已发布的视频）"""
-    query = db.query(VideoModel).filter(
-        VideoModel.review_status == 'approved',
-        VideoModel.is_published == True
-    )
-    if category:
-        query = query.filter(VideoModel.category == category)
-    return query.order_by(VideoModel.created_at.desc()).offset(skip).limit(limit).all()
+    return db.scalars(_public_videos_stmt(skip, limit, category)).all()
 
 
 def get_videos_count(db: Session, category: Optional[str] = None) -> int:
     """获取视频总数"""
-    query = db.query(VideoModel)
-    if category:
-        query = query.filter(VideoModel.category == category)
-    return query.count()
+    return db.scalar(_videos_count_stmt(category)) or 0
+
+
+async def get_video_async(db: AsyncSession, video_id: str) -> Optional[VideoModel]:
+    """根据ID获取视频（异步）"""
+    return (await db.scalars(_video_by_id_stmt(video_id))).first()
+
+
+async def get_videos_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None
+) -> List[VideoModel]:
+    """获取视频列表（异步，公开接口）"""
+    return (await db.scalars(_public_videos_stmt(skip, limit, category))).all()
+
+
+async def get_videos_count_async(db: AsyncSession, category: Optional[str] = None) -> int:
+    """获取视频总数（异步）"""
+    return (await db.scalar(_videos_count_stmt(category))) or 0
 
 
 def create_video(db: Session, video: VideoCreate, author_id: str) -> VideoModel:
@@ -1,8 +1,13 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+from .core.config import get_settings
+
+settings = get_settings()
+
 # MySQL 数据库配置
 DATABASE_USER = os.getenv("DATABASE_USER", "root")
 DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD", "123456")
@@ -12,18 +17,42 @@ DATABASE_NAME = os.getenv("DATABASE_NAME", "wangfeng_fan_website")
 
 # 构建 MySQL 连接字符串
 SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}?charset=utf8mb4"
+# 异步驱动（aiomysql）连接字符串
+ASYNC_SQLALCHEMY_DATABASE_URL = f"mysql+aiomysql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}?charset=utf8mb4"
 
 # 创建数据库引擎
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
     pool_pre_ping=True,  # 自动检查连接是否有效
-    pool_recycle=3600,   # 每小时回收连接
+    pool_recycle=settings.db_pool_recycle,   # 定期回收连接（默认每小时）
     echo=False           # 不打印 SQL 语句（生产环境设为 False）
 )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎：供高频只读路由使用，并发上限由连接池决定，而不是线程池
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.db_async_pool_size,
+    max_overflow=settings.db_async_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    echo=False
+)
+
+# 异步会话工厂（expire_on_commit=False，避免序列化时触发隐式 IO）
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # 创建基类
 Base = declarative_base()
 
@@ -33,4 +62,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# 依赖项：获取异步数据库会话
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
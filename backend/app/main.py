@@ -4,7 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import asyncio
 
-from .routers import auth, articles, schedules, admin, verification, profile, upload, videos, tags, gallery, games, reviews, content_workflow, article_upload
+from .routers import auth, articles, schedules, admin, verification, profile, upload, videos, tags, gallery, games, reviews, content_workflow, article_upload, images
 from .models.article import Base as ArticleBase
 from .models.user_db import Base as UserBase
 from .models.admin_log import Base as AdminLogBase
@@ -14,7 +14,18 @@ from .models.video import Base as VideoBase
 from .models.tag_db import Base as TagBase
 from .models.gallery_db import Base as GalleryBase
 from .models.game import Base as GameBase
-from .database import engine
+from .models.image_asset import Base as ImageAssetBase
+from .models.daily_stat import Base as DailyStatBase
+from .database import engine, async_engine, SessionLocal
+from .services.schedule_service_mysql import ScheduleServiceMySQL
+from .services.image_processing import shutdown_image_pool
+from .services.bilibili_fetcher import close_bilibili_fetcher
+from .services.dashboard_rollup import start_rollup_compactor, stop_rollup_compactor
+from .services.view_counter import start_view_counter, stop_view_counter
+from .services.poll_votes import poll_snapshot_cache, start_poll_vote_flusher, stop_poll_vote_flusher
+from .services.review_stats import review_stats_cache
+from .services.tag_content_resolver import tag_contents_cache
+from .core.executors import executor_stats, shutdown_executors
 
 # 创建所有数据库表
 ArticleBase.metadata.create_all(bind=engine)
@@ -26,6 +37,8 @@ VideoBase.metadata.create_all(bind=engine)
 TagBase.metadata.create_all(bind=engine)
 GalleryBase.metadata.create_all(bind=engine)
 GameBase.metadata.create_all(bind=engine)
+ImageAssetBase.metadata.create_all(bind=engine)
+DailyStatBase.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="汪峰粉丝网站 API",
@@ -61,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 审核队列分页游标
 )
 
 # 注册路由
@@ -78,6 +92,77 @@ app.include_router(gallery.router)  # 图片画廊路由
 app.include_router(games.router)  # 游戏和投票路由
 app.include_router(reviews.router)  # 审核路由
 app.include_router(content_workflow.router)  # 内容工作流路由（权限感知版本）
+app.include_router(images.router)  # 按需缩放图片路由
+
+
+@app.on_event("startup")
+def normalize_schedules_on_startup():
+    """启动时一次性归一化历史行程的审核/发布状态"""
+    db = SessionLocal()
+    try:
+        updated = ScheduleServiceMySQL.normalize_existing_entries(db)
+        if updated:
+            print(f"✅ 已将 {updated} 条历史行程标记为已审核/已发布")
+    except Exception as exc:
+        db.rollback()
+        print(f"⚠️ 行程状态归一化失败: {exc}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_dashboard_rollups():
+    """补建仪表盘每日汇总并启动定时整理"""
+    await start_rollup_compactor()
+
+
+@app.on_event("startup")
+async def start_article_view_counter():
+    """启动浏览次数定时写回"""
+    start_view_counter()
+
+
+@app.on_event("shutdown")
+async def flush_article_view_counter():
+    """写回尚未落库的浏览次数"""
+    await stop_view_counter()
+
+
+@app.on_event("startup")
+async def start_poll_votes():
+    """启动投票计数定时写回"""
+    start_poll_vote_flusher()
+
+
+@app.on_event("shutdown")
+async def flush_poll_votes():
+    """写回尚未落库的投票计数"""
+    await stop_poll_vote_flusher()
+
+
+@app.on_event("shutdown")
+async def stop_dashboard_rollups():
+    """停止定时整理，写入尚未处理的汇总变更"""
+    await stop_rollup_compactor()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """关闭异步连接池"""
+    await async_engine.dispose()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """关闭B站抓取器的 HTTP 连接池"""
+    await close_bilibili_fetcher()
+
+
+@app.on_event("shutdown")
+def shutdown_image_workers():
+    """关闭图片编码进程池和阻塞任务执行器"""
+    shutdown_image_pool()
+    shutdown_executors()
 
 
 @app.get("/")
@@ -88,3 +173,19 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/executors")
+async def executor_health():
+    """阻塞任务执行器指标（运行中任务数、队列深度、平均等待耗时等）"""
+    return executor_stats()
+
+
+@app.get("/health/caches")
+async def cache_health():
+    """进程内读缓存的命中统计"""
+    return {
+        "review_statistics": review_stats_cache.stats(),
+        "tag_contents": tag_contents_cache.stats(),
+        "poll_snapshots": poll_snapshot_cache.stats(),
+    }
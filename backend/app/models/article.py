@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -69,5 +69,14 @@ class Article(Base):
     # 统计字段
     view_count = Column(Integer, default=0)
 
+    # 全文索引（MySQL ngram 分词，支持中文检索）与审核队列索引
+    __table_args__ = (
+        Index('ft_articles_title', 'title', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        Index('ft_articles_title_content', 'title', 'content', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        # 审核队列（按状态筛选、按创建时间倒序的键集分页）
+        Index('ix_articles_review_status_created_at', 'review_status', 'created_at'),
+        Index('ix_articles_created_at', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<Article(title='{self.title}', slug='{self.slug}', status='{self.review_status}')>"
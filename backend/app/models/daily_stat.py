@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""仪表盘每日汇总：按天预先统计的新增用户 / 文章 / 行程数量"""
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, UniqueConstraint
+
+from ..database import Base
+
+
+class DailyStat(Base):
+    """
+    每日计数汇总
+
+    每行是某一天（按创建时间 UTC 日期）某个指标在某个维度组合下的数量：
+    - users：当天注册的用户
+    - articles：当天创建且未删除的文章，按一级分类和审核状态拆分
+    - schedules：当天创建的行程
+    不拆分的维度存空字符串。行由 services/dashboard_rollup 按天整体重算，
+    源数据修改（如文章审核、删除）后对应日期的行会被重写。
+    """
+    __tablename__ = "daily_stats"
+    __table_args__ = (
+        UniqueConstraint('stat_date', 'metric', 'category', 'review_status', name='uq_daily_stats_key'),
+        Index('ix_daily_stats_metric_date', 'metric', 'stat_date'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    stat_date = Column(Date, nullable=False, comment='统计日期（UTC）')
+    metric = Column(String(20), nullable=False, comment='指标：users / articles / schedules')
+    category = Column(String(50), nullable=False, default='', comment='文章一级分类')
+    review_status = Column(String(20), nullable=False, default='', comment='文章审核状态')
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """图片画廊数据库模型"""
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, Index
 from datetime import datetime
 import enum
 
@@ -30,6 +30,8 @@ class PhotoGroup(Base):
     # 封面图片信息
     cover_image_url = Column(String(500))  # 封面图片完整URL（原图）
     cover_image_thumb_url = Column(String(500))  # 封面图片缩略图URL
+    cover_image_thumb_webp_url = Column(String(500), nullable=True)  # 封面缩略图 WebP 版本
+    cover_image_thumb_avif_url = Column(String(500), nullable=True)  # 封面缩略图 AVIF 版本
 
     # 存储相关
     storage_type = Column(String(20), default="oss")  # local, oss, r2, minio (默认oss)
@@ -48,6 +50,12 @@ class PhotoGroup(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # 审核队列（按状态筛选、按创建时间倒序的键集分页）
+    __table_args__ = (
+        Index('ix_photo_groups_review_status_created_at', 'review_status', 'created_at'),
+        Index('ix_photo_groups_created_at', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<PhotoGroup(title='{self.title}', category='{self.category}')>"
 
@@ -68,6 +76,11 @@ class Photo(Base):
     image_url = Column(String(500), nullable=False)  # 原图URL
     image_thumb_url = Column(String(500))  # 缩略图URL（用于瀑布流展示，宽度约400px）
     image_medium_url = Column(String(500))  # 中等尺寸URL（用于灯箱预览，宽度约1200px）
+    # 替代格式（与 JPEG 同目录，浏览器支持时优先使用；历史照片由 backfill_image_formats.py 补齐）
+    image_thumb_webp_url = Column(String(500), nullable=True)
+    image_medium_webp_url = Column(String(500), nullable=True)
+    image_thumb_avif_url = Column(String(500), nullable=True)
+    image_medium_avif_url = Column(String(500), nullable=True)
 
     # 图片元数据
     file_size = Column(Integer)  # 文件大小（字节）
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Float, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Float, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -62,6 +62,10 @@ class PollOption(Base):
 class PollVote(Base):
     """投票记录表 - 用于防重复投票"""
     __tablename__ = "poll_votes"
+    __table_args__ = (
+        # 同一 IP 对同一投票只能投一次，由数据库保证（并发重复提交只有一条能插入）
+        UniqueConstraint('poll_id', 'user_ip', name='uq_poll_votes_poll_ip'),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     poll_id = Column(String(36), nullable=False, index=True)
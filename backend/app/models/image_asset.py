@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""图片内容索引：按源文件 SHA-256 复用已生成的各尺寸图片"""
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
+
+from ..database import Base
+
+
+class ImageAsset(Base):
+    """
+    已上传图片的内容索引
+
+    同一份源文件按同一种方式处理（kind）得到的结果只存储一份，
+    ref_count 记录引用次数，降为 0 时才删除存储中的对象。
+    """
+    __tablename__ = "image_assets"
+    __table_args__ = (
+        UniqueConstraint('content_hash', 'kind', name='uq_image_assets_hash_kind'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, comment='源文件 SHA-256（十六进制）')
+    kind = Column(String(32), nullable=False, comment='处理方式：variants / editor / avatar')
+
+    original_url = Column(String(500), nullable=False, index=True, comment='原图URL')
+    medium_url = Column(String(500), nullable=True, index=True, comment='中等尺寸URL')
+    thumb_url = Column(String(500), nullable=True, index=True, comment='缩略图URL')
+    alternate_urls = Column(Text, nullable=True, comment='替代格式URL（JSON，如 {"thumb_webp": "..."}）')
+
+    file_size = Column(Integer, nullable=True, comment='原图大小（字节）')
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+
+    ref_count = Column(Integer, nullable=False, default=1, comment='引用次数')
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    @property
+    def alternates(self):
+        return json.loads(self.alternate_urls) if self.alternate_urls else {}
+
+    @property
+    def urls(self):
+        urls = [url for url in (self.original_url, self.medium_url, self.thumb_url) if url]
+        return urls + [url for url in self.alternates.values() if url]
+
+    def __repr__(self):
+        return f"<ImageAsset(kind='{self.kind}', hash='{self.content_hash[:12]}', refs={self.ref_count})>"
@@ -1,5 +1,5 @@
 """SQLAlchemy Schedule Model for MySQL"""
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
 from datetime import datetime
 from ..database import Base
 
@@ -35,6 +35,12 @@ class Schedule(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment='创建时间')
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment='更新时间')
 
+    # 审核队列（按状态筛选、按创建时间倒序的键集分页）
+    __table_args__ = (
+        Index('ix_schedules_review_status_created_at', 'review_status', 'created_at'),
+        Index('ix_schedules_created_at', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<Schedule(id={self.id}, category='{self.category}', theme='{self.theme}', date='{self.date}')>"
 
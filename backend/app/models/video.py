@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from sqlalchemy import Column, String, Text, DateTime, Integer, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -47,5 +47,11 @@ class Video(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # 审核队列（按状态筛选、按创建时间倒序的键集分页）
+    __table_args__ = (
+        Index('ix_videos_review_status_created_at', 'review_status', 'created_at'),
+        Index('ix_videos_created_at', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<Video(title='{self.title}', bvid='{self.bvid}', category='{self.category}')>"
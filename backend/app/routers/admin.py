@@ -7,6 +7,7 @@ from datetime import datetime
 import json
 
 from ..database import get_db
+from ..core.executors import run_storage_task
 from ..core.permissions import require_admin, require_super_admin
 from ..models.user_db import User, UserStatus
 from ..models.roles import UserRole
@@ -26,6 +27,7 @@ from ..schemas.admin import (
 from ..schemas.dashboard import DashboardStats, DashboardChartData
 from ..crud import admin_log, admin_articles, admin_users, admin_dashboard
 from ..crud.article import get_article
+from ..services.review_stats import invalidate_review_statistics
 from ..services.schedule_service_mysql import ScheduleServiceMySQL
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -161,6 +163,8 @@ def approve_article_endpoint(
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
 
+    invalidate_review_statistics()
+
     # 记录日志
     create_admin_log(
         db=db,
@@ -198,6 +202,8 @@ def reject_article_endpoint(
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
 
+    invalidate_review_statistics()
+
     # 记录日志
     create_admin_log(
         db=db,
@@ -467,6 +473,7 @@ def approve_schedule(
 
     schedule.review_status = "approved"
     db.commit()
+    invalidate_review_statistics()
 
     # 记录日志
     from ..schemas.admin import AdminLogCreate
@@ -519,6 +526,7 @@ def reject_schedule(
     # 直接删除被拒绝的行程
     db.delete(schedule)
     db.commit()
+    invalidate_review_statistics()
 
     return {"message": "行程已拒绝并删除"}
 
@@ -538,7 +546,9 @@ async def update_schedule(
 ):
     """更新行程信息"""
     schedule_service = ScheduleServiceMySQL(db)
-    updated = schedule_service.update_entry(
+    # update_entry 可能同步处理海报并上传 OSS，放到存储执行器中运行
+    updated = await run_storage_task(
+        schedule_service.update_entry,
         schedule_id,
         category=category,
         date=date,
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.database import get_db
-from app.schemas.article import Article as ArticleSchema, ArticleCreate, ArticleUpdate, ArticleSummary
+from app.database import get_db, get_async_db
+from app.schemas.article import Article as ArticleSchema, ArticleCreate, ArticleUpdate, ArticleSummary, ArticleSearchResult
 from app.crud import article as crud_article
 from app.core.dependencies import get_current_user
 from app.core.permissions import require_admin
 from app.models.user_db import User
+from app.services.view_counter import current_view_count
 
 router = APIRouter(prefix="/api/articles", tags=["articles"])
 
@@ -23,15 +25,15 @@ def create_article(
     return crud_article.create_article(db=db, article=article)
 
 @router.get("/", response_model=List[ArticleSummary])
-def get_articles(
+async def get_articles(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     category: Optional[str] = Query(None),
     published_only: bool = Query(True, description="是否只返回已发布的文章"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取文章列表"""
-    articles = crud_article.get_articles(
+    articles = await crud_article.get_articles_async(
         db=db,
         skip=skip,
         limit=limit,
@@ -77,15 +79,15 @@ def get_all_articles(
     )
     return articles
 
-@router.get("/search", response_model=List[ArticleSummary])
-def search_articles(
+@router.get("/search", response_model=List[ArticleSearchResult])
+async def search_articles(
     q: str = Query(..., min_length=1),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """搜索文章"""
-    articles = crud_article.search_articles(
+    """搜索文章（全文索引，按相关度排序并返回高亮片段）"""
+    articles = await crud_article.search_articles_async(
         db=db,
         query_text=q,
         skip=skip,
@@ -94,44 +96,50 @@ def search_articles(
     return articles
 
 @router.get("/categories", response_model=List[str])
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """获取所有分类"""
-    return crud_article.get_categories(db=db)
+    return await crud_article.get_categories_async(db=db)
 
 @router.get("/count")
-def get_article_count(
+async def get_article_count(
     category: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取文章总数"""
-    count = crud_article.get_article_count(db=db, category=category)
+    count = await crud_article.get_article_count_async(db=db, category=category)
     return {"count": count}
 
 @router.get("/{article_id}", response_model=ArticleSchema)
-def get_article(
+async def get_article(
     article_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """根据ID获取文章详情"""
-    article = crud_article.get_article(db=db, article_id=article_id)
+    article = await crud_article.get_article_async(db=db, article_id=article_id)
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
 
     # 注意：不再在这里自动增加浏览次数，改由前端调用专门的 POST /{article_id}/view 端点
-    return article
+    # 浏览次数为数据库中的值加上尚未写回的增量
+    return ArticleSchema.model_validate(article).model_copy(
+        update={"view_count": current_view_count(article.id, article.view_count)}
+    )
 
 @router.get("/slug/{slug}", response_model=ArticleSchema)
-def get_article_by_slug(
+async def get_article_by_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """根据slug获取文章详情"""
-    article = crud_article.get_article_by_slug(db=db, slug=slug)
+    article = await crud_article.get_article_by_slug_async(db=db, slug=slug)
     if not article:
         raise HTTPException(status_code=404, detail="文章不存在")
 
     # 注意：不再在这里自动增加浏览次数，改由前端调用专门的 POST /{article_id}/view 端点
-    return article
+    # 浏览次数为数据库中的值加上尚未写回的增量
+    return ArticleSchema.model_validate(article).model_copy(
+        update={"view_count": current_view_count(article.id, article.view_count)}
+    )
 
 @router.put("/{article_id}", response_model=ArticleSchema)
 def update_article(
@@ -170,8 +178,8 @@ def increase_view_count(
     db: Session = Depends(get_db)
 ):
     """增加浏览次数"""
-    article = crud_article.increase_view_count(db=db, article_id=article_id)
-    if not article:
+    view_count = crud_article.increase_view_count(db=db, article_id=article_id)
+    if view_count is None:
         raise HTTPException(status_code=404, detail="文章不存在")
 
-    return {"view_count": article.view_count}
+    return {"view_count": view_count}
@@ -22,6 +22,7 @@ from app.core.permissions import (
     require_admin
 )
 from app.models.roles import UserRole
+from app.services.review_stats import invalidate_review_statistics
 from slugify import slugify
 
 router = APIRouter(prefix="/api/v3/content", tags=["content-workflow"])
@@ -272,6 +273,8 @@ def update_article_v3(
 
     db.commit()
     db.refresh(article)
+    if article.review_status != current_status:
+        invalidate_review_statistics()
 
     return article
 
@@ -385,6 +388,7 @@ def submit_article_for_review(
 
     db.commit()
     db.refresh(article)
+    invalidate_review_statistics()
 
     return article
 
@@ -439,6 +443,7 @@ def approve_article(
 
     db.commit()
     db.refresh(article)
+    invalidate_review_statistics()
 
     return article
 
@@ -491,6 +496,7 @@ def reject_article(
 
     db.commit()
     db.refresh(article)
+    invalidate_review_statistics()
 
     return article
 
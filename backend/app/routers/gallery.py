@@ -2,17 +2,17 @@
 """图片画廊路由"""
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-import os
-import tempfile
+from typing import List, Optional, Tuple
 from pathlib import Path
+import asyncio
 
-from ..database import get_db
+from ..database import get_db, get_async_db
+from ..core.config import get_settings
 from ..core.permissions import require_admin
 from ..core.dependencies import get_current_user
 from ..models.user_db import User
-from ..models.gallery_db import Photo
 from ..schemas.gallery import (
     PhotoGroupCreate,
     PhotoGroupUpdate,
@@ -25,21 +25,24 @@ from ..schemas.gallery import (
 )
 from ..crud.gallery import (
     create_photo_group,
-    get_photo_group,
+    get_photo_group_async,
     get_photo_groups,
+    get_photo_groups_async,
     update_photo_group,
     delete_photo_group,
-    get_photo_group_count,
+    get_photo_group_count_async,
     create_photo,
     get_photo,
-    get_photos_by_group,
+    get_photos_by_group_async,
     update_photo,
     delete_photo,
     batch_create_photos,
     get_photo_groups_by_author,
-    get_all_photo_groups_admin
+    get_all_photo_groups_admin,
+    get_photo_counts_by_group,
+    get_usernames_by_ids
 )
-from ..services.image_processing import ImageProcessor
+from ..services.image_upload import read_image_upload, upload_image_variants
 from ..services.storage_service import (
     get_storage_service,
     generate_unique_filename,
@@ -52,15 +55,37 @@ router = APIRouter(prefix="/api/gallery", tags=["gallery"])
 
 # ========== 照片组相关路由 ==========
 
+def _with_counts_and_authors(db: Session, photo_groups, created_by: Optional[str] = None) -> List[dict]:
+    """
+    为照片组补充照片数量和创建者名称
+
+    照片数量和创建者各只用一次批量查询，不随照片组数量增加。
+    created_by 已知时（如"我的照片组"）不再查询用户表。
+    """
+    group_ids = [group.id for group in photo_groups]
+    photo_counts = get_photo_counts_by_group(db, group_ids)
+    usernames = {} if created_by else get_usernames_by_ids(db, [group.author_id for group in photo_groups])
+
+    result = []
+    for group in photo_groups:
+        result.append({
+            **group.__dict__,
+            'photo_count': photo_counts.get(group.id, 0),
+            'created_by': created_by or usernames.get(str(group.author_id)),
+            'tags': []
+        })
+    return result
+
+
 @router.get("/groups", response_model=List[PhotoGroupSchema])
-def list_photo_groups(
+async def list_photo_groups(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     category: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取照片组列表（前台，只返回已发布的）"""
-    photo_groups = get_photo_groups(
+    photo_groups = await get_photo_groups_async(
         db=db,
         skip=skip,
         limit=limit,
@@ -87,22 +112,7 @@ def get_my_photo_groups(
         category=category
     )
 
-    # 为每个照片组添加照片数量和创建者名称
-    from ..models.user_db import User as UserModel
-    result = []
-    for group in photo_groups:
-        group_dict = {
-            **group.__dict__,
-            'photo_count': db.query(Photo).filter(
-                Photo.photo_group_id == group.id,
-                Photo.is_deleted == False
-            ).count(),
-            'created_by': current_user.username,
-            'tags': []
-        }
-        result.append(group_dict)
-
-    return result
+    return _with_counts_and_authors(db, photo_groups, created_by=current_user.username)
 
 
 @router.get("/groups/all", response_model=List[PhotoGroupSchema])
@@ -123,43 +133,32 @@ def get_all_photo_groups(
         review_status=review_status
     )
 
-    # 为每个照片组添加照片数量和创建者名称
-    from ..models.user_db import User as UserModel
-    result = []
-    for group in photo_groups:
-        group_dict = {
-            **group.__dict__,
-            'photo_count': db.query(Photo).filter(
-                Photo.photo_group_id == group.id,
-                Photo.is_deleted == False
-            ).count(),
-            'created_by': None,
-            'tags': []
-        }
-
-        # 获取创建者名称
-        if group.author_id:
-            author = db.query(UserModel).filter(UserModel.id == int(group.author_id)).first()
-            if author:
-                group_dict['created_by'] = author.username
+    return _with_counts_and_authors(db, photo_groups)
 
-        result.append(group_dict)
 
-    return result
+# 固定路径需声明在 /groups/{group_id} 之前，否则会被当作 group_id 匹配
+@router.get("/groups/count")
+async def get_groups_count(
+    category: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取照片组总数"""
+    count = await get_photo_group_count_async(db=db, category=category, published_only=True)
+    return {"count": count}
 
 
 @router.get("/groups/{group_id}", response_model=PhotoGroupWithPhotos)
-def get_photo_group_detail(
+async def get_photo_group_detail(
     group_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取照片组详情（包含所有照片）"""
-    photo_group = get_photo_group(db=db, photo_group_id=group_id)
+    photo_group = await get_photo_group_async(db=db, photo_group_id=group_id)
     if not photo_group:
         raise HTTPException(status_code=404, detail="照片组不存在")
 
     # 获取照片组的所有照片
-    photos = get_photos_by_group(db=db, photo_group_id=group_id)
+    photos = await get_photos_by_group_async(db=db, photo_group_id=group_id)
 
     return {
         **photo_group.__dict__,
@@ -167,16 +166,6 @@ def get_photo_group_detail(
     }
 
 
-@router.get("/groups/count")
-def get_groups_count(
-    category: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
-    """获取照片组总数"""
-    count = get_photo_group_count(db=db, category=category, published_only=True)
-    return {"count": count}
-
-
 # ========== 管理员路由 ==========
 
 @router.get("/admin/groups", response_model=List[PhotoGroupSchema])
@@ -246,12 +235,12 @@ def admin_delete_photo_group(
 # ========== 照片相关路由 ==========
 
 @router.get("/photos/group/{group_id}", response_model=List[PhotoSchema])
-def list_photos_by_group(
+async def list_photos_by_group(
     group_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取照片组的所有照片"""
-    photos = get_photos_by_group(db=db, photo_group_id=group_id)
+    photos = await get_photos_by_group_async(db=db, photo_group_id=group_id)
     return photos
 
 
@@ -295,6 +284,37 @@ def admin_delete_photo(
 
 # ========== 文件上传路由 ==========
 
+MAX_BATCH_FILES = 50
+
+
+def _gallery_upload_paths(
+    filename: str,
+    group_id: Optional[str],
+    category: Optional[str],
+    sequence: Optional[int]
+) -> Tuple[str, str, str]:
+    """生成三种尺寸的存储路径"""
+    # 根据是否提供了 group_id 和 category，决定是否使用可读性命名
+    if group_id and category:
+        # 使用可读性命名 (Plan A)
+        if sequence is None:
+            sequence = 1
+        return (
+            generate_gallery_image_path(category, group_id, sequence, "original"),
+            generate_gallery_image_path(category, group_id, sequence, "medium"),
+            generate_gallery_image_path(category, group_id, sequence, "thumb"),
+        )
+
+    # 使用默认命名 (向后兼容)
+    filename_base = Path(generate_unique_filename(filename)).stem
+    upload_base_path = get_upload_path("gallery")
+    return (
+        f"{upload_base_path}/{filename_base}.jpg",
+        f"{upload_base_path}/{filename_base}_medium.jpg",
+        f"{upload_base_path}/{filename_base}_thumb.jpg",
+    )
+
+
 @router.post("/admin/upload", response_model=UploadResponse)
 async def admin_upload_image(
     file: UploadFile = File(...),
@@ -308,113 +328,18 @@ async def admin_upload_image(
     上传图片（管理员）
     - 自动生成缩略图（400px宽）
     - 自动生成中等尺寸（1200px宽）
+    - 中等尺寸和缩略图同时生成 WebP（可配置 AVIF）版本
     - 压缩原图
     - 支持本地存储和OSS
     - 可选参数：group_id, category, sequence 用于生成可读性命名
     - 如果不提供这些参数，将使用默认的 UUID 命名
     """
-    # 验证文件类型
-    allowed_types = [
-        "image/jpeg",
-        "image/jpg",
-        "image/png",
-        "image/webp",
-        "image/gif",
-        "image/bmp",
-        "image/heic",
-        "image/heif",
-    ]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"不支持的文件类型：{file.content_type}，仅支持 JPEG, PNG, WebP"
-        )
-
-    # 验证文件大小（最大20MB）
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
-    if file_size > 20 * 1024 * 1024:  # 20MB
-        raise HTTPException(status_code=400, detail="文件大小不能超过 20MB")
-
-    # 重置文件指针
-    await file.seek(0)
-
-    try:
-        # 1. 保存临时文件
-        temp_dir = tempfile.mkdtemp()
-        temp_input_path = os.path.join(temp_dir, file.filename)
-
-        with open(temp_input_path, 'wb') as f:
-            f.write(content)
-
-        # 2. 处理图片（生成缩略图和中等尺寸）
-        unique_name = generate_unique_filename(file.filename)
-        filename_base = Path(unique_name).stem
-
-        # 生成临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "processed")
-
-        # 处理图片
-        original_path, medium_path, thumb_path, width, height = ImageProcessor.process_image(
-            input_path=temp_input_path,
-            output_dir=temp_output_dir,
-            filename_base=filename_base
-        )
-
-        # 3. 上传到存储服务
-        storage = get_storage_service()
-
-        # 根据是否提供了 group_id 和 category，决定是否使用可读性命名
-        if group_id and category:
-            # 使用可读性命名 (Plan A)
-            if sequence is None:
-                sequence = 1
-            original_oss_path = generate_gallery_image_path(category, group_id, sequence, "original")
-            medium_oss_path = generate_gallery_image_path(category, group_id, sequence, "medium")
-            thumb_oss_path = generate_gallery_image_path(category, group_id, sequence, "thumb")
-        else:
-            # 使用默认命名 (向后兼容)
-            upload_base_path = get_upload_path("gallery")
-            original_oss_path = f"{upload_base_path}/{filename_base}.jpg"
-            medium_oss_path = f"{upload_base_path}/{filename_base}_medium.jpg"
-            thumb_oss_path = f"{upload_base_path}/{filename_base}_thumb.jpg"
-
-        # 上传 3 种尺寸
-        original_url = storage.upload_file(original_path, original_oss_path)
-        medium_url = storage.upload_file(medium_path, medium_oss_path)
-        thumb_url = storage.upload_file(thumb_path, thumb_oss_path)
-
-        # 4. 获取文件信息（在清理临时文件之前）
-        file_size = ImageProcessor.get_file_size(original_path)
-
-        # 5. 清理临时文件
-        import shutil
-        shutil.rmtree(temp_dir)
-
-        # 6. 返回结果
-        return UploadResponse(
-            success=True,
-            message="上传成功",
-            file_url=original_url,
-            thumb_url=thumb_url,
-            medium_url=medium_url,
-            file_size=file_size,
-            width=width,
-            height=height
-        )
-
-    except Exception as e:
-        # 清理临时文件
-        if os.path.exists(temp_dir):
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
-
-        # 记录详细错误信息
-        import traceback
-        error_detail = f"上传失败：{str(e)}\n{traceback.format_exc()}"
-        print(error_detail)
-        raise HTTPException(status_code=500, detail=f"上传失败：{str(e)}")
+    content = await read_image_upload(file)
+    return await upload_image_variants(
+        content,
+        *_gallery_upload_paths(file.filename, group_id, category, sequence),
+        with_alternates=True
+    )
 
 
 # ========== 批量上传路由 ==========
@@ -422,22 +347,34 @@ async def admin_upload_image(
 @router.post("/admin/batch-upload", response_model=List[UploadResponse])
 async def admin_batch_upload_images(
     files: List[UploadFile] = File(...),
+    group_id: Optional[str] = Form(None, description="图组ID（可选）"),
+    category: Optional[str] = Form(None, description="图组分类（可选）"),
+    start_sequence: int = Form(1, ge=1, description="第一张图片的序号（可选，默认1）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
-    """批量上传图片（管理员）"""
-    if len(files) > 50:
-        raise HTTPException(status_code=400, detail="单次最多上传50张图片")
-
-    results = []
-    for file in files:
-        try:
-            result = await admin_upload_image(file, db, current_user)
-            results.append(result)
-        except HTTPException as e:
-            results.append(UploadResponse(
-                success=False,
-                message=f"上传失败：{e.detail}"
-            ))
-
-    return results
+    """
+    批量上传图片（管理员）
+    - 多张图片并发处理和上传，同时处理的数量受 gallery_batch_upload_concurrency 限制
+    - 结果按上传顺序逐个返回，单张失败不影响其他图片
+    - 提供 group_id 和 category 时，第 i 张图片的序号为 start_sequence + i
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"单次最多上传{MAX_BATCH_FILES}张图片")
+
+    storage = get_storage_service()
+    semaphore = asyncio.Semaphore(get_settings().gallery_batch_upload_concurrency)
+
+    async def ingest(index: int, file: UploadFile) -> UploadResponse:
+        async with semaphore:
+            try:
+                content = await read_image_upload(file)
+                paths = _gallery_upload_paths(file.filename, group_id, category, start_sequence + index)
+                return await upload_image_variants(content, *paths, storage=storage, with_alternates=True)
+            except HTTPException as e:
+                return UploadResponse(
+                    success=False,
+                    message=f"上传失败：{e.detail}"
+                )
+
+    return await asyncio.gather(*(ingest(index, file) for index, file in enumerate(files)))
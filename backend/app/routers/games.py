@@ -6,7 +6,7 @@ import uuid
 from typing import List, Dict, Any, Optional
 
 from ..database import get_db
-from ..models.game import Game, Poll, PollOption, PollVote, GameScore
+from ..models.game import Game, PollOption, GameScore
 from ..schemas.game import (
     GameResponse, GameCreate,
     PollResponse, PollCreate, PollUpdate,
@@ -14,6 +14,7 @@ from ..schemas.game import (
     PollVoteRequest,
     LeaderboardEntry, LeaderboardResponse, SubmitScoreResponse
 )
+from ..services import poll_votes
 from ..services.game_service import lyrics_guesser, fill_lyrics, song_matcher, intro_guesser
 
 router = APIRouter(prefix="/api", tags=["games"])
@@ -123,72 +124,16 @@ def record_game_play(game_id: str, db: Session = Depends(get_db)):
 @router.get("/polls")
 def get_polls(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """获取所有投票"""
-    polls = db.query(Poll).filter(Poll.is_published == True).offset(skip).limit(limit).all()
-
-    # 为每个投票附加选项
-    result = []
-    for poll in polls:
-        options = db.query(PollOption).filter(PollOption.poll_id == poll.id).order_by(PollOption.sort_order).all()
-        poll_dict = {
-            "id": poll.id,
-            "title": poll.title,
-            "description": poll.description,
-            "start_date": poll.start_date,
-            "end_date": poll.end_date,
-            "status": poll.status,
-            "total_votes": poll.total_votes,
-            "is_published": poll.is_published,
-            "options": [
-                {
-                    "id": opt.id,
-                    "poll_id": opt.poll_id,
-                    "label": opt.label,
-                    "image_url": opt.image_url,
-                    "vote_count": opt.vote_count,
-                    "sort_order": opt.sort_order
-                }
-                for opt in options
-            ],
-            "created_at": poll.created_at,
-            "updated_at": poll.updated_at
-        }
-        result.append(poll_dict)
-
-    return result
+    return poll_votes.list_published_polls(db, skip=skip, limit=limit)
 
 
 @router.get("/polls/{poll_id}")
 def get_poll(poll_id: str, db: Session = Depends(get_db)):
     """获取单个投票详情"""
-    poll = db.query(Poll).filter(Poll.id == poll_id).first()
+    poll = poll_votes.get_poll_snapshot(db, poll_id)
     if not poll:
         raise HTTPException(status_code=404, detail="投票不存在")
-
-    options = db.query(PollOption).filter(PollOption.poll_id == poll_id).order_by(PollOption.sort_order).all()
-
-    return {
-        "id": poll.id,
-        "title": poll.title,
-        "description": poll.description,
-        "start_date": poll.start_date,
-        "end_date": poll.end_date,
-        "status": poll.status,
-        "total_votes": poll.total_votes,
-        "is_published": poll.is_published,
-        "options": [
-            {
-                "id": opt.id,
-                "poll_id": opt.poll_id,
-                "label": opt.label,
-                "image_url": opt.image_url,
-                "vote_count": opt.vote_count,
-                "sort_order": opt.sort_order
-            }
-            for opt in options
-        ],
-        "created_at": poll.created_at,
-        "updated_at": poll.updated_at
-    }
+    return poll
 
 
 @router.post("/polls/{poll_id}/vote")
@@ -198,64 +143,9 @@ def vote_poll(
     request: Request,
     db: Session = Depends(get_db)
 ):
-    """投票"""
-    # 验证投票是否存在
-    poll = db.query(Poll).filter(Poll.id == poll_id).first()
-    if not poll:
-        raise HTTPException(status_code=404, detail="投票不存在")
-
-    option = db.query(PollOption).filter(PollOption.id == vote_request.option_id).first()
-    if not option:
-        raise HTTPException(status_code=404, detail="投票选项不存在")
-
-    # 检查是否已投票（通过IP地址）
+    """投票（同一 IP 每个投票只能投一次）"""
     user_ip = request.client.host if request.client else "unknown"
-
-    existing_vote = db.query(PollVote).filter(
-        PollVote.poll_id == poll_id,
-        PollVote.user_ip == user_ip
-    ).first()
-
-    if existing_vote:
-        raise HTTPException(status_code=400, detail="您已经投过票了")
-
-    # 记录投票
-    poll_vote = PollVote(
-        id=str(uuid.uuid4()),
-        poll_id=poll_id,
-        option_id=vote_request.option_id,
-        user_ip=user_ip
-    )
-    db.add(poll_vote)
-
-    # 更新选项的投票数
-    option.vote_count += 1
-    poll.total_votes += 1
-
-    db.commit()
-    db.refresh(poll)
-    db.refresh(option)
-
-    # 返回更新后的投票数据
-    options = db.query(PollOption).filter(PollOption.poll_id == poll_id).all()
-    total_votes = sum(opt.vote_count for opt in options)
-
-    return {
-        "poll_id": poll_id,
-        "option_id": vote_request.option_id,
-        "vote_count": option.vote_count,
-        "total_votes": total_votes,
-        "options": [
-            {
-                "id": opt.id,
-                "label": opt.label,
-                "image_url": opt.image_url,
-                "vote_count": opt.vote_count,
-                "percentage": round((opt.vote_count / total_votes * 100) if total_votes > 0 else 0, 1)
-            }
-            for opt in sorted(options, key=lambda x: x.sort_order)
-        ]
-    }
+    return poll_votes.cast_vote(db, poll_id, vote_request.option_id, user_ip)
 
 
 # 计算投票百分比的辅助函数
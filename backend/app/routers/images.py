@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+按需缩放图片路由
+
+GET /img/{key}?w=800&fmt=webp
+- key 为存储中的源图路径（如 gallery/2024/01/01/xxx.jpg，也可带 /uploads/ 前缀）
+- w 为输出宽度（须在 image_derivative_widths 中），不传则保持原尺寸
+- fmt 为输出格式：jpeg（默认）/ webp / avif（需 Pillow 支持）
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, Response
+
+from ..core.config import get_settings
+from ..services.image_derivatives import get_image_derivative_service
+
+router = APIRouter(prefix="/img", tags=["images"])
+
+
+@router.get("/{key:path}")
+async def get_image_derivative(
+    key: str,
+    request: Request,
+    w: Optional[int] = Query(None, description="输出宽度"),
+    fmt: str = Query("jpeg", description="输出格式：jpeg / webp / avif"),
+):
+    """获取指定宽度和格式的图片，首次请求时生成并缓存"""
+    service = get_image_derivative_service()
+    ref = await service.lookup(key, w, fmt)
+    headers = {
+        "ETag": ref.etag,
+        "Cache-Control": f"public, max-age={get_settings().image_derivative_max_age_seconds}",
+    }
+    # ETag 只取决于衍生图键和源图版本，命中时不必读取或生成衍生图
+    if ref.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    derivative = await service.load(ref)
+    return Response(content=derivative.data, media_type=derivative.media_type, headers=headers)
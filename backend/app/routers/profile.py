@@ -3,9 +3,9 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+import asyncio
+import mimetypes
 import os
-import shutil
-import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -14,7 +14,10 @@ from ..models.user_db import User
 from ..models.article import Article
 from ..core.dependencies import get_current_user
 from ..core.security import get_password_hash, verify_password
-from ..utils.image_utils import compress_image
+from ..core.executors import run_image_task, run_storage_task
+from ..core.user_cache import invalidate_cached_user
+from ..utils.image_utils import compress_image_bytes
+from ..services.image_dedup import KIND_AVATAR, ImageAssetInfo, find_image_asset, save_image_asset
 from ..services.storage_service import (
     get_storage_service,
     generate_avatar_keys
@@ -73,34 +76,43 @@ def _resolve_avatar_urls(avatar_value: Optional[str]) -> tuple[str, str]:
     return relative_path, thumb_path
 
 
-def save_avatar(user_id: int, upload: UploadFile) -> tuple[str, str, str, str]:
+def _build_avatar_thumb(original_content: bytes) -> bytes:
+    """生成头像缩略图（CPU 密集，在图片执行器中运行）"""
+    compressed = compress_image_bytes(original_content, max_size_kb=100)
+    return compressed.data if compressed else original_content
+
+
+async def save_avatar(user_id: int, original_content: bytes, filename: Optional[str]) -> tuple[str, str, str, str]:
     """保存头像到配置的存储服务，返回键和值"""
-    temp_dir = Path(tempfile.mkdtemp(prefix="avatar-"))
     storage = get_storage_service()
 
-    try:
-        extension = Path(upload.filename or '').suffix.lower()
+    # 相同的头像图片已上传过时复用已有对象（键名同样按原图/缩略图规则生成，可直接写入 user.avatar）
+    digest, asset = await find_image_asset(original_content, KIND_AVATAR)
+    if asset is None:
+        extension = Path(filename or '').suffix.lower()
         if extension not in {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}:
             extension = '.jpg'
 
-        original_temp_path = temp_dir / f"original{extension}"
-        if hasattr(upload.file, 'seek'):
-            upload.file.seek(0)
-        original_content = upload.file.read()
-        original_temp_path.write_bytes(original_content)
-
-        thumb_temp_path = temp_dir / "thumb.jpg"
-        compressed = compress_image(original_temp_path, thumb_temp_path, max_size_kb=100)
-        if not compressed:
-            thumb_temp_path.write_bytes(original_content)
+        thumb_content = await run_image_task(_build_avatar_thumb, original_content)
 
         avatar_key, thumb_key = generate_avatar_keys(user_id, extension)
-        avatar_url = storage.upload_file(str(original_temp_path), avatar_key)
-        thumb_url = storage.upload_file(str(thumb_temp_path), thumb_key)
-
-        return avatar_key, thumb_key, avatar_url, thumb_url
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        original_type = mimetypes.guess_type(f"avatar{extension}")[0] or "image/jpeg"
+        avatar_url, thumb_url = await asyncio.gather(
+            run_storage_task(storage.upload_bytes, original_content, avatar_key, original_type),
+            run_storage_task(storage.upload_bytes, thumb_content, thumb_key),
+        )
+        asset = await save_image_asset(digest, KIND_AVATAR, ImageAssetInfo(
+            original_url=avatar_url,
+            thumb_url=thumb_url,
+            file_size=len(original_content),
+        ), storage)
+
+    return (
+        storage.key_from_url(asset.original_url),
+        storage.key_from_url(asset.thumb_url),
+        asset.original_url,
+        asset.thumb_url,
+    )
 
 
 @router.get("/me")
@@ -152,22 +164,24 @@ async def upload_avatar(
     if len(content) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="文件大小不能超过10MB")
 
-    # 重置文件指针
-    await avatar.seek(0)
-
     try:
         # 保存头像
-        avatar_key, _thumb_key, avatar_url, avatar_thumb_url = save_avatar(current_user.id, avatar)
+        avatar_key, _thumb_key, avatar_url, avatar_thumb_url = await save_avatar(
+            current_user.id, content, avatar.filename
+        )
 
         # 更新数据库
         current_user.avatar = avatar_key
         db.commit()
+        invalidate_cached_user(current_user)
 
         return {
             "message": "头像上传成功",
             "avatar": avatar_url,
             "avatar_thumb": avatar_thumb_url
         }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"头像上传失败: {str(e)}")
@@ -194,6 +208,7 @@ async def change_password(
     try:
         current_user.hashed_password = get_password_hash(new_password)
         db.commit()
+        invalidate_cached_user(current_user)
 
         return {"message": "密码修改成功"}
     except Exception as e:
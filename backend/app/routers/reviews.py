@@ -3,7 +3,7 @@
 审核系统API路由
 提供统一的内容审核接口，支持文章、视频、行程、图片组的审核
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional, Literal
 from datetime import datetime
@@ -17,6 +17,8 @@ from ..models.schedule_db import Schedule
 from ..models.gallery_db import PhotoGroup
 from ..models.user_db import User
 from ..core.dependencies import get_current_active_user
+from ..services import review_stats
+from ..services.review_queue import load_review_items, review_queue_page
 
 router = APIRouter(prefix="/api/admin/reviews", tags=["审核管理"])
 
@@ -178,11 +180,21 @@ def map_gallery_to_review_item(gallery: PhotoGroup) -> dict:
 
 # ==================== API Endpoints ====================
 
+REVIEW_ITEM_MAPPERS = {
+    'article': map_article_to_review_item,
+    'video': map_video_to_review_item,
+    'schedule': map_schedule_to_review_item,
+    'gallery': map_gallery_to_review_item,
+}
+
+
 @router.get("/", response_model=List[ReviewItemResponse])
 async def get_review_list(
+    response: Response,
     content_type: Optional[Literal['article', 'video', 'schedule', 'gallery']] = Query(None, description="内容类型筛选"),
     status: Optional[Literal['pending', 'approved', 'rejected']] = Query(None, description="审核状态筛选"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor）"),
+    skip: int = Query(0, ge=0, description="偏移分页（使用 cursor 时忽略）"),
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -191,46 +203,24 @@ async def get_review_list(
     获取待审核内容列表（支持分页和筛选）
     - 管理员可查看所有待审核内容
     - 支持按类型、状态筛选
-    - 按创建时间倒序排列
+    - 按创建时间倒序排列，各类型内容在一条查询中合并分页
+    - 有下一页时在响应头 X-Next-Cursor 中返回游标，作为 cursor 参数获取下一页
     """
-    results = []
-
-    # 查询文章
-    if content_type is None or content_type == 'article':
-        query = db.query(Article).filter(Article.is_deleted == False)
-        if status:
-            query = query.filter(Article.review_status == status)
-        articles = query.order_by(Article.created_at.desc()).offset(skip).limit(limit).all()
-        results.extend([map_article_to_review_item(a) for a in articles])
-
-    # 查询视频
-    if content_type is None or content_type == 'video':
-        query = db.query(Video)
-        if status and hasattr(Video, 'review_status'):
-            query = query.filter(Video.review_status == status)
-        videos = query.order_by(Video.created_at.desc()).offset(skip).limit(limit).all()
-        results.extend([map_video_to_review_item(v) for v in videos])
-
-    # 查询行程
-    if content_type is None or content_type == 'schedule':
-        query = db.query(Schedule)
-        if status:
-            query = query.filter(Schedule.review_status == status)
-        schedules = query.order_by(Schedule.created_at.desc()).offset(skip).limit(limit).all()
-        results.extend([map_schedule_to_review_item(s) for s in schedules])
-
-    # 查询图片组
-    if content_type is None or content_type == 'gallery':
-        query = db.query(PhotoGroup).filter(PhotoGroup.is_deleted == False)
-        if status and hasattr(PhotoGroup, 'review_status'):
-            query = query.filter(PhotoGroup.review_status == status)
-        galleries = query.order_by(PhotoGroup.created_at.desc()).offset(skip).limit(limit).all()
-        results.extend([map_gallery_to_review_item(g) for g in galleries])
-
-    # 按创建时间倒序排序
-    results.sort(key=lambda x: x['createdAt'], reverse=True)
-
-    return results[:limit]
+    keys, next_cursor = review_queue_page(
+        db,
+        content_type=content_type,
+        status=status,
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return [
+        REVIEW_ITEM_MAPPERS[item_type](content)
+        for item_type, content in load_review_items(db, keys)
+    ]
 
 
 @router.get("/statistics", response_model=ReviewStatisticsResponse)
@@ -239,60 +229,7 @@ async def get_review_statistics(
     current_user: User = Depends(get_current_active_user)
 ):
     """获取审核统计数据"""
-    stats = {
-        "total": 0,
-        "pending": 0,
-        "approved": 0,
-        "rejected": 0,
-        "by_type": {
-            "article": {"total": 0, "pending": 0, "approved": 0, "rejected": 0},
-            "video": {"total": 0, "pending": 0, "approved": 0, "rejected": 0},
-            "schedule": {"total": 0, "pending": 0, "approved": 0, "rejected": 0},
-            "gallery": {"total": 0, "pending": 0, "approved": 0, "rejected": 0},
-        }
-    }
-
-    # 统计文章
-    for status in ['pending', 'approved', 'rejected']:
-        count = db.query(Article).filter(
-            Article.is_deleted == False,
-            Article.review_status == status
-        ).count()
-        stats['by_type']['article'][status] = count
-        stats[status] += count
-        stats['by_type']['article']['total'] += count
-        stats['total'] += count
-
-    # 统计视频（如果有review_status字段）
-    if hasattr(Video, 'review_status'):
-        for status in ['pending', 'approved', 'rejected']:
-            count = db.query(Video).filter(Video.review_status == status).count()
-            stats['by_type']['video'][status] = count
-            stats[status] += count
-            stats['by_type']['video']['total'] += count
-            stats['total'] += count
-
-    # 统计行程
-    for status in ['pending', 'approved', 'rejected']:
-        count = db.query(Schedule).filter(Schedule.review_status == status).count()
-        stats['by_type']['schedule'][status] = count
-        stats[status] += count
-        stats['by_type']['schedule']['total'] += count
-        stats['total'] += count
-
-    # 统计图片组（如果有review_status字段）
-    if hasattr(PhotoGroup, 'review_status'):
-        for status in ['pending', 'approved', 'rejected']:
-            count = db.query(PhotoGroup).filter(
-                PhotoGroup.is_deleted == False,
-                PhotoGroup.review_status == status
-            ).count()
-            stats['by_type']['gallery'][status] = count
-            stats[status] += count
-            stats['by_type']['gallery']['total'] += count
-            stats['total'] += count
-
-    return stats
+    return review_stats.get_review_statistics(db)
 
 
 @router.post("/{content_type}/{content_id}/approve")
@@ -333,6 +270,7 @@ async def approve_content(
 
     db.commit()
     db.refresh(content)
+    review_stats.invalidate_review_statistics()
 
     return {"message": "审核通过", "content_type": content_type, "content_id": content_id}
 
@@ -378,6 +316,7 @@ async def reject_content(
 
     db.commit()
     db.refresh(content)
+    review_stats.invalidate_review_statistics()
 
     return {"message": "已拒绝", "content_type": content_type, "content_id": content_id, "reason": request.review_notes}
 
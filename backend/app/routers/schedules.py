@@ -2,26 +2,28 @@ from typing import List, Optional, Union
 import json
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.schedule import ScheduleCategory, ScheduleCreate, ScheduleResponse
 from ..services.schedule_service_mysql import ScheduleServiceMySQL
 from ..core.dependencies import get_schedule_service
+from ..core.executors import run_storage_task
+from ..database import get_async_db
+from ..models.schedule_db import Schedule
 
 router = APIRouter(prefix="/api/schedules", tags=["行程"])
 
 
 @router.get("", response_model=List[ScheduleResponse])
-def list_schedules(
-    schedule_service: ScheduleServiceMySQL = Depends(get_schedule_service)
-):
+async def list_schedules(db: AsyncSession = Depends(get_async_db)):
     """获取所有已发布的行程（前台展示）"""
-    from ..models.schedule_db import Schedule
-    from sqlalchemy.orm import Session
-
     # 只返回已发布的行程
-    schedules = schedule_service.db.query(Schedule).filter(
-        Schedule.is_published == 1
-    ).order_by(Schedule.date.desc()).all()
+    schedules = (await db.scalars(
+        select(Schedule).where(
+            Schedule.is_published == 1
+        ).order_by(Schedule.date.desc())
+    )).all()
 
     return [schedule.to_dict() for schedule in schedules]
 
@@ -65,7 +67,9 @@ async def create_schedule(
     else:
         images_list = [images]
 
-    created = schedule_service.create_entry(
+    # create_entry 会同步处理海报并上传 OSS，放到存储执行器中运行，避免阻塞事件循环
+    created = await run_storage_task(
+        schedule_service.create_entry,
         category=payload.category.value,
         date=payload.date,
         city=payload.city,
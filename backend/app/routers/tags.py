@@ -2,15 +2,19 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..services.tag_service import TagService
+from ..database import get_db, get_async_db
+from ..services.tag_service import TagService, AsyncTagService
+from ..services.tag_content_resolver import resolve_tag_contents
 from ..schemas.tag import (
     TagCreate,
     TagUpdate,
     TagResponse,
     ContentTagCreate,
+    ContentTagsBatchUpdate,
+    ContentTagsBatchResult,
     ContentType,
     TagCategoryCreate,
     TagCategoryUpdate,
@@ -25,14 +29,19 @@ def get_tag_service(db: Session = Depends(get_db)) -> TagService:
     return TagService(db)
 
 
+def get_async_tag_service(db: AsyncSession = Depends(get_async_db)) -> AsyncTagService:
+    """获取异步标签服务实例（只读接口）"""
+    return AsyncTagService(db)
+
+
 # ==================== 标签种类 ====================
 
 @router.get("/categories", response_model=List[TagCategoryResponse], summary="获取标签种类列表")
-def list_categories(
-    tag_service: TagService = Depends(get_tag_service),
+async def list_categories(
+    tag_service: AsyncTagService = Depends(get_async_tag_service),
 ):
     """获取所有标签种类"""
-    categories = tag_service.list_categories()
+    categories = await tag_service.list_categories()
     return [category.to_dict() for category in categories]
 
 
@@ -84,21 +93,21 @@ def create_tag(
 
 
 @router.get("", response_model=List[TagResponse], summary="获取所有标签")
-def list_tags(
+async def list_tags(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    tag_service: TagService = Depends(get_tag_service),
+    tag_service: AsyncTagService = Depends(get_async_tag_service),
 ):
     """获取所有标签列表"""
-    tags = tag_service.list_tags(skip=skip, limit=limit)
+    tags = await tag_service.list_tags(skip=skip, limit=limit)
     return [tag.to_dict() for tag in tags]
 
 
 @router.get("/search", response_model=List[TagResponse], summary="搜索标签")
-def search_tags(
+async def search_tags(
     q: str = Query(..., min_length=1, description="搜索关键词（支持标签值、种类或组合名称）"),
     limit: int = Query(20, ge=1, le=100),
-    tag_service: TagService = Depends(get_tag_service),
+    tag_service: AsyncTagService = Depends(get_async_tag_service),
 ):
     """
     搜索标签（模糊搜索）
@@ -107,17 +116,17 @@ def search_tags(
     - /api/tags/search?q=花火
     - /api/tags/search?q=单曲
     """
-    tags = tag_service.search_tags(query=q, limit=limit)
+    tags = await tag_service.search_tags(query=q, limit=limit)
     return [tag.to_dict() for tag in tags]
 
 
 @router.get("/{tag_id}", response_model=TagResponse, summary="获取单个标签")
-def get_tag(
+async def get_tag(
     tag_id: int,
-    tag_service: TagService = Depends(get_tag_service),
+    tag_service: AsyncTagService = Depends(get_async_tag_service),
 ):
     """获取指定ID的标签"""
-    tag = tag_service.get_tag(tag_id)
+    tag = await tag_service.get_tag(tag_id)
     if not tag:
         raise HTTPException(status_code=404, detail=f"标签 ID {tag_id} 不存在")
     return tag.to_dict()
@@ -206,14 +215,33 @@ def remove_tag_from_content(
     return {"message": "标签移除成功"}
 
 
+@router.put("/content/batch", response_model=List[ContentTagsBatchResult], summary="批量设置多个内容的标签")
+def batch_set_content_tags(
+    data: ContentTagsBatchUpdate,
+    tag_service: TagService = Depends(get_tag_service),
+):
+    """在一个事务中为多个内容设置标签（每个内容的标签整体替换）"""
+    results = tag_service.batch_set_content_tags(
+        [(item.content_type, item.content_id, item.tag_ids) for item in data.items]
+    )
+    return [
+        {
+            "content_type": item.content_type,
+            "content_id": item.content_id,
+            "tags": [tag.to_dict() for tag in tags],
+        }
+        for item, tags in zip(data.items, results)
+    ]
+
+
 @router.get("/content/{content_type}/{content_id}", response_model=List[TagResponse], summary="获取内容的标签")
-def get_content_tags(
+async def get_content_tags(
     content_type: ContentType,
     content_id: str,
-    tag_service: TagService = Depends(get_tag_service),
+    tag_service: AsyncTagService = Depends(get_async_tag_service),
 ):
     """获取指定内容的所有标签"""
-    tags = tag_service.get_content_tags(content_type, content_id)
+    tags = await tag_service.get_content_tags(content_type, content_id)
     return [tag.to_dict() for tag in tags]
 
 
@@ -267,149 +295,4 @@ def get_contents_by_tag_name(
         "galleries": [...]
     }
     """
-    from ..models.tag_db import Tag, ContentTag
-    from ..models.article import Article
-    from ..models.video import Video
-    from ..models.gallery_db import PhotoGroup
-    from ..models.schedule_db import Schedule
-
-    # 查找标签(按显示名称匹配)
-    tag = db.query(Tag).filter(Tag.name == tag_name).first()
-    if not tag:
-        return {
-            "tag_name": tag_name,
-            "articles": [],
-            "videos": [],
-            "galleries": [],
-            "schedules": []
-        }
-
-    # 获取所有关联的内容ID
-    content_tags = db.query(ContentTag).filter(ContentTag.tag_id == tag.id).all()
-
-    # 分类存储ID
-    article_ids = []
-    video_ids = []
-    gallery_ids = []
-    schedule_ids = []
-
-    for ct in content_tags:
-        if ct.content_type == "article":
-            article_ids.append(ct.content_id)
-        elif ct.content_type == "video":
-            video_ids.append(ct.content_id)
-        elif ct.content_type == "gallery":
-            gallery_ids.append(ct.content_id)
-        elif ct.content_type == "schedule":
-            schedule_ids.append(ct.content_id)
-
-    # 查询文章
-    articles = []
-    if article_ids:
-        articles_query = db.query(Article).filter(
-            Article.id.in_(article_ids),
-            Article.is_deleted == False,
-            Article.is_published == True
-        ).limit(limit).all()
-
-        articles = [{
-            "id": str(a.id),
-            "title": a.title,
-            "slug": a.slug,
-            "excerpt": a.excerpt,
-            "cover_url": a.cover_url,
-            "author": a.author,
-            "category_primary": a.category_primary,
-            "category_secondary": a.category_secondary,
-            "created_at": a.created_at.isoformat() if a.created_at else None,
-            "view_count": a.view_count or 0
-        } for a in articles_query]
-
-    # 查询视频
-    videos = []
-    if video_ids:
-        videos_query = db.query(Video).filter(
-            Video.id.in_(video_ids),
-            Video.is_published == 1
-        ).limit(limit).all()
-
-        videos = [{
-            "id": str(v.id),
-            "title": v.title,
-            "description": v.description,
-            "cover_url": v.cover_url,
-            "video_url": v.bvid,
-            "author": v.author,
-            "category": v.category,
-            "created_at": v.created_at.isoformat() if v.created_at else None,
-            "view_count": 0
-        } for v in videos_query]
-
-    # 查询相册
-    galleries = []
-    if gallery_ids:
-        galleries_query = db.query(PhotoGroup).filter(
-            PhotoGroup.id.in_(gallery_ids),
-            PhotoGroup.is_deleted == False,
-            PhotoGroup.is_published == True
-        ).limit(limit).all()
-
-        from ..models.gallery_db import Photo
-        galleries = []
-        for g in galleries_query:
-            photo_count = db.query(Photo).filter(
-                Photo.photo_group_id == g.id,
-                Photo.is_deleted == False
-            ).count()
-
-            galleries.append({
-                "id": str(g.id),
-                "title": g.title,
-                "name": g.title,
-                "description": g.description,
-                "cover_image_url": g.cover_image_url,
-                "cover_image_thumb_url": g.cover_image_thumb_url,
-                "category": g.category,
-                "created_at": g.created_at.isoformat() if g.created_at else None,
-                "photo_count": photo_count
-            })
-
-    # 查询行程
-    schedules = []
-    if schedule_ids:
-        normalized_ids = []
-        for sid in schedule_ids:
-            try:
-                normalized_ids.append(int(sid))
-            except (TypeError, ValueError):
-                pass
-
-        if normalized_ids:
-            schedules_query = db.query(Schedule).filter(
-                Schedule.id.in_(normalized_ids),
-                Schedule.is_published == 1,
-                Schedule.review_status == 'approved'
-            ).order_by(
-                Schedule.date.desc()
-            ).limit(limit).all()
-
-            schedules = [{
-                "id": schedule.id,
-                "theme": schedule.theme,
-                "date": schedule.date,
-                "city": schedule.city,
-                "venue": schedule.venue,
-                "category": schedule.category,
-                "image": schedule.image,
-                "image_thumb": schedule.image_thumb,
-                "description": schedule.description,
-                "created_at": schedule.created_at.isoformat() if schedule.created_at else None
-            } for schedule in schedules_query]
-
-    return {
-        "tag_name": tag_name,
-        "articles": articles,
-        "videos": videos,
-        "galleries": galleries,
-        "schedules": schedules
-    }
+    return resolve_tag_contents(db, tag_name, limit)
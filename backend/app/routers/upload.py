@@ -3,14 +3,16 @@
 文件上传路由
 """
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from typing import Dict
+from typing import Any, Dict
 
+from app.core.executors import run_image_task, run_storage_task
+from app.services.image_dedup import KIND_EDITOR, ImageAssetInfo, find_image_asset, save_image_asset
 from app.services.storage import get_storage
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
 
-@router.post("/image", response_model=Dict[str, str])
+@router.post("/image", response_model=Dict[str, Any])
 async def upload_image(file: UploadFile = File(...)):
     """
     上传图片
@@ -20,15 +22,15 @@ async def upload_image(file: UploadFile = File(...)):
     - 返回图片访问 URL
     """
     # 检查文件类型
-allowed_types = [
-    "image/jpeg",
-    "image/png",
-    "image/gif",
-    "image/webp",
-    "image/heic",
-    "image/heif",
-    "image/bmp",
-]
+    allowed_types = [
+        "image/jpeg",
+        "image/png",
+        "image/gif",
+        "image/webp",
+        "image/heic",
+        "image/heif",
+        "image/bmp",
+    ]
     if file.content_type not in allowed_types:
         raise HTTPException(
             status_code=400,
@@ -47,15 +49,36 @@ allowed_types = [
         # 获取存储实例
         storage = get_storage()
 
-        # 上传并压缩图片
-        url = storage.upload_image(content, file.filename or "image")
+        # 相同内容已上传过时直接返回已有URL，不再压缩和上传
+        digest, existing = await find_image_asset(content, KIND_EDITOR)
+        if existing is not None:
+            return {
+                "url": existing.original_url,
+                "filename": file.filename,
+                "message": "上传成功",
+                "encodes": 0
+            }
+
+        # 压缩图片（CPU 密集）与上传（阻塞 I/O）分别在对应的执行器中运行
+        compressed = await run_image_task(storage.compress_image_with_stats, content, max_size_mb=1.0)
+        object_name = storage.generate_filename(file.filename or "image", "jpg")
+        url = await run_storage_task(storage.upload_bytes, compressed.data, object_name)
+        asset = await save_image_asset(digest, KIND_EDITOR, ImageAssetInfo(
+            original_url=url,
+            file_size=len(compressed.data),
+            width=compressed.width,
+            height=compressed.height,
+        ), storage.backend)
 
         return {
-            "url": url,
+            "url": asset.original_url,
             "filename": file.filename,
-            "message": "上传成功"
+            "message": "上传成功",
+            "encodes": compressed.encodes
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ 上传失败: {e}")
         raise HTTPException(
@@ -70,10 +93,11 @@ async def delete_image(url: str):
     删除图片
 
     - 根据 URL 删除图片
+    - 相同内容的图片被多处引用时只减少引用，最后一处删除时才删除文件
     """
     try:
         storage = get_storage()
-        success = storage.delete_image(url)
+        success = await run_storage_task(storage.delete_image, url)
 
         if success:
             return {"message": "删除成功"}
@@ -1,40 +1,45 @@
 # -*- coding: utf-8 -*-
 """视频管理路由"""
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-import os
-import tempfile
-from pathlib import Path
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..core.permissions import require_admin
 from ..core.dependencies import get_current_user
 from ..models.user_db import User
 from ..models.video import VideoCategory
 from ..schemas.video import VideoCreate, VideoUpdate, Video as VideoSchema
 from ..schemas.gallery import UploadResponse
-from ..crud.video import get_video, get_videos, get_videos_count, create_video, update_video, delete_video, get_videos_by_author, get_all_videos_admin
-from ..utils.bilibili import extract_bvid, get_video_info
-from ..services.image_processing import ImageProcessor
-from ..services.storage_service import (
-    get_storage_service,
-    generate_video_cover_path
+from ..crud.video import (
+    get_video_async,
+    get_videos_async,
+    get_videos_count_async,
+    create_video,
+    update_video,
+    delete_video,
+    get_videos_by_author,
+    get_all_videos_admin
 )
+from ..services.bilibili_fetcher import get_bilibili_fetcher
+from ..services.image_upload import read_image_upload, upload_image_variants
+from ..services.storage_service import generate_video_cover_path
 
 router = APIRouter(prefix="/api/videos", tags=["videos"])
 
 
 @router.get("/", response_model=List[VideoSchema])
-def list_videos(
+async def list_videos(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     category: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取视频列表"""
-    videos = get_videos(db=db, skip=skip, limit=limit, category=category)
+    videos = await get_videos_async(db=db, skip=skip, limit=limit, category=category)
     return videos
 
 
@@ -78,32 +83,32 @@ def get_all_videos(
 
 
 @router.get("/count")
-def get_videos_count_endpoint(
+async def get_videos_count_endpoint(
     category: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取视频总数"""
-    count = get_videos_count(db=db, category=category)
+    count = await get_videos_count_async(db=db, category=category)
     return {"count": count}
 
 
 @router.get("/parse-bilibili")
-def parse_bilibili_video(
+async def parse_bilibili_video(
     bvid: str = Query(..., description="B站视频BV号或链接")
 ):
     """
     解析B站视频信息
     从B站API获取视频标题、描述、作者、发布时间等信息
     """
-    from datetime import datetime
+    fetcher = get_bilibili_fetcher()
 
     # 提取BV号
-    extracted_bvid = extract_bvid(bvid)
+    extracted_bvid = await fetcher.extract_bvid(bvid)
     if not extracted_bvid:
         raise HTTPException(status_code=400, detail="无效的B站视频链接或BV号")
 
     # 获取视频信息
-    video_info = get_video_info(extracted_bvid)
+    video_info = await fetcher.get_video_info(extracted_bvid)
     if not video_info:
         raise HTTPException(status_code=404, detail="无法获取视频信息，请检查BV号是否正确")
 
@@ -128,17 +133,25 @@ def parse_bilibili_video(
 
 
 @router.get("/{video_id}", response_model=VideoSchema)
-def get_video_endpoint(
+async def get_video_endpoint(
     video_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取视频详情"""
-    video = get_video(db=db, video_id=video_id)
+    video = await get_video_async(db=db, video_id=video_id)
     if not video:
         raise HTTPException(status_code=404, detail="视频不存在")
     return video
 
 
+async def _extract_bvid(url_or_bvid: str) -> Optional[str]:
+    return await get_bilibili_fetcher().extract_bvid(url_or_bvid)
+
+
+async def _get_video_info(bvid: str) -> Optional[dict]:
+    return await get_bilibili_fetcher().get_video_info(bvid)
+
+
 @router.post("/", response_model=VideoSchema)
 def create_video_endpoint(
     video: VideoCreate,
@@ -151,7 +164,8 @@ def create_video_endpoint(
         raise HTTPException(status_code=400, detail="无效的视频分类")
 
     # 从输入中提取BV号（支持URL或纯BV号）
-    bvid = extract_bvid(video.bvid)
+    # 同步路由运行在线程池中，通过 anyio 在事件循环里调用共享的异步抓取器
+    bvid = anyio.from_thread.run(_extract_bvid, video.bvid)
     if not bvid:
         raise HTTPException(status_code=400, detail="无效的B站视频链接或BV号")
 
@@ -162,7 +176,7 @@ def create_video_endpoint(
         raise HTTPException(status_code=400, detail="该视频已存在")
 
     # 尝试从B站API获取视频信息（封面、标题等）
-    bilibili_info = get_video_info(bvid)
+    bilibili_info = anyio.from_thread.run(_get_video_info, bvid)
 
     # 使用B站信息补充数据
     video_data = video.dict()
@@ -233,80 +247,13 @@ async def upload_video_cover(
     - 自动上传到 OSS
     - 返回 3 个尺寸的 URL
     """
-    # 验证文件类型
-    allowed_types = [
-        "image/jpeg",
-        "image/jpg",
-        "image/png",
-        "image/webp",
-        "image/gif",
-        "image/bmp",
-        "image/heic",
-        "image/heif",
-    ]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"不支持的文件类型：{file.content_type}，仅支持 JPEG, PNG, WebP"
-        )
-
-    # 验证文件大小（最大20MB）
-    content = await file.read()
-    if len(content) > 20 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="文件大小不能超过 20MB")
-
-    temp_dir = None
-    try:
-        # 1. 保存临时文件
-        temp_dir = tempfile.mkdtemp()
-        temp_input_path = os.path.join(temp_dir, file.filename or "cover.jpg")
-
-        with open(temp_input_path, 'wb') as f:
-            f.write(content)
-
-        # 2. 处理图片（生成 3 种尺寸）
-        temp_output_dir = os.path.join(temp_dir, "processed")
-        original_path, medium_path, thumb_path, width, height = ImageProcessor.process_image(
-            input_path=temp_input_path,
-            output_dir=temp_output_dir,
-            filename_base=video_id
-        )
-
-        # 3. 上传到OSS（使用新的可读性命名）
-        storage = get_storage_service()
-
-        # 上传 3 种尺寸
-        original_oss_path = generate_video_cover_path(video_id, "original")
-        medium_oss_path = generate_video_cover_path(video_id, "medium")
-        thumb_oss_path = generate_video_cover_path(video_id, "thumb")
-
-        original_url = storage.upload_file(original_path, original_oss_path)
-        medium_url = storage.upload_file(medium_path, medium_oss_path)
-        thumb_url = storage.upload_file(thumb_path, thumb_oss_path)
-
-        # 4. 获取文件信息
-        file_size = ImageProcessor.get_file_size(original_path)
-
-        # 5. 返回结果
-        return UploadResponse(
-            success=True,
-            message="视频封面上传成功",
-            file_url=original_url,
-            thumb_url=thumb_url,
-            medium_url=medium_url,
-            file_size=file_size,
-            width=width,
-            height=height
-        )
-
-    except Exception as e:
-        import traceback
-        error_detail = f"上传失败：{str(e)}\n{traceback.format_exc()}"
-        print(error_detail)
-        raise HTTPException(status_code=500, detail=f"上传失败：{str(e)}")
-
-    finally:
-        # 清理临时文件
-        if temp_dir and os.path.exists(temp_dir):
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+    content = await read_image_upload(file)
+
+    # 上传到OSS（使用新的可读性命名）
+    return await upload_image_variants(
+        content,
+        generate_video_cover_path(video_id, "original"),
+        generate_video_cover_path(video_id, "medium"),
+        generate_video_cover_path(video_id, "thumb"),
+        message="视频封面上传成功"
+    )
@@ -84,3 +84,9 @@ class ArticleSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+# 全文检索结果：在列表字段基础上附带相关度与高亮片段
+class ArticleSearchResult(ArticleSummary):
+    score: float = 0.0  # 相关度（MySQL 全文索引得分）
+    title_highlight: Optional[str] = None  # 高亮后的标题（HTML，命中词用 <mark> 包裹）
+    content_highlight: Optional[str] = None  # 正文命中片段（HTML）
@@ -19,6 +19,10 @@ class PhotoCreate(PhotoBase):
     image_url: str
     image_thumb_url: Optional[str] = None
     image_medium_url: Optional[str] = None
+    image_thumb_webp_url: Optional[str] = None
+    image_medium_webp_url: Optional[str] = None
+    image_thumb_avif_url: Optional[str] = None
+    image_medium_avif_url: Optional[str] = None
     file_size: Optional[int] = None
     width: Optional[int] = None
     height: Optional[int] = None
@@ -42,6 +46,10 @@ class Photo(PhotoBase):
     image_url: str
     image_thumb_url: Optional[str]
     image_medium_url: Optional[str]
+    image_thumb_webp_url: Optional[str] = None
+    image_medium_webp_url: Optional[str] = None
+    image_thumb_avif_url: Optional[str] = None
+    image_medium_avif_url: Optional[str] = None
     file_size: Optional[int]
     width: Optional[int]
     height: Optional[int]
@@ -70,6 +78,8 @@ class PhotoGroupCreate(PhotoGroupBase):
     """创建照片组Schema"""
     cover_image_url: Optional[str] = None
     cover_image_thumb_url: Optional[str] = None
+    cover_image_thumb_webp_url: Optional[str] = None
+    cover_image_thumb_avif_url: Optional[str] = None
     storage_type: str = "local"
     is_published: bool = True
     author_id: Optional[str] = None
@@ -86,6 +96,8 @@ class PhotoGroupUpdate(BaseModel):
     description: Optional[str] = None
     cover_image_url: Optional[str] = None
     cover_image_thumb_url: Optional[str] = None
+    cover_image_thumb_webp_url: Optional[str] = None
+    cover_image_thumb_avif_url: Optional[str] = None
     is_published: Optional[bool] = None
 
 
@@ -94,6 +106,8 @@ class PhotoGroup(PhotoGroupBase):
     id: str
     cover_image_url: Optional[str]
     cover_image_thumb_url: Optional[str]
+    cover_image_thumb_webp_url: Optional[str] = None
+    cover_image_thumb_avif_url: Optional[str] = None
     storage_type: str
     is_published: bool
     is_deleted: bool
@@ -127,6 +141,10 @@ class UploadResponse(BaseModel):
     file_url: Optional[str] = None
     thumb_url: Optional[str] = None
     medium_url: Optional[str] = None
+    thumb_webp_url: Optional[str] = None
+    medium_webp_url: Optional[str] = None
+    thumb_avif_url: Optional[str] = None
+    medium_avif_url: Optional[str] = None
     file_size: Optional[int] = None
     width: Optional[int] = None
     height: Optional[int] = None
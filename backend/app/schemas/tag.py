@@ -83,6 +83,23 @@ class ContentTagResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ContentTagsBatchItem(BaseModel):
+    """批量设置标签中的单个内容"""
+    content_type: ContentType = Field(..., description='内容类型')
+    content_id: str = Field(..., min_length=1, max_length=64, description='内容ID')
+    tag_ids: List[int] = Field(default_factory=list, description='标签ID列表（替换现有标签）')
+
+
+class ContentTagsBatchUpdate(BaseModel):
+    items: List[ContentTagsBatchItem] = Field(..., min_length=1, max_length=500, description='待设置标签的内容列表')
+
+
+class ContentTagsBatchResult(BaseModel):
+    content_type: ContentType
+    content_id: str
+    tags: List[TagResponse] = []
+
+
 class ContentWithTags(BaseModel):
     """带标签的内容"""
     id: int
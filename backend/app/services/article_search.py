@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+文章全文检索
+
+- MySQL：使用 FULLTEXT 索引（ngram 分词，适配中文），按相关度排序，标题命中权重更高
+- 其他数据库（本地 SQLite 等）或过短的关键词：退化为 LIKE 匹配，仅按标题命中加权
+- 结果附带标题 / 正文高亮片段（<mark> 包裹命中词）
+
+索引定义见 models/article.py 与 migrations/009_add_article_fulltext_index.sql。
+"""
+import html
+import re
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import Select, and_, case, literal, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.article import Article
+from ..schemas.article import ArticleSearchResult, ArticleSummary
+
+# ngram 分词的 token 长度（MySQL 默认 ngram_token_size=2），短于此长度的词无法走全文索引
+NGRAM_TOKEN_SIZE = 2
+# 单次查询最多使用的关键词数
+MAX_TERMS = 8
+# 标题命中的额外权重
+TITLE_WEIGHT = 2.0
+# 正文高亮片段在命中位置前后保留的字符数
+SNIPPET_RADIUS = 60
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+# 布尔模式中的运算符，需从用户输入中剔除
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_MARKDOWN_SYMBOLS = re.compile(r'[#>*_`\[\]!]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def parse_terms(query_text: str) -> List[str]:
+    """将搜索输入拆分为去重后的关键词列表"""
+    cleaned = _BOOLEAN_OPERATORS.sub(' ', query_text or '')
+    terms: List[str] = []
+    for term in cleaned.split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _boolean_query(terms: Sequence[str]) -> str:
+    """构造布尔模式查询：每个词都必须以短语形式出现"""
+    return ' '.join(f'+"{term}"' for term in terms)
+
+
+def _base_filters():
+    return (
+        Article.is_deleted == False,
+        Article.is_published == True,
+    )
+
+
+def build_search_stmt(dialect_name: str, terms: Sequence[str], skip: int, limit: int) -> Select:
+    """根据数据库类型构造检索语句，返回 (Article, score) 行"""
+    use_fulltext = dialect_name == 'mysql' and all(len(term) >= NGRAM_TOKEN_SIZE for term in terms)
+
+    if use_fulltext:
+        against = _boolean_query(terms)
+        title_score = match(Article.title, against=against).in_boolean_mode()
+        body_score = match(Article.title, Article.content, against=against).in_boolean_mode()
+        score = (title_score * TITLE_WEIGHT + body_score).label('score')
+        return (
+            select(Article, score)
+            .where(*_base_filters(), body_score)
+            .order_by(score.desc(), Article.published_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+
+    conditions = [
+        or_(Article.title.contains(term), Article.content.contains(term))
+        for term in terms
+    ]
+    title_hits = [case((Article.title.contains(term), TITLE_WEIGHT), else_=0.0) for term in terms]
+    score = sum(title_hits[1:], title_hits[0]) if title_hits else literal(0.0)
+    score = score.label('score')
+    return (
+        select(Article, score)
+        .where(*_base_filters(), and_(*conditions))
+        .order_by(score.desc(), Article.published_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def _plain_text(content: str) -> str:
+    """去除 HTML 标签与常见 Markdown 符号，用于生成摘要片段"""
+    text = _HTML_TAG.sub(' ', content or '')
+    text = html.unescape(text)
+    text = _MARKDOWN_SYMBOLS.sub('', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def highlight(text: str, terms: Sequence[str]) -> str:
+    """HTML 转义文本并用 <mark> 包裹命中的关键词"""
+    if not text:
+        return ''
+    if not terms:
+        return html.escape(text)
+
+    pattern = re.compile('(' + '|'.join(re.escape(term) for term in terms) + ')', re.IGNORECASE)
+    parts = pattern.split(text)
+    # split 带捕获组时，奇数下标为命中部分
+    return ''.join(
+        f"{HIGHLIGHT_OPEN}{html.escape(part)}{HIGHLIGHT_CLOSE}" if index % 2 else html.escape(part)
+        for index, part in enumerate(parts)
+    )
+
+
+def snippet(content: str, terms: Sequence[str], radius: int = SNIPPET_RADIUS) -> str:
+    """截取正文中第一个命中位置附近的片段并高亮"""
+    text = _plain_text(content)
+    if not text:
+        return ''
+
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [pos for pos in positions if pos >= 0]
+    first = min(positions) if positions else 0
+
+    start = max(first - radius, 0)
+    end = min(first + radius * 2, len(text))
+    fragment = text[start:end]
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    return f"{prefix}{highlight(fragment, terms)}{suffix}"
+
+
+def build_results(rows: Sequence[Tuple[Article, float]], terms: Sequence[str]) -> List[ArticleSearchResult]:
+    """将 (Article, score) 行转换为带高亮的检索结果"""
+    results: List[ArticleSearchResult] = []
+    for article, score in rows:
+        summary = ArticleSummary.model_validate(article)
+        results.append(ArticleSearchResult(
+            **summary.model_dump(),
+            score=float(score or 0),
+            title_highlight=highlight(article.title, terms),
+            content_highlight=snippet(article.content, terms),
+        ))
+    return results
+
+
+def search_articles(db: Session, query_text: str, skip: int = 0, limit: int = 50) -> List[ArticleSearchResult]:
+    """全文检索已发布文章"""
+    terms = parse_terms(query_text)
+    if not terms:
+        return []
+
+    stmt = build_search_stmt(db.get_bind().dialect.name, terms, skip, limit)
+    return build_results(db.execute(stmt).all(), terms)
+
+
+async def search_articles_async(
+    db: AsyncSession,
+    query_text: str,
+    skip: int = 0,
+    limit: int = 50
+) -> List[ArticleSearchResult]:
+    """全文检索已发布文章（异步）"""
+    terms = parse_terms(query_text)
+    if not terms:
+        return []
+
+    stmt = build_search_stmt(db.get_bind().dialect.name, terms, skip, limit)
+    return build_results((await db.execute(stmt)).all(), terms)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+B站异步抓取
+
+视频信息解析（/api/videos/parse-bilibili、创建视频）和封面批量缓存共用：
+- 一个 httpx.AsyncClient，keep-alive 复用连接
+- 全局令牌桶限速（requests_per_second），代替固定的 sleep
+- 信号量限制同时进行的请求数
+- 连接错误、429/412/5xx 按指数退避重试（有 Retry-After 时优先使用）
+- 按 BV 号缓存视频信息；B站明确返回错误的BV号短时间负缓存，b23.tv 短链接解析结果长期缓存
+- 同一个 BV 号 / 短链接的并发查询共享一次上游请求
+
+api_base 和 transport 可替换，便于对着本地 mock 服务测试。
+"""
+import asyncio
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import httpx
+
+from ..core.config import get_settings
+from ..core.ttl_cache import TTLCache
+from ..utils.bilibili import BILIBILI_HEADERS, VIDEO_VIEW_PATH, match_bvid, parse_video_info
+
+# 需要退避重试的响应状态（412 为 B站风控拦截）
+RETRY_STATUS = {412, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+# 短链接（可能夹在 App 分享文案中，也可能没有 scheme）
+SHORT_LINK_PATTERN = re.compile(r'(?:https?://)?b23\.tv/([A-Za-z0-9]+)')
+
+
+class AsyncRateLimiter:
+    """令牌桶：平均每秒 rate 个请求，允许 burst 个突发"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        # 持锁等待，保证排队的请求按先后顺序拿到令牌
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BilibiliFetcher:
+    """B站接口与封面图的异步抓取器"""
+
+    def __init__(
+        self,
+        *,
+        api_base: Optional[str] = None,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: float = 0.5,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        settings = get_settings()
+        self.api_base = (api_base or settings.bilibili_api_base).rstrip('/')
+        self.max_retries = settings.bilibili_max_retries if max_retries is None else max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_retry_after_seconds = settings.bilibili_max_retry_after_seconds
+        concurrency = max_concurrency or settings.bilibili_max_concurrency
+        self._rate_limiter = AsyncRateLimiter(
+            settings.bilibili_requests_per_second if requests_per_second is None else requests_per_second,
+            burst or settings.bilibili_rate_burst,
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            headers=BILIBILI_HEADERS,
+            timeout=timeout or settings.bilibili_request_timeout_seconds,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+        # 值为空字典表示负缓存（B站返回视频不存在等错误）
+        self.video_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            max_size=settings.bilibili_video_cache_max_size,
+            ttl_seconds=settings.bilibili_video_cache_ttl_seconds,
+        )
+        self.negative_ttl_seconds = settings.bilibili_negative_cache_ttl_seconds
+        # 值为空字符串表示短链接无法解析出BV号
+        self.short_link_cache: TTLCache[str] = TTLCache(
+            max_size=settings.bilibili_video_cache_max_size,
+            ttl_seconds=settings.bilibili_short_link_cache_ttl_seconds,
+        )
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def __aenter__(self) -> "BilibiliFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_retry_after_seconds)
+        return self.backoff_seconds * (2 ** attempt) + random.uniform(0, self.backoff_seconds)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """限速、限并发并带重试的请求；最终失败时抛出 httpx 异常"""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                await self._rate_limiter.acquire()
+                async with self._semaphore:
+                    response = await self._client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(self._retry_delay(attempt, response))
+        raise RuntimeError("unreachable")
+
+    async def _shared(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """同一 key 的并发调用共享一次执行；调用方被取消不影响其他等待者"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def get_video_info(self, bvid: str) -> Optional[Dict[str, Any]]:
+        """获取视频信息（字段同 utils.bilibili.get_video_info），失败返回 None"""
+        if not bvid:
+            return None
+        cached = self.video_cache.get(bvid)
+        if cached is not None:
+            return cached or None
+        return await self._shared(("video", bvid), lambda: self._fetch_video_info(bvid))
+
+    async def _fetch_video_info(self, bvid: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = await self.request('GET', f"{self.api_base}{VIDEO_VIEW_PATH}", params={'bvid': bvid})
+            info = parse_video_info(response.json())
+        except httpx.HTTPError as e:
+            # 网络错误、风控等临时失败不缓存
+            print(f"请求B站API失败: {e}")
+            return None
+        except Exception as e:
+            print(f"解析B站视频信息失败: {e}")
+            return None
+
+        if info is None:
+            # B站明确返回错误（视频不存在、BV号无效），短时间内不再请求
+            self.video_cache.set(bvid, {}, ttl_seconds=self.negative_ttl_seconds)
+        else:
+            self.video_cache.set(bvid, info)
+        return info
+
+    async def resolve_short_link(self, url: str) -> Optional[str]:
+        """解析 b23.tv 短链接，返回跳转后链接中的BV号"""
+        match = SHORT_LINK_PATTERN.search(url)
+        if not match:
+            return None
+        # 统一为 https://b23.tv/{code} 作为缓存键，忽略分享参数
+        key = f"https://b23.tv/{match.group(1)}"
+        cached = self.short_link_cache.get(key)
+        if cached is not None:
+            return cached or None
+        return await self._shared(("short_link", key), lambda: self._fetch_short_link(key))
+
+    async def _fetch_short_link(self, url: str) -> Optional[str]:
+        try:
+            response = await self.request('HEAD', url, follow_redirects=True)
+        except httpx.HTTPError as e:
+            print(f"解析短链接失败: {e}")
+            return None
+        match = re.search(r'BV[a-zA-Z0-9]+', str(response.url))
+        if match:
+            self.short_link_cache.set(url, match.group(0))
+            return match.group(0)
+        self.short_link_cache.set(url, "", ttl_seconds=self.negative_ttl_seconds)
+        return None
+
+    async def extract_bvid(self, url_or_bvid: str) -> Optional[str]:
+        """从BV号、视频链接或 b23.tv 短链接中提取BV号"""
+        url_or_bvid = url_or_bvid.strip()
+        bvid = match_bvid(url_or_bvid)
+        if bvid:
+            return bvid
+        if 'b23.tv' in url_or_bvid:
+            return await self.resolve_short_link(url_or_bvid)
+        return None
+
+    async def download(self, url: str) -> Optional[bytes]:
+        """下载图片等二进制内容，失败返回 None"""
+        try:
+            response = await self.request('GET', url)
+            return response.content
+        except httpx.HTTPError as e:
+            print(f"下载图片失败 {url}: {e}")
+            return None
+
+
+_fetcher: Optional[BilibiliFetcher] = None
+
+
+def get_bilibili_fetcher() -> BilibiliFetcher:
+    """应用内共享的抓取器（需在事件循环中首次调用）"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = BilibiliFetcher()
+    return _fetcher
+
+
+async def close_bilibili_fetcher() -> None:
+    global _fetcher
+    if _fetcher is not None:
+        await _fetcher.aclose()
+        _fetcher = None
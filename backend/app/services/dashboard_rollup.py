@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+仪表盘每日汇总（daily_stats）的维护
+
+仪表盘原先每次加载对 users / articles 做十余次 COUNT（含 created_at 范围扫描），
+现在改为读取按天预先统计的汇总行，代价只与天数和分类数有关，与表大小无关。
+
+维护方式：
+- 写入时标记：Session after_flush 钩子记录新增 / 删除的用户、文章、行程，
+  以及审核状态、删除标记、分类发生变化的文章所在的日期（按 created_at 的 UTC 日期）
+- 按天重算：被标记的日期在一条 GROUP BY 中按天重新统计后整体替换汇总行，
+  操作是幂等的，重复重算或并发重算不会累积误差
+- 定时整理：后台任务每隔 dashboard_rollup_interval_seconds 重算被标记的日期和当天
+  （当天总会重算，覆盖其他进程或绕过 ORM 的新增）；读取仪表盘前也会先处理本进程的标记
+- 首次启动时汇总表为空则全量重建；也可以运行 backend/rebuild_dashboard_stats.py 手动重建
+"""
+import asyncio
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import and_, event, func, inspect, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.executors import run_storage_task
+from ..database import SessionLocal
+from ..models.article import Article
+from ..models.daily_stat import DailyStat
+from ..models.schedule_db import Schedule
+from ..models.user_db import User
+
+METRIC_USERS = "users"
+METRIC_ARTICLES = "articles"
+METRIC_SCHEDULES = "schedules"
+
+
+class RollupSource(NamedTuple):
+    metric: str
+    model: Any
+    category_column: Any  # 分类 / 状态两个维度要么都拆分，要么都为 None
+    status_column: Any
+    conditions: Tuple[Any, ...]
+    tracked_fields: Tuple[str, ...]  # 这些字段变化时需要重算所在日期
+
+
+ROLLUP_SOURCES: Dict[str, RollupSource] = {
+    METRIC_USERS: RollupSource(METRIC_USERS, User, None, None, (), ('created_at',)),
+    METRIC_ARTICLES: RollupSource(
+        METRIC_ARTICLES,
+        Article,
+        Article.category_primary,
+        Article.review_status,
+        (Article.is_deleted == False,),  # noqa: E712
+        ('created_at', 'is_deleted', 'review_status', 'category_primary'),
+    ),
+    METRIC_SCHEDULES: RollupSource(METRIC_SCHEDULES, Schedule, None, None, (), ('created_at',)),
+}
+_SOURCE_BY_MODEL = {source.model: source for source in ROLLUP_SOURCES.values()}
+
+_settings = get_settings()
+_pending_lock = threading.Lock()
+_pending_days: Dict[str, Set[date]] = {}
+_compactor_task: Optional[asyncio.Task] = None
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        return date.fromisoformat(value[:10])
+    return None
+
+
+# ==================== 变更标记 ====================
+
+def mark_dirty(metric: str, day: Optional[date]) -> None:
+    """标记某个指标某一天的汇总需要重算"""
+    if day is None:
+        return
+    with _pending_lock:
+        _pending_days.setdefault(metric, set()).add(day)
+
+
+def _mark_instance(source: RollupSource, obj: Any, changed_only: bool) -> None:
+    state = inspect(obj)
+    if changed_only and not any(
+        state.attrs[field].history.has_changes() for field in source.tracked_fields
+    ):
+        return
+    history = state.attrs.created_at.history
+    days = {_to_date(value) for value in (*history.added, *history.unchanged, *history.deleted)}
+    if not days - {None}:
+        days = {datetime.utcnow().date()}
+    for day in days:
+        mark_dirty(source.metric, day)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_rollup_changes(session: Session, flush_context: Any) -> None:
+    # after_flush 时 new / dirty / deleted 与属性历史仍是本次 flush 前的状态
+    for objects, changed_only in ((session.new, False), (session.deleted, False), (session.dirty, True)):
+        for obj in objects:
+            source = _SOURCE_BY_MODEL.get(type(obj))
+            if source is not None:
+                _mark_instance(source, obj, changed_only)
+
+
+def _take_pending() -> Dict[str, Set[date]]:
+    global _pending_days
+    with _pending_lock:
+        pending, _pending_days = _pending_days, {}
+    return pending
+
+
+def _restore_pending(pending: Dict[str, Set[date]]) -> None:
+    with _pending_lock:
+        for metric, days in pending.items():
+            _pending_days.setdefault(metric, set()).update(days)
+
+
+# ==================== 重算 ====================
+
+def _count_by_day(db: Session, source: RollupSource, days: Optional[Iterable[date]] = None) -> List[DailyStat]:
+    """按天（及分类、状态）统计源表；days 为 None 时统计全表"""
+    created_at = source.model.created_at
+    day_column = func.date(created_at)
+    dimensions = [column for column in (source.category_column, source.status_column) if column is not None]
+    stmt = (
+        select(day_column, *dimensions, func.count())
+        .where(*source.conditions)
+        .group_by(day_column, *dimensions)
+    )
+    if days is not None:
+        # 每天一个 created_at 区间，走 created_at 索引
+        stmt = stmt.where(or_(*[
+            and_(created_at >= datetime.combine(day, datetime.min.time()),
+                 created_at < datetime.combine(day + timedelta(days=1), datetime.min.time()))
+            for day in days
+        ]))
+
+    rows = []
+    for stat_day, *dimension_values, count in db.execute(stmt).all():
+        stat_date = _to_date(stat_day)
+        if stat_date is None:
+            continue
+        category, review_status = dimension_values if dimension_values else (None, None)
+        rows.append(DailyStat(
+            stat_date=stat_date,
+            metric=source.metric,
+            category=category or '',
+            review_status=review_status or '',
+            count=count,
+        ))
+    return rows
+
+
+def recompute_days(db: Session, metric: str, days: Iterable[date]) -> int:
+    """重算指定日期的汇总行（调用方负责提交），返回写入的行数"""
+    days = sorted(set(days))
+    if not days:
+        return 0
+    source = ROLLUP_SOURCES[metric]
+    rows = _count_by_day(db, source, days)
+    db.query(DailyStat).filter(
+        DailyStat.metric == metric,
+        DailyStat.stat_date.in_(days),
+    ).delete(synchronize_session=False)
+    db.add_all(rows)
+    return len(rows)
+
+
+def rebuild_rollups(db: Session) -> int:
+    """全量重建所有汇总行并提交，返回写入的行数"""
+    written = 0
+    for source in ROLLUP_SOURCES.values():
+        rows = _count_by_day(db, source)
+        db.query(DailyStat).filter(DailyStat.metric == source.metric).delete(synchronize_session=False)
+        db.add_all(rows)
+        written += len(rows)
+    db.commit()
+    return written
+
+
+def ensure_rollups(db: Session) -> bool:
+    """汇总表为空时全量重建，返回是否执行了重建"""
+    if db.query(DailyStat.id).first() is not None:
+        return False
+    rebuild_rollups(db)
+    return True
+
+
+def compact_rollups(db: Session, include_today: bool = True) -> int:
+    """
+    重算被标记的日期（include_today 时连同当天）并提交
+
+    失败时回滚并保留标记，下一次整理重试；返回重算的 (指标, 日期) 数量
+    """
+    pending = _take_pending()
+    if include_today:
+        today = datetime.utcnow().date()
+        for metric in ROLLUP_SOURCES:
+            pending.setdefault(metric, set()).add(today)
+    if not pending:
+        return 0
+    try:
+        for metric, days in pending.items():
+            recompute_days(db, metric, days)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        _restore_pending(pending)
+        raise
+    return sum(len(days) for days in pending.values())
+
+
+def flush_pending_rollups(db: Session) -> None:
+    """读取汇总前处理本进程的标记，保证能看到自己刚写入的变化"""
+    with _pending_lock:
+        if not _pending_days:
+            return
+    try:
+        compact_rollups(db, include_today=False)
+    except SQLAlchemyError as exc:
+        # 读取不因整理失败而报错，标记保留给后台任务
+        print(f"⚠️ 仪表盘汇总整理失败: {exc}")
+
+
+# ==================== 后台整理任务 ====================
+
+def _compact_in_new_session(include_today: bool = True) -> int:
+    db = SessionLocal()
+    try:
+        return compact_rollups(db, include_today=include_today)
+    finally:
+        db.close()
+
+
+def _ensure_in_new_session() -> bool:
+    db = SessionLocal()
+    try:
+        return ensure_rollups(db)
+    finally:
+        db.close()
+
+
+async def _compactor_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_storage_task(_compact_in_new_session)
+        except Exception as exc:  # 整理失败不应终止循环
+            print(f"⚠️ 仪表盘汇总整理失败: {exc}")
+
+
+async def start_rollup_compactor() -> None:
+    """启动时补建汇总表并启动定时整理"""
+    global _compactor_task
+    try:
+        if await run_storage_task(_ensure_in_new_session):
+            print("✅ 已全量重建仪表盘每日汇总")
+    except Exception as exc:
+        print(f"⚠️ 仪表盘汇总重建失败: {exc}")
+
+    interval = _settings.dashboard_rollup_interval_seconds
+    if interval > 0 and _compactor_task is None:
+        _compactor_task = asyncio.create_task(_compactor_loop(interval))
+
+
+async def stop_rollup_compactor() -> None:
+    """停止定时整理，并把本进程尚未处理的标记写入汇总表"""
+    global _compactor_task
+    if _compactor_task is not None:
+        _compactor_task.cancel()
+        try:
+            await _compactor_task
+        except asyncio.CancelledError:
+            pass
+        _compactor_task = None
+    try:
+        await run_storage_task(_compact_in_new_session, False)
+    except Exception as exc:
+        print(f"⚠️ 仪表盘汇总整理失败: {exc}")
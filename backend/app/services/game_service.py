@@ -1,90 +1,159 @@
 # -*- coding: utf-8 -*-
 import json
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from typing import AbstractSet, FrozenSet, List, Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime
 import os
 
 # 游戏相关的业务逻辑
 
-
-class LyricsGuesser:
-    """歌词猜歌名游戏"""
-
-    def __init__(self, lyrics_file_path: str = "frontend/public/data/song-lyrics.json"):
-        self.lyrics_file_path = lyrics_file_path
-        self.songs_data = self._load_songs()
-
-    def _load_songs(self) -> List[Dict[str, Any]]:
-        """从JSON加载歌曲数据"""
+DEFAULT_LYRICS_FILE = "frontend/public/data/song-lyrics.json"
+
+# 填词游戏候选词需去除的标点
+LYRIC_PUNCTUATION = '，。！？；：、,.!?;:"\'“”‘’'
+
+
+def _resolve_data_path(relative_path: str) -> str:
+    """将相对项目根目录的路径转换为绝对路径"""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    return os.path.join(project_root, relative_path)
+
+
+def _sample_distinct(pool: Sequence[str], members: AbstractSet[str], exclude: str, k: int) -> List[str]:
+    """
+    从去重后的池中随机抽取 k 个互不相同且不等于 exclude 的元素（期望 O(k)）
+
+    members 为 pool 的集合形式（由 LyricCorpus 预先构建），判断 exclude 是否在池中为 O(1)。
+    """
+    available = len(pool) - (1 if exclude in members else 0)
+    k = min(k, available)
+    picked: List[str] = []
+    seen = {exclude}
+    while len(picked) < k:
+        candidate = random.choice(pool)
+        if candidate not in seen:
+            seen.add(candidate)
+            picked.append(candidate)
+    return picked
+
+
+class LyricSong:
+    """预处理后的单首歌曲（只读）"""
+
+    __slots__ = ('id', 'title', 'album', 'lines', 'fill_lines')
+
+    def __init__(self, song_id: str, title: str, album: str, lyrics: str):
+        self.id = song_id
+        self.title = title
+        self.album = album
+        # 去除空行后的歌词行
+        self.lines: Tuple[str, ...] = tuple(line.strip() for line in lyrics.split('\n') if line.strip())
+        # 可用于填词的行：长度大于 2 且至少包含两个词
+        self.fill_lines: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (line, tuple(line.split()))
+            for line in self.lines
+            if len(line) > 2 and len(line.split()) >= 2
+        )
+
+
+class LyricCorpus:
+    """
+    歌词语料（只读，进程内只构建一次）
+
+    预先完成扁平化、分行、分词和去重，出题时只需随机抽样。
+    """
+
+    def __init__(self, songs: Sequence[LyricSong]):
+        self.songs: Tuple[LyricSong, ...] = tuple(songs)
+        self.titles: Tuple[str, ...] = tuple(dict.fromkeys(song.title for song in self.songs))
+        self.albums: Tuple[str, ...] = tuple(dict.fromkeys(song.album for song in self.songs))
+
+        vocabulary = dict.fromkeys(
+            word.strip(LYRIC_PUNCTUATION).strip()
+            for song in self.songs
+            for line in song.lines
+            for word in line.split()
+        )
+        vocabulary.pop('', None)
+        self.vocabulary: Tuple[str, ...] = tuple(vocabulary)
+
+        # 抽样池的集合形式，用于 O(1) 成员判断
+        self.title_set: FrozenSet[str] = frozenset(self.titles)
+        self.album_set: FrozenSet[str] = frozenset(self.albums)
+        self.vocabulary_set: FrozenSet[str] = frozenset(self.vocabulary)
+
+        # 各游戏可直接抽样的歌曲子集
+        self.multi_line_songs: Tuple[LyricSong, ...] = tuple(s for s in self.songs if len(s.lines) >= 2)
+        self.lyric_songs: Tuple[LyricSong, ...] = tuple(s for s in self.songs if s.lines)
+        self.fill_songs: Tuple[LyricSong, ...] = tuple(s for s in self.songs if s.fill_lines)
+
+    @classmethod
+    def from_file(cls, lyrics_file_path: str = DEFAULT_LYRICS_FILE) -> "LyricCorpus":
+        """从 song-lyrics.json 构建语料，文件缺失或损坏时返回空语料"""
         try:
-            # 获取项目根目录
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-            file_path = os.path.join(project_root, self.lyrics_file_path)
-
+            file_path = _resolve_data_path(lyrics_file_path)
             if not os.path.exists(file_path):
-                return []
+                return cls([])
 
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
-            # 将所有歌曲扁平化
-            songs = []
-            for album in data.get('albums', []):
-                for song in album.get('songs', []):
-                    songs.append({
-                        'id': song['id'],
-                        'title': song['title'],
-                        'lyrics': song['lyrics'],
-                        'album': album['name']
-                    })
-            return songs
+            return cls([
+                LyricSong(song['id'], song['title'], album['name'], song['lyrics'])
+                for album in data.get('albums', [])
+                for song in album.get('songs', [])
+            ])
         except Exception as e:
             print(f"加载歌词文件失败: {e}")
-            return []
+            return cls([])
+
+
+_corpus_cache: Dict[str, LyricCorpus] = {}
+
+
+def get_lyric_corpus(lyrics_file_path: str = DEFAULT_LYRICS_FILE) -> LyricCorpus:
+    """获取共享的歌词语料（同一文件只加载一次）"""
+    corpus = _corpus_cache.get(lyrics_file_path)
+    if corpus is None:
+        corpus = LyricCorpus.from_file(lyrics_file_path)
+        _corpus_cache[lyrics_file_path] = corpus
+    return corpus
+
+
+class LyricsGuesser:
+    """歌词猜歌名游戏"""
+
+    def __init__(self, corpus: Optional[LyricCorpus] = None):
+        self.corpus = corpus or get_lyric_corpus()
 
     def generate_question(self) -> Optional[Dict[str, Any]]:
         """生成一个游戏问题"""
-        if not self.songs_data:
+        if not self.corpus.multi_line_songs:
             return None
 
-        song = random.choice(self.songs_data)
-        lyrics_lines = [line.strip() for line in song['lyrics'].split('\n') if line.strip()]
-
-        if len(lyrics_lines) < 2:
-            return self.generate_question()
+        song = random.choice(self.corpus.multi_line_songs)
 
         # 随机选择1-3行歌词
-        num_lines = min(random.randint(1, 3), len(lyrics_lines))
-        selected_lyrics = random.sample(lyrics_lines, num_lines)
+        num_lines = min(random.randint(1, 3), len(song.lines))
+        selected_lyrics = random.sample(song.lines, num_lines)
 
         # 获取4个选项（包括正确答案）
-        options = self._get_options(song['title'], 4)
+        options = self._get_options(song.title, 4)
 
         return {
             'type': 'lyrics_guesser',
             'lyrics': '\n'.join(selected_lyrics),
             'options': options,
-            'correct_answer': song['title'],
-            'song_id': song['id'],
-            'album': song['album']
+            'correct_answer': song.title,
+            'song_id': song.id,
+            'album': song.album
         }
 
     def _get_options(self, correct_answer: str, count: int) -> List[str]:
         """获取选项（包括正确答案）"""
-        if not self.songs_data:
-            return [correct_answer]
-
-        options = {correct_answer}
-        all_titles = {song['title'] for song in self.songs_data}
-        all_titles.discard(correct_answer)
-
-        # 添加随机的错误选项
-        wrong_options = random.sample(list(all_titles), min(count - 1, len(all_titles)))
-        options.update(wrong_options)
+        options_list = [correct_answer] + _sample_distinct(self.corpus.titles, self.corpus.title_set, correct_answer, count - 1)
 
         # 随机打乱顺序
-        options_list = list(options)
         random.shuffle(options_list)
         return options_list
 
@@ -92,54 +161,18 @@ class LyricsGuesser:
 class FillLyrics:
     """填词游戏"""
 
-    def __init__(self, lyrics_file_path: str = "frontend/public/data/song-lyrics.json"):
-        self.lyrics_file_path = lyrics_file_path
-        self.songs_data = self._load_songs()
-
-    def _load_songs(self) -> List[Dict[str, Any]]:
-        """从JSON加载歌曲数据"""
-        try:
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-            file_path = os.path.join(project_root, self.lyrics_file_path)
-
-            if not os.path.exists(file_path):
-                return []
-
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            songs = []
-            for album in data.get('albums', []):
-                for song in album.get('songs', []):
-                    songs.append({
-                        'id': song['id'],
-                        'title': song['title'],
-                        'lyrics': song['lyrics'],
-                        'album': album['name']
-                    })
-            return songs
-        except Exception as e:
-            print(f"加载歌词文件失败: {e}")
-            return []
+    def __init__(self, corpus: Optional[LyricCorpus] = None):
+        self.corpus = corpus or get_lyric_corpus()
 
     def generate_question(self) -> Optional[Dict[str, Any]]:
         """生成填词问题"""
-        if not self.songs_data:
+        if not self.corpus.fill_songs:
             return None
 
-        song = random.choice(self.songs_data)
-        lyrics_lines = [line.strip() for line in song['lyrics'].split('\n') if line.strip() and len(line.strip()) > 2]
+        song = random.choice(self.corpus.fill_songs)
 
-        if not lyrics_lines:
-            return self.generate_question()
-
-        # 选择一行歌词
-        selected_line = random.choice(lyrics_lines)
-
-        # 分割成词语，找到合适的词语挖空
-        words = selected_line.split()
-        if len(words) < 2:
-            return self.generate_question()
+        # 选择一行歌词（已预先分好词）
+        selected_line, words = random.choice(song.fill_lines)
 
         # 随机选择一个词语挖空
         blank_index = random.randint(0, len(words) - 1)
@@ -157,32 +190,14 @@ class FillLyrics:
             'full_line': selected_line,
             'options': options,
             'correct_answer': correct_answer,
-            'song_title': song['title'],
-            'song_id': song['id'],
-            'album': song['album']
+            'song_title': song.title,
+            'song_id': song.id,
+            'album': song.album
         }
 
     def _get_options(self, correct_answer: str, count: int) -> List[str]:
-        """获取选项"""
-        options = {correct_answer}
-
-        # 从所有歌词中收集词语
-        all_words = set()
-        for song in self.songs_data:
-            words = song['lyrics'].split()
-            for word in words:
-                word = word.strip('，。！？；：""''').strip()
-                if len(word) > 0 and word != correct_answer:
-                    all_words.add(word)
-
-        # 添加随机词语作为错误选项
-        if all_words:
-            wrong_options = random.sample(list(all_words), min(count - 1, len(all_words)))
-        else:
-            wrong_options = []
-
-        options.update(wrong_options)
-        options_list = list(options)
+        """获取选项（从预构建的词表中抽取干扰项）"""
+        options_list = [correct_answer] + _sample_distinct(self.corpus.vocabulary, self.corpus.vocabulary_set, correct_answer, count - 1)
         random.shuffle(options_list)
         return options_list
 
@@ -190,78 +205,37 @@ class FillLyrics:
 class SongMatcher:
     """歌曲配对游戏 - 配对歌曲与专辑或歌词"""
 
-    def __init__(self, lyrics_file_path: str = "frontend/public/data/song-lyrics.json"):
-        self.lyrics_file_path = lyrics_file_path
-        self.songs_data = self._load_songs()
-
-    def _load_songs(self) -> List[Dict[str, Any]]:
-        """从JSON加载歌曲数据"""
-        try:
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-            file_path = os.path.join(project_root, self.lyrics_file_path)
-
-            if not os.path.exists(file_path):
-                return []
-
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            songs = []
-            for album in data.get('albums', []):
-                for song in album.get('songs', []):
-                    songs.append({
-                        'id': song['id'],
-                        'title': song['title'],
-                        'lyrics': song['lyrics'],
-                        'album': album['name']
-                    })
-            return songs
-        except Exception as e:
-            print(f"加载歌词文件失败: {e}")
-            return []
+    def __init__(self, corpus: Optional[LyricCorpus] = None):
+        self.corpus = corpus or get_lyric_corpus()
 
     def generate_question(self) -> Optional[Dict[str, Any]]:
         """生成配对问题"""
-        if not self.songs_data or len(self.songs_data) < 2:
+        # 至少需要 4 个专辑才能生成 4 个选项
+        if not self.corpus.lyric_songs or len(self.corpus.albums) < 4:
             return None
 
         # 随机选择一首歌
-        song = random.choice(self.songs_data)
+        song = random.choice(self.corpus.lyric_songs)
 
         # 获取该歌曲的歌词片段作为提示
-        lyrics_lines = [line.strip() for line in song['lyrics'].split('\n') if line.strip()]
-        if not lyrics_lines:
-            return self.generate_question()
-
-        lyric_hint = random.choice(lyrics_lines[:5])  # 选择前面的歌词作为提示
-
-        # 生成4个选项（包括正确的专辑）
-        albums = list(set(s['album'] for s in self.songs_data))
-        if song['album'] not in albums:
-            albums.append(song['album'])
-
-        if len(albums) < 4:
-            return self.generate_question()
+        lyric_hint = random.choice(song.lines[:5])  # 选择前面的歌词作为提示
 
         # 选择正确答案和3个错误答案
-        options = [song['album']]
-        other_albums = [a for a in albums if a != song['album']]
-        wrong_options = random.sample(other_albums, min(3, len(other_albums)))
-        options.extend(wrong_options)
+        options = [song.album] + _sample_distinct(self.corpus.albums, self.corpus.album_set, song.album, 3)
         random.shuffle(options)
 
         return {
             'type': 'song_matcher',
-            'song_title': song['title'],
+            'song_title': song.title,
             'lyric_hint': lyric_hint,
             'question_type': 'which_album',  # 这是哪个专辑
             'options': options,
-            'correct_answer': song['album'],
-            'song_id': song['id']
+            'correct_answer': song.album,
+            'song_id': song.id
         }
 
 
-# 创建全局游戏实例
+# 创建全局游戏实例（共享同一份歌词语料）
 lyrics_guesser = LyricsGuesser()
 fill_lyrics = FillLyrics()
 song_matcher = SongMatcher()
@@ -282,8 +256,7 @@ class IntroGuesser:
             album_type: 'album' 只加载 album 类型，None 加载所有类型
         """
         try:
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-            file_path = os.path.join(project_root, self.albums_file_path)
+            file_path = _resolve_data_path(self.albums_file_path)
 
             if not os.path.exists(file_path):
                 print(f"文件不存在: {file_path}")
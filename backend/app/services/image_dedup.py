@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+图片内容去重
+
+按源文件 SHA-256 + 处理方式（kind）在 image_assets 表中登记已上传的各尺寸图片：
+- 重复上传同一张图片时直接复用已有URL，跳过解码、缩放和上传
+- ref_count 记录引用次数；删除图片时先减引用，归零后才删除存储中的对象
+- 不在表中的URL（历史数据、未去重的上传）按原逻辑直接删除
+
+数据库操作都是同步的，async 路由通过 run_storage_task 调用。
+索引不可用时退化为普通上传，不影响上传本身。
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..core.config import get_settings
+from ..core.executors import run_image_task, run_storage_task
+from ..database import SessionLocal
+from ..models.image_asset import ImageAsset
+from .storage_service import StorageService
+
+# 处理方式：同一源文件按不同方式处理得到的对象互不复用
+KIND_VARIANTS = "variants"  # 原图 / 中等尺寸 / 缩略图（图廊、照片）
+KIND_EDITOR = "editor"      # 编辑器插图（压缩到 1MB 以内的单张图）
+KIND_AVATAR = "avatar"      # 头像原图 + 缩略图
+
+
+class ImageAssetInfo(NamedTuple):
+    original_url: str
+    medium_url: Optional[str] = None
+    thumb_url: Optional[str] = None
+    file_size: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # 替代格式：alternate_name(variant, fmt) -> URL，如 {"thumb_webp": "..."}
+    alternates: Optional[Dict[str, str]] = None
+
+    @property
+    def urls(self) -> List[str]:
+        urls = [url for url in (self.original_url, self.medium_url, self.thumb_url) if url]
+        return urls + list((self.alternates or {}).values())
+
+
+def content_hash(data: bytes) -> str:
+    """源文件内容的 SHA-256（十六进制）"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _to_info(asset: ImageAsset) -> ImageAssetInfo:
+    return ImageAssetInfo(
+        original_url=asset.original_url,
+        medium_url=asset.medium_url,
+        thumb_url=asset.thumb_url,
+        file_size=asset.file_size,
+        width=asset.width,
+        height=asset.height,
+        alternates=asset.alternates or None,
+    )
+
+
+def acquire_image_asset(digest: str, kind: str) -> Optional[ImageAssetInfo]:
+    """查找已上传的相同图片并增加一次引用，没有则返回 None"""
+    db = SessionLocal()
+    try:
+        # 原子地加引用：与删除（减引用后删除 ref_count<=0 的行）互斥，不会复用即将被删除的对象
+        updated = db.query(ImageAsset).filter(
+            ImageAsset.content_hash == digest,
+            ImageAsset.kind == kind,
+        ).update(
+            {ImageAsset.ref_count: ImageAsset.ref_count + 1, ImageAsset.updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        if not updated:
+            db.rollback()
+            return None
+        asset = db.query(ImageAsset).filter(
+            ImageAsset.content_hash == digest,
+            ImageAsset.kind == kind,
+        ).first()
+        info = _to_info(asset)
+        db.commit()
+        return info
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 查询图片去重索引失败: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def register_image_asset(digest: str, kind: str, info: ImageAssetInfo) -> Tuple[ImageAssetInfo, bool]:
+    """
+    登记新上传的图片
+    :return: (应使用的图片, 是否重复)；并发上传了相同内容时返回已登记的图片，调用方应删除本次上传的对象
+    """
+    db = SessionLocal()
+    try:
+        db.add(ImageAsset(
+            content_hash=digest,
+            kind=kind,
+            original_url=info.original_url,
+            medium_url=info.medium_url,
+            thumb_url=info.thumb_url,
+            file_size=info.file_size,
+            width=info.width,
+            height=info.height,
+            alternate_urls=json.dumps(info.alternates) if info.alternates else None,
+            ref_count=1,
+        ))
+        db.commit()
+        return info, False
+    except IntegrityError:
+        db.rollback()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 登记图片去重索引失败: {e}")
+        return info, False
+    finally:
+        db.close()
+
+    existing = acquire_image_asset(digest, kind)
+    if existing is None:
+        # 已登记的记录刚好被删除，保留本次上传（不登记，删除时按普通图片处理）
+        return info, False
+    return existing, True
+
+
+def set_image_asset_alternates(digest: str, kind: str, alternates: Dict[str, str]) -> bool:
+    """补充已登记图片的替代格式URL（与已有的合并），返回是否更新成功"""
+    db = SessionLocal()
+    try:
+        asset = db.query(ImageAsset).filter(
+            ImageAsset.content_hash == digest,
+            ImageAsset.kind == kind,
+        ).with_for_update().first()
+        if asset is None:
+            db.rollback()
+            return False
+        asset.alternate_urls = json.dumps({**asset.alternates, **alternates})
+        db.commit()
+        return True
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 更新图片替代格式失败: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def release_image_urls(urls: Iterable[str]) -> Optional[List[str]]:
+    """
+    释放一次引用（同一组图片的多个URL只算一次）
+    :return: 可以从存储中删除的URL；仍被引用的图片不返回。数据库出错时返回 None
+    """
+    urls = [url for url in dict.fromkeys(urls) if url]
+    if not urls:
+        return []
+
+    db = SessionLocal()
+    try:
+        assets = db.query(ImageAsset).filter(or_(
+            ImageAsset.original_url.in_(urls),
+            ImageAsset.medium_url.in_(urls),
+            ImageAsset.thumb_url.in_(urls),
+        )).with_for_update().all()
+
+        tracked = set()
+        deletable: List[str] = []
+        for asset in assets:
+            tracked.update(asset.urls)
+            asset.ref_count -= 1
+            if asset.ref_count <= 0:
+                # 最后一个引用：删除整组对象（包括调用方未传入的其他尺寸）
+                deletable.extend(asset.urls)
+                db.delete(asset)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"⚠️ 释放图片引用失败: {e}")
+        return None
+    finally:
+        db.close()
+
+    return [url for url in urls if url not in tracked] + deletable
+
+
+async def find_image_asset(content: bytes, kind: str) -> Tuple[Optional[str], Optional[ImageAssetInfo]]:
+    """
+    计算内容哈希并查找已上传的相同图片（找到时已增加引用）
+    :return: (内容哈希, 已有图片)；未启用去重时返回 (None, None)
+    """
+    if not get_settings().image_dedup_enabled:
+        return None, None
+    digest = await run_image_task(content_hash, content)
+    return digest, await run_storage_task(acquire_image_asset, digest, kind)
+
+
+async def save_image_asset(
+    digest: Optional[str],
+    kind: str,
+    info: ImageAssetInfo,
+    storage: StorageService,
+) -> ImageAssetInfo:
+    """登记刚上传的图片；与并发上传的相同内容冲突时删除本次上传的对象，改用已登记的图片"""
+    if digest is None:
+        return info
+    registered, duplicate = await run_storage_task(register_image_asset, digest, kind, info)
+    if duplicate:
+        for url in info.urls:
+            try:
+                await run_storage_task(storage.delete_url, url)
+            except Exception as e:
+                print(f"⚠️ 删除重复上传的图片失败 {url}: {e}")
+    return registered
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+按需生成的图片衍生图（/img/{key}?w=&fmt=）
+
+上传时只固定生成原图/中图/缩略图，其他宽度和格式在首次请求时从存储中的源图生成：
+- 宽度限定在 image_derivative_widths 中，避免任意尺寸撑满缓存；不会放大
+- 结果写入本地磁盘 LRU 缓存（总大小有上限），同时写回存储的 derivatives/ 前缀下，
+  服务重启或多实例部署时直接从存储读取，不用重新解码
+- 同一衍生图的并发请求共享一次生成
+- ETag 由衍生图键和源图版本（本地为修改时间+大小，OSS 为对象 ETag）计算，只需一次元数据查询，
+  If-None-Match 命中时直接返回 304，不读取也不生成衍生图；源图版本缓存 image_derivative_source_ttl_seconds
+- 源图被覆盖后版本变化：本地缓存按 (衍生图键, 源图版本) 存放，存储中早于源图的衍生图会重新生成；
+  源图删除时由 ImageStorage 调用 purge_image_derivatives 清理本地缓存和 derivatives/ 下的衍生图
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..core.config import get_settings
+from ..core.executors import run_storage_task
+from ..core.ttl_cache import TTLCache
+from .image_processing import OUTPUT_FORMATS, OutputFormat, encode_image_async, format_supported
+from .storage_service import ObjectStat, StorageService, get_storage_service
+
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+FORMAT_ALIASES = {'jpg': 'jpeg'}
+
+
+class Derivative(NamedTuple):
+    data: bytes
+    media_type: str
+    etag: str
+
+
+class DerivativeRef(NamedTuple):
+    """已校验的衍生图请求，ETag 不依赖衍生图内容"""
+    source_key: str
+    width: Optional[int]
+    spec: OutputFormat
+    derivative_key: str
+    source: ObjectStat
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.derivative_key}#{self.source.version}"
+
+    @property
+    def etag(self) -> str:
+        return f'"{hashlib.md5(self.cache_key.encode("utf-8")).hexdigest()}"'
+
+
+class DiskLRUCache:
+    """
+    本地磁盘 LRU 缓存：文件名为缓存键的 SHA-1，总大小超过 max_bytes 时按最近使用时间淘汰
+
+    启动时扫描目录恢复索引（按修改时间排序），命中时更新修改时间，重启后仍大致保持 LRU 顺序。
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.endswith('.part'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _filename(key: str) -> str:
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        name = self._filename(key)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            # 被其他进程或手动清理删除
+            with self._lock:
+                self._size -= self._entries.pop(name, 0)
+            return None
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        name = self._filename(key)
+        path = os.path.join(self.directory, name)
+        partial_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        with open(partial_path, 'wb') as f:
+            f.write(data)
+        os.replace(partial_path, path)
+        with self._lock:
+            self._size -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def delete(self, key: str) -> bool:
+        name = self._filename(key)
+        with self._lock:
+            if name not in self._entries:
+                return False
+            self._size -= self._entries.pop(name)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+class ImageDerivativeService:
+    """从存储中的源图按需生成并缓存衍生图"""
+
+    def __init__(
+        self,
+        storage: Optional[StorageService] = None,
+        cache: Optional[DiskLRUCache] = None,
+        *,
+        widths: Optional[Tuple[int, ...]] = None,
+        prefix: Optional[str] = None,
+        quality: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self._storage = storage
+        # DiskLRUCache 定义了 __len__，空缓存为假值，不能用 or
+        self.cache = cache if cache is not None else DiskLRUCache(
+            settings.image_derivative_cache_dir,
+            settings.image_derivative_cache_max_mb * 1024 * 1024,
+        )
+        self.widths = widths or tuple(
+            int(width) for width in settings.image_derivative_widths.split(',') if width.strip()
+        )
+        self.prefix = (prefix or settings.image_derivative_prefix).strip('/')
+        self.quality = quality or settings.image_derivative_quality
+        self.sources: TTLCache[ObjectStat] = TTLCache(
+            max_size=settings.image_derivative_source_cache_max_size,
+            ttl_seconds=settings.image_derivative_source_ttl_seconds,
+        )
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    @property
+    def storage(self) -> StorageService:
+        if self._storage is None:
+            self._storage = get_storage_service()
+        return self._storage
+
+    def _validate_key(self, key: str) -> str:
+        key = key.strip().lstrip('/')
+        if key.startswith('uploads/'):
+            # 本地存储的访问URL形式
+            key = key[len('uploads/'):]
+        parts = key.split('/')
+        if not key or any(part in ('', '.', '..') for part in parts):
+            raise HTTPException(status_code=400, detail="无效的图片路径")
+        if parts[0] == self.prefix:
+            raise HTTPException(status_code=400, detail="不能对衍生图再次缩放")
+        if os.path.splitext(key)[1].lower() not in SOURCE_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="不支持的图片类型")
+        return key
+
+    def resolve(self, key: str, width: Optional[int], fmt: str) -> Tuple[str, OutputFormat, str]:
+        """校验请求参数，返回 (源图键, 输出格式, 衍生图键)"""
+        key = self._validate_key(key)
+        fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+        if not format_supported(fmt):
+            supported = ', '.join(name for name in OUTPUT_FORMATS if format_supported(name))
+            raise HTTPException(status_code=400, detail=f"不支持的格式：{fmt}，可选 {supported}")
+        spec = OUTPUT_FORMATS[fmt]
+        if width is not None and width not in self.widths:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的宽度：{width}，可选 {', '.join(str(w) for w in self.widths)}"
+            )
+        return key, spec, self._derivative_key(key, width, spec)
+
+    def _derivative_key(self, source_key: str, width: Optional[int], spec: OutputFormat) -> str:
+        size = f"w{width}" if width else "orig"
+        return f"{self.prefix}/{size}/{source_key}.{spec.extension}"
+
+    async def _source_stat(self, source_key: str) -> Optional[ObjectStat]:
+        source = self.sources.get(source_key)
+        if source is None:
+            source = await run_storage_task(self.storage.stat, source_key)
+            if source is not None:
+                self.sources.set(source_key, source)
+        return source
+
+    async def lookup(self, key: str, width: Optional[int] = None, fmt: str = 'jpeg') -> DerivativeRef:
+        """校验请求并查询源图版本（不读取图片内容），源图不存在时返回 404"""
+        source_key, spec, derivative_key = self.resolve(key, width, fmt)
+        source = await self._source_stat(source_key)
+        if source is None:
+            raise HTTPException(status_code=404, detail="图片不存在")
+        return DerivativeRef(source_key, width, spec, derivative_key, source)
+
+    async def load(self, ref: DerivativeRef) -> Derivative:
+        """读取衍生图：本地缓存 -> 存储中的衍生图 -> 从源图生成"""
+        data = await run_storage_task(self.cache.get, ref.cache_key)
+        if data is None:
+            data = await self._shared(ref.cache_key, lambda: self._load_or_generate(ref))
+        return Derivative(data, ref.spec.media_type, ref.etag)
+
+    async def get(self, key: str, width: Optional[int] = None, fmt: str = 'jpeg') -> Derivative:
+        """获取衍生图"""
+        return await self.load(await self.lookup(key, width, fmt))
+
+    def purge(self, key: str) -> int:
+        """
+        清理源图的全部衍生图（本地缓存和存储中 derivatives/ 前缀下的对象），在删除源图之前调用
+        :return: 删除成功的存储对象数（OSS 删除不存在的对象也算成功）；不是可缩放的源图时返回 0
+        """
+        try:
+            source_key = self._validate_key(key)
+        except HTTPException:
+            return 0
+        self.sources.invalidate(source_key)
+        source = self.storage.stat(source_key)
+        removed = 0
+        for width in (None, *self.widths):
+            for spec in OUTPUT_FORMATS.values():
+                derivative_key = self._derivative_key(source_key, width, spec)
+                if source is not None:
+                    self.cache.delete(f"{derivative_key}#{source.version}")
+                if self.storage.delete_file(derivative_key):
+                    removed += 1
+        return removed
+
+    async def _shared(self, key: str, factory: Callable[[], Awaitable[bytes]]) -> bytes:
+        """同一衍生图的并发请求共享一次生成"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _load_or_generate(self, ref: DerivativeRef) -> bytes:
+        source_key, width, spec, derivative_key = ref.source_key, ref.width, ref.spec, ref.derivative_key
+        data = None
+        stored = await run_storage_task(self.storage.stat, derivative_key)
+        if stored is not None and stored.modified >= ref.source.modified:
+            # 早于源图的衍生图是源图被覆盖前生成的，需要重新生成
+            data = await run_storage_task(self.storage.read_bytes, derivative_key)
+        if data is None:
+            source = await run_storage_task(self.storage.read_bytes, source_key)
+            if source is None:
+                raise HTTPException(status_code=404, detail="图片不存在")
+            try:
+                data = await encode_image_async(source, width, self.quality, spec.pil_format)
+            except (OSError, ValueError) as e:
+                print(f"❌ 生成衍生图失败 {source_key}: {e}")
+                raise HTTPException(status_code=415, detail="无法识别的图片")
+
+            # 写回存储：失败只影响其他实例的复用，不影响本次响应
+            try:
+                await run_storage_task(self.storage.upload_bytes, data, derivative_key, spec.media_type)
+            except Exception as e:
+                print(f"⚠️ 衍生图写回存储失败 {derivative_key}: {e}")
+
+        try:
+            await run_storage_task(self.cache.set, ref.cache_key, data)
+        except OSError as e:
+            print(f"⚠️ 写入衍生图本地缓存失败: {e}")
+        return data
+
+
+_service: Optional[ImageDerivativeService] = None
+
+
+def get_image_derivative_service() -> ImageDerivativeService:
+    """应用内共享的衍生图服务"""
+    global _service
+    if _service is None:
+        _service = ImageDerivativeService()
+    return _service
+
+
+def purge_image_derivatives(key: str) -> int:
+    """删除源图前清理其衍生图；失败只打印警告，不影响删除源图"""
+    try:
+        return get_image_derivative_service().purge(key)
+    except Exception as e:
+        print(f"⚠️ 清理衍生图失败 {key}: {e}")
+        return 0
@@ -1,10 +1,205 @@
 # -*- coding: utf-8 -*-
-"""图片处理服务 - 压缩、缩略图生成"""
-from PIL import Image
-from io import BytesIO
+"""
+图片处理服务 - 压缩、缩略图生成
+
+上传图片在内存中一次生成原图（压缩）、中等尺寸、缩略图三种 JPEG：
+- 每种尺寸独立解码，JPEG 借助 Image.draft 按 1/2、1/4、1/8 比例直接解码到接近目标的尺寸，
+  再用 reduce + LANCZOS 缩放，避免每次都解码全尺寸像素
+- 三种尺寸在进程池中并发编码（绕开 GIL），结果以 bytes 返回，可直接写入存储，不落临时文件
+- 图廊图片另外为中等尺寸和缩略图生成 WebP（可选 AVIF）版本，体积明显小于 JPEG
+"""
+import asyncio
+import math
+import multiprocessing
 import os
-from typing import Tuple, Optional
-from pathlib import Path
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from ..core.config import get_settings
+from ..core.executors import run_image_task
+
+
+class ImageVariantSpec(NamedTuple):
+    """单个输出尺寸：target_width 为 None 表示保持原尺寸"""
+    name: str
+    target_width: Optional[int]
+    quality: int
+
+
+class OutputFormat(NamedTuple):
+    """输出格式：PIL 格式名、MIME 类型、扩展名"""
+    pil_format: str
+    media_type: str
+    extension: str
+
+
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {
+    'jpeg': OutputFormat('JPEG', 'image/jpeg', 'jpg'),
+    'webp': OutputFormat('WEBP', 'image/webp', 'webp'),
+    'avif': OutputFormat('AVIF', 'image/avif', 'avif'),
+}
+
+# 中等尺寸和缩略图的 WebP / AVIF 版本的质量（AVIF 的质量刻度与 JPEG 不同，较低的数值即可达到相近的观感）
+ALTERNATE_QUALITY: Dict[str, Dict[str, int]] = {
+    'webp': {'medium': 80, 'thumb': 72},
+    'avif': {'medium': 60, 'thumb': 52},
+}
+
+
+def format_supported(fmt: str) -> bool:
+    """当前 Pillow 是否支持编码该格式（AVIF 需要 Pillow 以 libavif 构建）"""
+    if fmt not in OUTPUT_FORMATS:
+        return False
+    if fmt in ('webp', 'avif'):
+        return bool(features.check(fmt))
+    return True
+
+
+def alternate_formats() -> List[str]:
+    """配置中启用且当前环境支持的替代格式"""
+    formats = []
+    for fmt in get_settings().image_alternate_formats.split(','):
+        fmt = fmt.strip().lower()
+        if not fmt or fmt in formats:
+            continue
+        if not format_supported(fmt) or fmt == 'jpeg':
+            print(f"⚠️ 不支持的替代图片格式：{fmt}，已忽略")
+            continue
+        formats.append(fmt)
+    return formats
+
+
+def alternate_name(variant: str, fmt: str) -> str:
+    """替代格式的名称，如 thumb_webp（也是响应和数据库字段名的前缀）"""
+    return f"{variant}_{fmt}"
+
+
+def alternate_path(jpeg_path: str, fmt: str) -> str:
+    """替代格式与 JPEG 存放在同一目录，只替换扩展名"""
+    return f"{os.path.splitext(jpeg_path)[0]}.{OUTPUT_FORMATS[fmt].extension}"
+
+
+class ProcessedImage(NamedTuple):
+    """处理结果（JPEG bytes + 校正方向后的原图尺寸）"""
+    original: bytes
+    medium: bytes
+    thumb: bytes
+    width: int
+    height: int
+
+
+def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+    """转换为 RGB 模式（JPEG 不支持透明度，透明部分铺白底）"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        rgb_img = Image.new('RGB', image.size, (255, 255, 255))
+        rgb_img.paste(image, mask=image.split()[-1])
+        return rgb_img
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def _oriented_size(image: Image.Image) -> Tuple[int, int]:
+    """按 EXIF 方向校正后的尺寸（不解码像素）"""
+    width, height = image.size
+    try:
+        orientation = image.getexif().get(0x0112, 1)
+    except Exception:
+        orientation = 1
+    if orientation in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def _save_image(image: Image.Image, output: BytesIO, image_format: str, quality: int) -> None:
+    """按格式编码：JPEG 铺白底，其他格式（WebP 等）保留透明通道"""
+    if image_format == 'JPEG':
+        _flatten_to_rgb(image).save(output, format='JPEG', quality=quality, optimize=True)
+        return
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    image.save(output, format=image_format, quality=quality)
+
+
+def _encode_variant(data: bytes, target_width: Optional[int], quality: int, image_format: str = 'JPEG') -> bytes:
+    """
+    解码并生成单个尺寸的图片（在进程池中执行，因此只接收/返回可序列化的数据）
+    """
+    with Image.open(BytesIO(data)) as img:
+        oriented_width, _ = _oriented_size(img)
+        scale = 1.0
+        if target_width and target_width < oriented_width:
+            scale = target_width / oriented_width
+            # 让 JPEG 解码器直接输出不小于目标尺寸的缩小图
+            raw_width, raw_height = img.size
+            img.draft(None, (math.ceil(raw_width * scale), math.ceil(raw_height * scale)))
+
+        image = ImageOps.exif_transpose(img)
+        if scale < 1.0:
+            new_size = (target_width, max(1, int(image.height * target_width / image.width)))
+            if new_size != image.size:
+                # reducing_gap: 先用 reduce() 做整数倍快速缩小，再用 LANCZOS 精确缩放
+                image = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+        output = BytesIO()
+        _save_image(image, output, image_format, quality)
+        return output.getvalue()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_image_pool() -> Optional[Executor]:
+    """
+    获取图片编码进程池（首次使用时创建）
+
+    image_pipeline_workers <= 1 时返回 None，在当前进程中串行处理。
+    使用 spawn 启动子进程，避免在多线程的服务进程中 fork。
+    """
+    global _pool
+    workers = get_settings().image_pipeline_workers
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_image_pool() -> None:
+    """关闭图片编码进程池（应用关闭时调用）"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+async def encode_image_async(
+    data: bytes,
+    target_width: Optional[int],
+    quality: int,
+    image_format: str = 'JPEG',
+) -> bytes:
+    """
+    生成单个尺寸/格式的图片（按需缩放等场景）：启用进程池时在进程池中编码，否则在 image_executor 中执行
+    :param target_width: 目标宽度，None 或不小于原图宽度时保持原尺寸
+    :param image_format: PIL 格式名（JPEG / WEBP / AVIF）
+    """
+    executor = get_image_pool()
+    if executor is None:
+        return await run_image_task(_encode_variant, data, target_width, quality, image_format)
+    return await asyncio.wrap_future(executor.submit(_encode_variant, data, target_width, quality, image_format))
 
 
 class ImageProcessor:
@@ -111,6 +306,84 @@ class ImageProcessor:
         output.seek(0)
         return output
 
+    @classmethod
+    def variant_specs(cls, width: int, height: int) -> List[ImageVariantSpec]:
+        """根据原图尺寸确定三种输出尺寸"""
+        if width > cls.MAX_ORIGINAL_WIDTH or height > cls.MAX_ORIGINAL_HEIGHT:
+            # 原图过大，需要缩小
+            original_width = cls.MAX_ORIGINAL_WIDTH
+        else:
+            # 原图尺寸合适，只需要压缩
+            original_width = None
+        return [
+            ImageVariantSpec('original', original_width, cls.ORIGINAL_QUALITY),
+            ImageVariantSpec('medium', cls.MEDIUM_WIDTH, cls.MEDIUM_QUALITY),
+            ImageVariantSpec('thumb', cls.THUMB_WIDTH, cls.THUMB_QUALITY),
+        ]
+
+    @classmethod
+    def _prepare(cls, data: bytes) -> Tuple[List[ImageVariantSpec], int, int]:
+        """只读取图片头部信息（不解码像素），校验格式并确定输出尺寸"""
+        with Image.open(BytesIO(data)) as img:
+            width, height = _oriented_size(img)
+        return cls.variant_specs(width, height), width, height
+
+    @classmethod
+    def process_image_bytes(cls, data: bytes, executor: Optional[Executor] = None) -> ProcessedImage:
+        """
+        在内存中生成原图（压缩）、中等尺寸、缩略图
+        :param data: 上传的原始图片数据
+        :param executor: 编码使用的执行器，默认使用共享进程池
+        :return: ProcessedImage
+        """
+        specs, width, height = cls._prepare(data)
+        executor = executor or get_image_pool()
+        if executor is None:
+            encoded = [_encode_variant(data, spec.target_width, spec.quality) for spec in specs]
+        else:
+            futures = [executor.submit(_encode_variant, data, spec.target_width, spec.quality) for spec in specs]
+            encoded = [future.result() for future in futures]
+        return ProcessedImage(*encoded, width, height)
+
+    @classmethod
+    async def process_image_bytes_async(cls, data: bytes) -> ProcessedImage:
+        """
+        process_image_bytes 的异步版本：等待进程池结果时不占用事件循环和线程池；
+        未启用进程池时在 image_executor 中串行处理
+        """
+        specs, width, height = cls._prepare(data)
+        executor = get_image_pool()
+        if executor is None:
+            return await run_image_task(cls.process_image_bytes, data)
+
+        futures = [
+            asyncio.wrap_future(executor.submit(_encode_variant, data, spec.target_width, spec.quality))
+            for spec in specs
+        ]
+        encoded = await asyncio.gather(*futures)
+        return ProcessedImage(*encoded, width, height)
+
+    @classmethod
+    async def encode_alternates_async(
+        cls,
+        data: bytes,
+        formats: Optional[List[str]] = None,
+    ) -> Dict[str, bytes]:
+        """
+        生成中等尺寸和缩略图的替代格式版本
+        :param formats: 格式列表，默认为配置中启用的格式
+        :return: {alternate_name(variant, fmt): bytes}
+        """
+        formats = alternate_formats() if formats is None else formats
+        widths = {'medium': cls.MEDIUM_WIDTH, 'thumb': cls.THUMB_WIDTH}
+        jobs = [
+            (alternate_name(variant, fmt), data, width, ALTERNATE_QUALITY[fmt][variant], OUTPUT_FORMATS[fmt].pil_format)
+            for fmt in formats
+            for variant, width in widths.items()
+        ]
+        encoded = await asyncio.gather(*(encode_image_async(*job[1:]) for job in jobs))
+        return {job[0]: result for job, result in zip(jobs, encoded)}
+
     @classmethod
     def process_image(
         cls,
@@ -119,7 +392,7 @@ class ImageProcessor:
         filename_base: str
     ) -> Tuple[str, str, str, int, int]:
         """
-        处理图片：生成原图（压缩）、中等尺寸、缩略图
+        处理图片：生成原图（压缩）、中等尺寸、缩略图并写入文件
         :param input_path: 输入图片路径
         :param output_dir: 输出目录
         :param filename_base: 文件名基础（不含扩展名）
@@ -128,61 +401,21 @@ class ImageProcessor:
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
 
-        # 打开图片
-        with Image.open(input_path) as img:
-            # 获取原始尺寸
-            orig_width, orig_height = img.size
-
-            # 处理EXIF旋转信息
-            try:
-                from PIL import ImageOps
-                img = ImageOps.exif_transpose(img)
-            except Exception:
-                pass
-
-            # 1. 处理原图（如果过大则压缩）
-            original_path = os.path.join(output_dir, f"{filename_base}.jpg")
-            if orig_width > cls.MAX_ORIGINAL_WIDTH or orig_height > cls.MAX_ORIGINAL_HEIGHT:
-                # 原图过大，需要缩小
-                original_data = cls.resize_image(
-                    img,
-                    target_width=cls.MAX_ORIGINAL_WIDTH,
-                    quality=cls.ORIGINAL_QUALITY
-                )
-                with open(original_path, 'wb') as f:
-                    f.write(original_data.getvalue())
-            else:
-                # 原图尺寸合适，只需要压缩
-                original_data = cls.resize_image(
-                    img,
-                    target_width=orig_width,
-                    target_height=orig_height,
-                    quality=cls.ORIGINAL_QUALITY
-                )
-                with open(original_path, 'wb') as f:
-                    f.write(original_data.getvalue())
-
-            # 2. 生成中等尺寸
-            medium_path = os.path.join(output_dir, f"{filename_base}_medium.jpg")
-            medium_data = cls.resize_image(
-                img,
-                target_width=cls.MEDIUM_WIDTH,
-                quality=cls.MEDIUM_QUALITY
-            )
-            with open(medium_path, 'wb') as f:
-                f.write(medium_data.getvalue())
-
-            # 3. 生成缩略图
-            thumb_path = os.path.join(output_dir, f"{filename_base}_thumb.jpg")
-            thumb_data = cls.resize_image(
-                img,
-                target_width=cls.THUMB_WIDTH,
-                quality=cls.THUMB_QUALITY
-            )
-            with open(thumb_path, 'wb') as f:
-                f.write(thumb_data.getvalue())
+        with open(input_path, 'rb') as f:
+            processed = cls.process_image_bytes(f.read())
+
+        original_path = os.path.join(output_dir, f"{filename_base}.jpg")
+        medium_path = os.path.join(output_dir, f"{filename_base}_medium.jpg")
+        thumb_path = os.path.join(output_dir, f"{filename_base}_thumb.jpg")
+        for path, content in (
+            (original_path, processed.original),
+            (medium_path, processed.medium),
+            (thumb_path, processed.thumb),
+        ):
+            with open(path, 'wb') as f:
+                f.write(content)
 
-            return original_path, medium_path, thumb_path, orig_width, orig_height
+        return original_path, medium_path, thumb_path, processed.width, processed.height
 
     @staticmethod
     def get_file_size(file_path: str) -> int:
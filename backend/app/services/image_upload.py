@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+图片上传公共流程：生成原图/中等尺寸/缩略图并上传到存储
+
+图片编码在图片进程池中执行，存储上传在 storage_executor 中并发执行，
+调用方（async 路由）只需 await，不会阻塞事件循环。
+相同内容的图片只处理、上传一次（见 image_dedup）。
+图廊图片另外上传中等尺寸和缩略图的 WebP / AVIF 版本（与 JPEG 同目录）。
+"""
+import asyncio
+import traceback
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from ..core.executors import run_storage_task
+from ..schemas.gallery import UploadResponse
+from .image_dedup import (
+    KIND_VARIANTS,
+    ImageAssetInfo,
+    find_image_asset,
+    save_image_asset,
+    set_image_asset_alternates,
+)
+from .image_processing import (
+    OUTPUT_FORMATS,
+    ImageProcessor,
+    alternate_formats,
+    alternate_name,
+    alternate_path,
+)
+from .storage_service import StorageService, get_storage_service
+
+ALLOWED_IMAGE_TYPES = [
+    "image/jpeg",
+    "image/jpg",
+    "image/png",
+    "image/webp",
+    "image/gif",
+    "image/bmp",
+    "image/heic",
+    "image/heif",
+]
+MAX_IMAGE_SIZE = 20 * 1024 * 1024  # 20MB
+
+
+async def read_image_upload(file: UploadFile) -> bytes:
+    """校验上传图片的类型和大小，返回文件内容"""
+    # 验证文件类型
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件类型：{file.content_type}，仅支持 JPEG, PNG, WebP"
+        )
+
+    # 验证文件大小（最大20MB）
+    content = await file.read()
+    if len(content) > MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=400, detail="文件大小不能超过 20MB")
+    return content
+
+
+def _to_response(asset: ImageAssetInfo, message: str) -> UploadResponse:
+    return UploadResponse(
+        success=True,
+        message=message,
+        file_url=asset.original_url,
+        thumb_url=asset.thumb_url,
+        medium_url=asset.medium_url,
+        file_size=asset.file_size,
+        width=asset.width,
+        height=asset.height,
+        **{f"{name}_url": url for name, url in (asset.alternates or {}).items()}
+    )
+
+
+async def upload_alternates(
+    content: bytes,
+    medium_path: str,
+    thumb_path: str,
+    *,
+    formats: Optional[List[str]] = None,
+    storage: Optional[StorageService] = None
+) -> Dict[str, str]:
+    """
+    生成并上传中等尺寸和缩略图的替代格式版本（与对应的 JPEG 同目录，只替换扩展名）
+    :param formats: 格式列表，默认为配置中启用的格式
+    :return: {alternate_name(variant, fmt): URL}，如 {"thumb_webp": "..."}
+    """
+    formats = alternate_formats() if formats is None else formats
+    storage = storage or get_storage_service()
+    encoded = await ImageProcessor.encode_alternates_async(content, formats)
+
+    paths = {'medium': medium_path, 'thumb': thumb_path}
+    uploads = [
+        (alternate_name(variant, fmt), alternate_path(path, fmt), OUTPUT_FORMATS[fmt].media_type)
+        for fmt in formats
+        for variant, path in paths.items()
+    ]
+    urls = await asyncio.gather(*(
+        run_storage_task(storage.upload_bytes, encoded[name], path, media_type)
+        for name, path, media_type in uploads
+    ))
+    return {name: url for (name, _, _), url in zip(uploads, urls)}
+
+
+async def _try_upload_alternates(
+    content: bytes,
+    medium_path: str,
+    thumb_path: str,
+    formats: List[str],
+    storage: StorageService
+) -> Dict[str, str]:
+    """替代格式只是优化，失败时不影响 JPEG 上传"""
+    if not formats:
+        return {}
+    try:
+        return await upload_alternates(content, medium_path, thumb_path, formats=formats, storage=storage)
+    except Exception as e:
+        print(f"⚠️ 生成替代格式图片失败: {e}")
+        return {}
+
+
+async def upload_image_variants(
+    content: bytes,
+    original_path: str,
+    medium_path: str,
+    thumb_path: str,
+    *,
+    message: str = "上传成功",
+    storage: Optional[StorageService] = None,
+    with_alternates: bool = False
+) -> UploadResponse:
+    """
+    处理图片并上传三种尺寸
+    :param content: 上传的原始图片数据
+    :param original_path: 原图存储路径
+    :param medium_path: 中等尺寸存储路径
+    :param thumb_path: 缩略图存储路径
+    :param message: 成功时返回的提示
+    :param storage: 存储服务，默认按配置创建
+    :param with_alternates: 是否同时生成中等尺寸和缩略图的 WebP / AVIF 版本（image_alternate_formats）
+    """
+    try:
+        formats = alternate_formats() if with_alternates else []
+        storage = storage or get_storage_service()
+
+        # 1. 已上传过相同内容时直接复用（缺少的替代格式补充生成）
+        digest, existing = await find_image_asset(content, KIND_VARIANTS)
+        if existing is not None:
+            missing = [
+                fmt for fmt in formats
+                if alternate_name('thumb', fmt) not in (existing.alternates or {})
+            ]
+            if missing and existing.medium_url and existing.thumb_url:
+                added = await _try_upload_alternates(
+                    content,
+                    storage.key_from_url(existing.medium_url),
+                    storage.key_from_url(existing.thumb_url),
+                    missing,
+                    storage,
+                )
+                if added:
+                    await run_storage_task(set_image_asset_alternates, digest, KIND_VARIANTS, added)
+                    existing = existing._replace(alternates={**(existing.alternates or {}), **added})
+            return _to_response(existing, message)
+
+        async def upload_jpegs():
+            # 2. 在内存中处理图片（并发生成原图、中等尺寸、缩略图）
+            processed = await ImageProcessor.process_image_bytes_async(content)
+
+            # 3. 并发上传 3 种尺寸（直接上传内存数据，不落临时文件）
+            urls = await asyncio.gather(
+                run_storage_task(storage.upload_bytes, processed.original, original_path),
+                run_storage_task(storage.upload_bytes, processed.medium, medium_path),
+                run_storage_task(storage.upload_bytes, processed.thumb, thumb_path),
+            )
+            return processed, urls
+
+        # 替代格式与 JPEG 同时编码、上传
+        (processed, (original_url, medium_url, thumb_url)), alternates = await asyncio.gather(
+            upload_jpegs(),
+            _try_upload_alternates(content, medium_path, thumb_path, formats, storage),
+        )
+
+        asset = await save_image_asset(digest, KIND_VARIANTS, ImageAssetInfo(
+            original_url=original_url,
+            medium_url=medium_url,
+            thumb_url=thumb_url,
+            file_size=len(processed.original),
+            width=processed.width,
+            height=processed.height,
+            alternates=alternates or None,
+        ), storage)
+        return _to_response(asset, message)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        # 记录详细错误信息
+        error_detail = f"上传失败：{str(e)}\n{traceback.format_exc()}"
+        print(error_detail)
+        raise HTTPException(status_code=500, detail=f"上传失败：{str(e)}")
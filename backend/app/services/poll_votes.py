@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+投票引擎
+
+演唱会期间热门投票每分钟数千票，原先每票都要读投票和选项、按 IP 查重、
+在 Python 中给选项和投票各加一并提交（丢失并发更新，查重与插入之间也有竞态）。现在：
+- 防重复：poll_votes 上 (poll_id, user_ip) 唯一约束，直接插入，违反约束即视为已投票
+- 计数：按 (投票ID, 选项ID) 在内存分片累加，后台任务每隔 poll_vote_flush_interval_seconds
+  用 UPDATE ... SET vote_count = vote_count + CASE id ... END 批量原子递增选项和投票总数；
+  写回失败时增量放回缓冲，关闭时写回剩余增量；间隔设为 0 时每票立即写回
+- 结果快照：投票及选项按投票ID缓存几秒，投票和查询接口读取快照，
+  再叠加本进程尚未写回的增量；写回后失效对应快照
+每票只剩一条 INSERT，选项行和投票行不再被每一票锁住。
+"""
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Update, case, func, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.executors import run_storage_task
+from ..core.sharded_counter import ShardedCounter
+from ..core.ttl_cache import TTLCache
+from ..database import SessionLocal
+from ..models.game import Poll, PollOption, PollVote
+
+_settings = get_settings()
+
+FLUSH_BATCH_SIZE = 500
+
+# key 为 (投票ID, 选项ID)
+poll_vote_counter = ShardedCounter(_settings.poll_vote_counter_shards)
+poll_snapshot_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=_settings.poll_snapshot_cache_max_size,
+    ttl_seconds=_settings.poll_snapshot_cache_ttl_seconds,
+)
+_flush_task: Optional[asyncio.Task] = None
+
+
+# ==================== 结果快照 ====================
+
+def _build_snapshot(poll: Poll, options: Iterable[PollOption]) -> Dict[str, Any]:
+    return {
+        "id": poll.id,
+        "title": poll.title,
+        "description": poll.description,
+        "start_date": poll.start_date,
+        "end_date": poll.end_date,
+        "status": poll.status,
+        "total_votes": poll.total_votes or 0,
+        "is_published": poll.is_published,
+        "options": [
+            {
+                "id": opt.id,
+                "poll_id": opt.poll_id,
+                "label": opt.label,
+                "image_url": opt.image_url,
+                "vote_count": opt.vote_count or 0,
+                "sort_order": opt.sort_order,
+            }
+            for opt in sorted(options, key=lambda opt: opt.sort_order or 0)
+        ],
+        "created_at": poll.created_at,
+        "updated_at": poll.updated_at,
+    }
+
+
+def _load_snapshot(db: Session, poll_id: str) -> Optional[Dict[str, Any]]:
+    poll = db.query(Poll).filter(Poll.id == poll_id).first()
+    if not poll:
+        return None
+    options = db.query(PollOption).filter(PollOption.poll_id == poll_id).all()
+    snapshot = _build_snapshot(poll, options)
+    poll_snapshot_cache.set(poll_id, snapshot)
+    return snapshot
+
+
+def _cached_snapshot(db: Session, poll_id: str) -> Optional[Dict[str, Any]]:
+    snapshot = poll_snapshot_cache.get(poll_id)
+    if snapshot is None:
+        snapshot = _load_snapshot(db, poll_id)
+    return snapshot
+
+
+def _with_pending(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """快照叠加本进程尚未写回的增量（返回新字典，不修改缓存中的快照）"""
+    poll_id = snapshot["id"]
+    options = []
+    pending_total = 0
+    for opt in snapshot["options"]:
+        pending = poll_vote_counter.pending((poll_id, opt["id"]))
+        pending_total += pending
+        options.append({**opt, "vote_count": opt["vote_count"] + pending})
+    return {**snapshot, "total_votes": snapshot["total_votes"] + pending_total, "options": options}
+
+
+def get_poll_snapshot(db: Session, poll_id: str) -> Optional[Dict[str, Any]]:
+    """单个投票及其选项的当前结果；投票不存在时返回 None"""
+    snapshot = _cached_snapshot(db, poll_id)
+    return _with_pending(snapshot) if snapshot else None
+
+
+def list_published_polls(db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """已发布投票列表（选项一次查询批量加载）"""
+    polls = db.query(Poll).filter(Poll.is_published == True).offset(skip).limit(limit).all()  # noqa: E712
+    if not polls:
+        return []
+    options_by_poll: Dict[str, List[PollOption]] = {poll.id: [] for poll in polls}
+    for opt in db.query(PollOption).filter(PollOption.poll_id.in_(list(options_by_poll))).all():
+        options_by_poll[opt.poll_id].append(opt)
+
+    result = []
+    for poll in polls:
+        snapshot = _build_snapshot(poll, options_by_poll[poll.id])
+        poll_snapshot_cache.set(poll.id, snapshot)
+        result.append(_with_pending(snapshot))
+    return result
+
+
+# ==================== 投票 ====================
+
+def cast_vote(db: Session, poll_id: str, option_id: str, user_ip: str) -> Dict[str, Any]:
+    """
+    投一票，返回投票后的结果
+
+    Raises:
+        HTTPException: 投票或选项不存在（404）、该 IP 已投过票（400）
+    """
+    snapshot = _cached_snapshot(db, poll_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="投票不存在")
+    if not any(opt["id"] == option_id for opt in snapshot["options"]):
+        # 快照可能早于新增的选项，重新加载一次再判断
+        snapshot = _load_snapshot(db, poll_id)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="投票不存在")
+        if not any(opt["id"] == option_id for opt in snapshot["options"]):
+            raise HTTPException(status_code=404, detail="投票选项不存在")
+
+    db.add(PollVote(id=str(uuid.uuid4()), poll_id=poll_id, option_id=option_id, user_ip=user_ip))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="您已经投过票了")
+
+    poll_vote_counter.add((poll_id, option_id))
+    if _settings.poll_vote_flush_interval_seconds <= 0:
+        flush_poll_votes(db)
+        snapshot = _load_snapshot(db, poll_id) or snapshot
+
+    current = _with_pending(snapshot)
+    options = current["options"]
+    total_votes = sum(opt["vote_count"] for opt in options)
+    return {
+        "poll_id": poll_id,
+        "option_id": option_id,
+        "vote_count": next(opt["vote_count"] for opt in options if opt["id"] == option_id),
+        "total_votes": total_votes,
+        "options": [
+            {
+                "id": opt["id"],
+                "label": opt["label"],
+                "image_url": opt["image_url"],
+                "vote_count": opt["vote_count"],
+                "percentage": round((opt["vote_count"] / total_votes * 100) if total_votes > 0 else 0, 1),
+            }
+            for opt in options
+        ],
+    }
+
+
+# ==================== 写回 ====================
+
+def _increment_statements(model: Any, column: str, counts: Dict[str, int], keep_updated_at: bool = False) -> Iterator[Update]:
+    """按ID排序分批的原子递增语句（固定加锁顺序，避免多个进程互相死锁）"""
+    ids = sorted(counts)
+    target = getattr(model, column)
+    for start in range(0, len(ids), FLUSH_BATCH_SIZE):
+        batch = ids[start:start + FLUSH_BATCH_SIZE]
+        values = {column: func.coalesce(target, 0) + case({key: counts[key] for key in batch}, value=model.id)}
+        if keep_updated_at:
+            # 投票不算作修改投票本身，避免触发 onupdate
+            values["updated_at"] = model.updated_at
+        yield (
+            update(model)
+            .where(model.id.in_(batch))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def flush_poll_votes(db: Session) -> int:
+    """把缓冲中的票数写回数据库，返回写回的投票数"""
+    counts: Dict[Tuple[str, str], int] = poll_vote_counter.drain()
+    if not counts:
+        return 0
+    option_counts: Dict[str, int] = {}
+    poll_counts: Dict[str, int] = {}
+    for (poll_id, option_id), count in counts.items():
+        option_counts[option_id] = option_counts.get(option_id, 0) + count
+        poll_counts[poll_id] = poll_counts.get(poll_id, 0) + count
+    try:
+        for stmt in _increment_statements(PollOption, "vote_count", option_counts):
+            db.execute(stmt)
+        for stmt in _increment_statements(Poll, "total_votes", poll_counts, keep_updated_at=True):
+            db.execute(stmt)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        poll_vote_counter.restore(counts)
+        raise
+    for poll_id in poll_counts:
+        poll_snapshot_cache.invalidate(poll_id)
+    return len(poll_counts)
+
+
+# ==================== 后台写回任务 ====================
+
+def _flush_in_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return flush_poll_votes(db)
+    finally:
+        db.close()
+
+
+async def _flush_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_storage_task(_flush_in_new_session)
+        except Exception as exc:  # 写回失败不应终止循环，增量已放回缓冲
+            print(f"⚠️ 投票计数写回失败: {exc}")
+
+
+def start_poll_vote_flusher() -> None:
+    """启动定时写回"""
+    global _flush_task
+    interval = _settings.poll_vote_flush_interval_seconds
+    if interval > 0 and _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop(interval))
+
+
+async def stop_poll_vote_flusher() -> None:
+    """停止定时写回，并写回剩余增量"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    try:
+        flushed = await run_storage_task(_flush_in_new_session)
+        if flushed:
+            print(f"✅ 已写回 {flushed} 个投票的计数")
+    except Exception as exc:
+        print(f"⚠️ 投票计数写回失败，{len(poll_vote_counter)} 个选项的增量丢失: {exc}")
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+统一审核队列：文章、视频、行程、图片组按创建时间倒序合并分页
+
+- 一条 UNION ALL 查询：每种内容只投影 (类型, 创建时间, ID)，各分支按 (review_status, created_at)
+  索引取前 limit+1 行，外层再排序截断，因此每页的代价与页码无关
+- 键集分页：游标记录上一页最后一项的 (created_at, 类型, ID)，排序为 created_at、类型、ID 倒序，
+  翻页时各分支只读取游标之后的行，不会因为前面新增/审核的内容导致重复或漏项
+- 仍支持 skip（偏移分页），结果正确，但代价随 skip 增长
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, String, and_, cast, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from ..models.article import Article
+from ..models.gallery_db import PhotoGroup
+from ..models.schedule_db import Schedule
+from ..models.video import Video
+
+
+class ReviewSource(NamedTuple):
+    content_type: str
+    model: Any
+    numeric_id: bool  # 行程为自增整数ID，其余为 UUID 字符串
+    soft_delete: bool
+
+
+# 类型名按字母倒序即为同一时刻内的排序
+REVIEW_SOURCES: Dict[str, ReviewSource] = {
+    'article': ReviewSource('article', Article, False, True),
+    'video': ReviewSource('video', Video, False, False),
+    'schedule': ReviewSource('schedule', Schedule, True, False),
+    'gallery': ReviewSource('gallery', PhotoGroup, False, True),
+}
+
+
+class ReviewCursor(NamedTuple):
+    created_at: datetime
+    content_type: str
+    content_id: Any
+
+
+class ReviewQueueKey(NamedTuple):
+    content_type: str
+    content_id: Any
+    created_at: datetime
+
+
+def encode_cursor(key: ReviewQueueKey) -> str:
+    payload = json.dumps(
+        {"t": key.created_at.isoformat(), "k": key.content_type, "i": key.content_id},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> ReviewCursor:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        source = REVIEW_SOURCES[data["k"]]
+        content_id = int(data["i"]) if source.numeric_id else str(data["i"])
+        return ReviewCursor(datetime.fromisoformat(data["t"]), source.content_type, content_id)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
+def _branch(source: ReviewSource, status: Optional[str], cursor: Optional[ReviewCursor], fetch: int):
+    """单个内容类型的分支：按索引顺序取前 fetch 行"""
+    model = source.model
+    conditions = [model.created_at.isnot(None)]
+    if source.soft_delete:
+        conditions.append(model.is_deleted == False)  # noqa: E712
+    if status:
+        conditions.append(model.review_status == status)
+
+    if cursor is not None:
+        if source.content_type > cursor.content_type:
+            # 同一时刻本类型排在游标之前
+            conditions.append(model.created_at < cursor.created_at)
+        elif source.content_type < cursor.content_type:
+            conditions.append(model.created_at <= cursor.created_at)
+        else:
+            conditions.append(or_(
+                model.created_at < cursor.created_at,
+                and_(model.created_at == cursor.created_at, model.id < cursor.content_id),
+            ))
+
+    inner = (
+        select(model.created_at.label('created_at'), model.id.label('content_id'))
+        .where(*conditions)
+        .order_by(model.created_at.desc(), model.id.desc())
+        .limit(fetch)
+        .subquery()
+    )
+    # 包一层子查询：各分支带 ORDER BY / LIMIT，且 ID 类型不同，统一投影为 (数字ID, 字符串ID)
+    return select(
+        literal(source.content_type, String).label('content_type'),
+        inner.c.created_at,
+        (inner.c.content_id if source.numeric_id else literal(0, Integer)).label('id_num'),
+        (literal('', String) if source.numeric_id else cast(inner.c.content_id, String)).label('id_str'),
+    )
+
+
+def review_queue_page(
+    db: Session,
+    *,
+    content_type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[ReviewQueueKey], Optional[str]]:
+    """
+    查询一页审核队列
+    :return: (本页的 (类型, ID, 创建时间) 列表, 下一页游标；没有下一页时为 None)
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is not None:
+        skip = 0
+    fetch = skip + limit + 1
+
+    sources = [REVIEW_SOURCES[content_type]] if content_type else list(REVIEW_SOURCES.values())
+    branches = [_branch(source, status, decoded, fetch) for source in sources]
+    queue = (union_all(*branches) if len(branches) > 1 else branches[0]).subquery('review_queue')
+    stmt = (
+        select(queue)
+        .order_by(
+            queue.c.created_at.desc(),
+            queue.c.content_type.desc(),
+            queue.c.id_num.desc(),
+            queue.c.id_str.desc(),
+        )
+        .offset(skip)
+        .limit(limit + 1)
+    )
+
+    keys = []
+    for row in db.execute(stmt):
+        source = REVIEW_SOURCES[row.content_type]
+        content_id = int(row.id_num) if source.numeric_id else row.id_str
+        keys.append(ReviewQueueKey(row.content_type, content_id, row.created_at))
+
+    next_cursor = encode_cursor(keys[limit - 1]) if len(keys) > limit else None
+    return keys[:limit], next_cursor
+
+
+def load_review_items(db: Session, keys: List[ReviewQueueKey]) -> List[Tuple[str, Any]]:
+    """按主键批量加载队列中的内容（每种类型一次查询），保持队列顺序"""
+    ids_by_type: Dict[str, List[Any]] = {}
+    for key in keys:
+        ids_by_type.setdefault(key.content_type, []).append(key.content_id)
+
+    loaded: Dict[Tuple[str, Any], Any] = {}
+    for content_type, ids in ids_by_type.items():
+        model = REVIEW_SOURCES[content_type].model
+        for obj in db.query(model).filter(model.id.in_(ids)).all():
+            loaded[(content_type, obj.id)] = obj
+
+    return [
+        (key.content_type, loaded[(key.content_type, key.content_id)])
+        for key in keys
+        if (key.content_type, key.content_id) in loaded
+    ]
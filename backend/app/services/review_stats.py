@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+审核统计：各内容类型按审核状态计数
+
+- 每张表一次 GROUP BY review_status，四个分支 UNION ALL 后一次往返取回，替代原先 12 条 COUNT
+- 结果在进程内缓存几秒：统计卡片随审核列表频繁刷新，短暂过期可以接受；
+  审核通过/拒绝、提交审核等改变 review_status 的接口会主动失效
+"""
+from typing import Any, Dict
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.ttl_cache import TTLCache
+from .review_queue import REVIEW_SOURCES
+
+REVIEW_STATUSES = ('pending', 'approved', 'rejected')
+
+_settings = get_settings()
+_CACHE_KEY = "review_statistics"
+
+review_stats_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=1,
+    ttl_seconds=_settings.review_stats_cache_ttl_seconds,
+)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"total": 0, **{status: 0 for status in REVIEW_STATUSES}}
+
+
+def compute_review_statistics(db: Session) -> Dict[str, Any]:
+    """直接查询数据库统计（不走缓存）"""
+    branches = []
+    for source in REVIEW_SOURCES.values():
+        model = source.model
+        conditions = [model.review_status.in_(REVIEW_STATUSES)]
+        if source.soft_delete:
+            conditions.append(model.is_deleted == False)  # noqa: E712
+        branches.append(
+            select(
+                literal(source.content_type).label("content_type"),
+                model.review_status.label("review_status"),
+                func.count().label("cnt"),
+            )
+            .where(*conditions)
+            .group_by(model.review_status)
+        )
+
+    stats: Dict[str, Any] = {
+        **_empty_counts(),
+        "by_type": {content_type: _empty_counts() for content_type in REVIEW_SOURCES},
+    }
+    for content_type, status, count in db.execute(union_all(*branches)).all():
+        by_type = stats["by_type"][content_type]
+        by_type[status] += count
+        by_type["total"] += count
+        stats[status] += count
+        stats["total"] += count
+    return stats
+
+
+def get_review_statistics(db: Session) -> Dict[str, Any]:
+    """审核统计（带短时缓存）"""
+    stats = review_stats_cache.get(_CACHE_KEY)
+    if stats is None:
+        stats = compute_review_statistics(db)
+        review_stats_cache.set(_CACHE_KEY, stats)
+    return stats
+
+
+def invalidate_review_statistics() -> None:
+    """review_status 变化后调用，下一次请求重新统计"""
+    review_stats_cache.clear()
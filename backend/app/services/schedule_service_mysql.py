@@ -3,12 +3,11 @@ import io
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
-import tempfile
 import json
 
 from fastapi import UploadFile
 from PIL import Image
-from sqlalchemy import or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 try:
@@ -22,42 +21,57 @@ from ..core.config import get_settings
 from ..models.schedule_db import Schedule
 from ..services.storage import get_storage
 from ..utils.datetime_utils import get_beijing_now
-from ..utils.image_utils import compress_image
+from ..utils.image_utils import compress_image_bytes
 
 
 class ScheduleServiceMySQL:
     """处理行程数据的服务（MySQL版本，使用 OSS 存储海报）"""
 
+    # 进程级标记：历史行程是否已完成“已审核 + 已发布”归一化
+    _existing_entries_normalized = False
+
     def __init__(self, db: Session) -> None:
         self.db = db
         self.storage = get_storage()
         settings = get_settings()
         self.default_poster_url = getattr(settings, "schedule_default_poster_url", None)
-        self._auto_publish_existing_entries()
 
-    def _auto_publish_existing_entries(self) -> None:
-        """确保所有现有行程都标记为已审核且已发布"""
-        outdated = self.db.query(Schedule).filter(
-            or_(Schedule.review_status != 'approved', Schedule.is_published != 1)
-        ).all()
+    @classmethod
+    def normalize_existing_entries(cls, db: Session, *, force: bool = False) -> int:
+        """
+        确保所有现有行程都标记为已审核且已发布（每个进程只执行一次）
 
-        if not outdated:
-            return
+        由应用启动任务调用，不再在每次构造服务时扫描全表。
+        使用批量 UPDATE 直接在数据库中完成，不加载行数据。
 
-        now = get_beijing_now()
-        updated = False
+        Returns:
+            被更新的行数
+        """
+        if cls._existing_entries_normalized and not force:
+            return 0
 
-        for schedule in outdated:
-            if schedule.review_status != 'approved':
-                schedule.review_status = 'approved'
-                schedule.reviewed_at = schedule.reviewed_at or now
-                updated = True
-            if schedule.is_published != 1:
-                schedule.is_published = 1
-                updated = True
+        now = get_beijing_now()
+        updated = db.query(Schedule).filter(
+            Schedule.review_status != 'approved'
+        ).update(
+            {
+                Schedule.review_status: 'approved',
+                Schedule.reviewed_at: func.coalesce(Schedule.reviewed_at, now),
+            },
+            synchronize_session=False,
+        )
+        updated += db.query(Schedule).filter(
+            Schedule.is_published != 1
+        ).update(
+            {Schedule.is_published: 1},
+            synchronize_session=False,
+        )
 
         if updated:
-            self.db.commit()
+            db.commit()
+
+        cls._existing_entries_normalized = True
+        return updated
 
     @staticmethod
     def _normalize_date_string(date_str: Optional[str]) -> Optional[str]:
@@ -177,16 +191,8 @@ class ScheduleServiceMySQL:
         original_object_name = f"{object_prefix}-poster-{index}{extension}"
         thumb_object_name = f"{object_prefix}-poster-{index}-thumb.jpg"
 
-        thumb_bytes: bytes
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            original_path = Path(tmp_dir) / f"original{extension}"
-            original_path.write_bytes(file_bytes)
-
-            thumb_path = Path(tmp_dir) / "thumb.jpg"
-            if compress_image(original_path, thumb_path, max_size_kb=200):
-                thumb_bytes = thumb_path.read_bytes()
-            else:
-                thumb_bytes = file_bytes
+        compressed = compress_image_bytes(file_bytes, max_size_kb=200)
+        thumb_bytes = compressed.data if compressed else file_bytes
 
         original_url = self.storage.upload_bytes(file_bytes, original_object_name, content_type=mime_type)
         thumb_url = self.storage.upload_bytes(thumb_bytes, thumb_object_name, content_type="image/jpeg")
@@ -338,12 +344,10 @@ class ScheduleServiceMySQL:
 
         if image_file is not None:
             # 删除旧图（忽略失败）
-            for url in {schedule.image, schedule.image_thumb}:
-                if url:
-                    try:
-                        self.storage.delete_image(url)
-                    except Exception:
-                        pass
+            try:
+                self.storage.delete_images([schedule.image, schedule.image_thumb])
+            except Exception:
+                pass
 
             current_category = category if category is not None else schedule.category
             current_date = schedule.date or get_beijing_now().strftime('%Y-%m-%d')
@@ -403,12 +407,10 @@ class ScheduleServiceMySQL:
         if not schedule:
             return False
 
-        for url in {schedule.image, schedule.image_thumb}:
-            if url:
-                try:
-                    self.storage.delete_image(url)
-                except Exception:
-                    pass
+        try:
+            self.storage.delete_images([schedule.image, schedule.image_thumb])
+        except Exception:
+            pass
 
         self.db.delete(schedule)
         self.db.commit()
@@ -1,90 +1,32 @@
 # -*- coding: utf-8 -*-
 """
 图片存储服务
-使用阿里云 OSS (oss2) 官方 SDK
+压缩、命名规则在这里，上传和删除统一交给 storage_service 中配置的存储后端（本地 / 阿里云 OSS）
 """
-import os
 import io
 import uuid
 from datetime import datetime
-from typing import Literal
+from typing import Iterable, Optional
 from PIL import Image
 
-# 尝试导入 oss2，如果不存在则使用 None
-try:
-    import oss2
-except ImportError:
-    oss2 = None
+from ..core.config import get_settings
 
-# 存储配置
-STORAGE_TYPE: Literal["oss"] = os.getenv("STORAGE_TYPE", "oss")
-
-# 阿里云 OSS 配置
-OSS_ENDPOINT = os.getenv("OSS_ENDPOINT", "")  # 例如：oss-cn-hangzhou.aliyuncs.com
-OSS_ACCESS_KEY = os.getenv("OSS_ACCESS_KEY", "")
-OSS_SECRET_KEY = os.getenv("OSS_SECRET_KEY", "")
-OSS_BUCKET = os.getenv("OSS_BUCKET", "wangfeng-images")
-OSS_CUSTOM_DOMAIN = os.getenv("OSS_CUSTOM_DOMAIN", "")  # 可选：自定义域名
+from ..utils.image_utils import JpegEncodeResult, encode_jpeg_to_size, to_rgb
+from .storage_service import StorageService, get_storage_service
 
 
 class ImageStorage:
-    """图片存储类，仅支持阿里云 OSS"""
-
-    def __init__(self):
-        self.storage_type = STORAGE_TYPE
-        self.client = None
-        self._initialized = False
-
-    def _ensure_initialized(self):
-        """延迟初始化，避免启动时阻塞"""
-        if self._initialized:
-            return
-
-        try:
-            self._init_oss()
-            self._initialized = True
-        except Exception as e:
-            print(f"⚠️ 存储初始化失败: {e}")
-            print("💡 将在首次使用时重试...")
-            raise
+    """图片存储类：压缩图片并通过统一的存储后端上传"""
 
-    def _init_minio(self):
-        """已移除 MinIO 支持，请使用 oss 存储类型"""
-        raise NotImplementedError("MinIO 已移除，请使用 STORAGE_TYPE=oss")
+    def __init__(self, backend: Optional[StorageService] = None):
+        self._backend = backend
 
-    def _init_r2(self):
-        """已移除 Cloudflare R2 支持，请使用 oss 存储类型"""
-        raise NotImplementedError("R2 已移除，请使用 STORAGE_TYPE=oss")
-
-    def _init_oss(self):
-        """初始化阿里云 OSS 客户端（使用官方 oss2 SDK）"""
-        try:
-            if not oss2:
-                raise ImportError("oss2 library not installed. 请运行: pip install oss2")
-
-            if not OSS_ENDPOINT or not OSS_ACCESS_KEY or not OSS_SECRET_KEY or not OSS_BUCKET:
-                raise ValueError("⚠️ 阿里云 OSS 配置不完整。请检查环境变量: OSS_ENDPOINT, OSS_ACCESS_KEY, OSS_SECRET_KEY, OSS_BUCKET")
-
-            # 创建 OSS 认证对象
-            auth = oss2.Auth(OSS_ACCESS_KEY, OSS_SECRET_KEY)
-
-            # 创建 Bucket 对象
-            # endpoint 不包含 bucket 名称，oss2 会自动添加
-            # 最终 URL 格式: https://{bucket}.{endpoint}/{object}
-            oss_endpoint_url = f"https://{OSS_ENDPOINT}"
-            self.client = oss2.Bucket(auth, oss_endpoint_url, OSS_BUCKET)
-
-            # 测试连接 - 使用 get_bucket_info() 验证 bucket 是否可访问
-            try:
-                bucket_info = self.client.get_bucket_info()
-                print(f"✅ 阿里云 OSS 已连接: {OSS_BUCKET} (存储类型: {bucket_info.storage_class})")
-            except Exception as test_error:
-                print(f"⚠️ OSS 连接测试警告: {test_error}")
-                print(f"💡 将继续使用 OSS，首次上传时会验证连接")
-
-        except Exception as e:
-            print(f"❌ 阿里云 OSS 初始化失败: {e}")
-            raise
+    @property
+    def backend(self) -> StorageService:
+        """延迟获取存储后端，避免启动时因存储配置不完整而失败"""
+        if self._backend is None:
+            self._backend = get_storage_service()
+        return self._backend
 
     def compress_image(self, image_data: bytes, max_size_mb: float = 1.0) -> tuple[bytes, str]:
         """
@@ -97,21 +39,28 @@ class ImageStorage:
         Returns:
             (压缩后的图片数据, 图片格式)
         """
+        result = self.compress_image_with_stats(image_data, max_size_mb)
+        return result.data, 'jpg'
+
+    def compress_image_with_stats(self, image_data: bytes, max_size_mb: float = 1.0) -> JpegEncodeResult:
+        """
+        压缩图片到指定大小以内，并返回编码统计（质量、编码次数）
+
+        Args:
+            image_data: 原始图片数据
+            max_size_mb: 最大文件大小（MB）
+        """
+        max_dimension = 2048  # 最大边长
+
         img = Image.open(io.BytesIO(image_data))
+        # JPEG 直接按缩小比例解码，避免解码全尺寸像素
+        img.draft('RGB', (max_dimension, max_dimension))
 
         # 转换 RGBA 为 RGB（JPEG 不支持透明度）
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
-
-        # 获取原始尺寸
-        width, height = img.size
-        max_dimension = 2048  # 最大边长
+        img = to_rgb(img)
 
         # 如果尺寸过大，先缩放
+        width, height = img.size
         if width > max_dimension or height > max_dimension:
             if width > height:
                 new_width = max_dimension
@@ -121,27 +70,18 @@ class ImageStorage:
                 new_width = int(width * (max_dimension / height))
             img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
-        # 逐步降低质量直到满足大小要求
-        quality = 90
-        max_size_bytes = int(max_size_mb * 1024 * 1024)
-
-        while quality > 20:
-            output = io.BytesIO()
-            img.save(output, format='JPEG', quality=quality, optimize=True)
-            size = output.tell()
-
-            if size <= max_size_bytes:
-                output.seek(0)
-                return output.read(), 'jpg'
-
-            quality -= 10
-
-        # 如果还是太大，进一步缩小尺寸
-        output = io.BytesIO()
-        img = img.resize((int(img.width * 0.8), int(img.height * 0.8)), Image.Resampling.LANCZOS)
-        img.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
-        return output.read(), 'jpg'
+        # 二分查找满足大小要求的最高质量
+        result = encode_jpeg_to_size(
+            img,
+            int(max_size_mb * 1024 * 1024),
+            max_quality=90,
+            min_quality=30,
+        )
+        print(
+            f"📦 图片压缩: {result.width}x{result.height} 质量 {result.quality}，"
+            f"{result.encodes} 次编码（探针 {result.probe_encodes} 次），{len(result.data) / 1024:.0f}KB"
+        )
+        return result
 
     def generate_filename(self, original_filename: str, extension: str) -> str:
         """
@@ -172,14 +112,6 @@ class ImageStorage:
         filename = f"{file_uuid}_{clean_name}.{extension}"
         return f"article-images/general/{year}/{month}/{day}/{filename}"
 
-    def _object_name_to_url(self, object_name: str) -> str:
-        """将 OSS 对象键转换为可访问 URL"""
-        if OSS_CUSTOM_DOMAIN:
-            # 使用自定义域名（如果配置了）
-            return f"https://{OSS_CUSTOM_DOMAIN}/{object_name}"
-        # 使用虚拟主机式 URL（virtual hosted-style）
-        return f"https://{OSS_BUCKET}.{OSS_ENDPOINT}/{object_name}"
-
     def upload_bytes(
         self,
         data: bytes,
@@ -187,32 +119,25 @@ class ImageStorage:
         content_type: str = "image/jpeg",
     ) -> str:
         """
-        使用指定的对象键上传原始二进制数据到 OSS
+        使用指定的对象键上传原始二进制数据
 
         Args:
             data: 文件二进制数据
-            object_name: OSS 对象键（包含目录和文件名）
+            object_name: 对象键（包含目录和文件名）
             content_type: Content-Type 头
 
         Returns:
             文件访问 URL
         """
-        # 确保已初始化
-        self._ensure_initialized()
-
         try:
-            headers = {
-                "Content-Type": content_type,
-            }
-            self.client.put_object(object_name, data, headers=headers)
-            return self._object_name_to_url(object_name)
+            return self.backend.upload_bytes(data, object_name, content_type)
         except Exception as e:
-            print(f"❌ 上传到 OSS 失败: {e}")
+            print(f"❌ 上传图片失败: {e}")
             raise
 
     def upload_image(self, image_data: bytes, filename: str) -> str:
         """
-        上传图片到阿里云 OSS
+        压缩并上传图片
 
         Args:
             image_data: 图片数据
@@ -221,62 +146,57 @@ class ImageStorage:
         Returns:
             图片的访问 URL
         """
-        # 确保已初始化
-        self._ensure_initialized()
-
         # 压缩图片
         compressed_data, extension = self.compress_image(image_data, max_size_mb=1.0)
 
         # 生成唯一文件名
         object_name = self.generate_filename(filename, extension)
 
-        # 上传到 OSS
-        return self._upload_to_oss(compressed_data, object_name)
-
-    def _upload_to_oss(self, image_data: bytes, object_name: str) -> str:
-        """上传到阿里云 OSS（使用官方 oss2 SDK）"""
-        try:
-            # 使用 oss2 的 put_object 方法上传
-            self.client.put_object(object_name, image_data)
-
-            # 生成访问 URL
-            return self._object_name_to_url(object_name)
-
-        except Exception as e:
-            print(f"❌ 上传到 OSS 失败: {e}")
-            raise
+        return self.upload_bytes(compressed_data, object_name)
 
     def delete_image(self, url: str) -> bool:
         """
-        删除图片（从阿里云 OSS）
+        删除图片
 
         Args:
-            url: 图片 URL
+            url: 图片 URL（自定义域名、OSS 默认域名或 /uploads/ 本地路径）
 
         Returns:
-            是否删除成功
+            是否删除成功（图片仍被其他上传引用时只释放引用，同样返回 True）
         """
-        # 确保已初始化
-        self._ensure_initialized()
-
-        try:
-            # 从 URL 提取 object_name
-            # 支持两种 URL 格式：
-            # 1. https://{bucket}.{endpoint}/{object_name}
-            # 2. https://{custom_domain}/{object_name}
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
+        return self.delete_images([url])
 
-            # 移除开头的 /
-            object_name = parsed.path.lstrip('/')
+    def delete_images(self, urls: Iterable[str]) -> bool:
+        """
+        删除同一张图片的多个尺寸（如原图和缩略图），只释放一次引用
 
-            # 删除对象
-            self.client.delete_object(object_name)
-            return True
+        Args:
+            urls: 图片 URL 列表
 
-        except Exception as e:
-            print(f"❌ 删除图片失败: {e}")
-            return False
+        Returns:
+            是否全部删除成功
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        if get_settings().image_dedup_enabled:
+            # 延迟导入：只做压缩的脚本不依赖数据库
+            from .image_dedup import release_image_urls
+            urls = release_image_urls(urls)
+            if urls is None:
+                # 无法确认引用情况时保留文件
+                return False
+
+        # 延迟导入：衍生图服务依赖配置中的本地缓存目录
+        from .image_derivatives import purge_image_derivatives
+
+        success = True
+        for url in urls:
+            try:
+                purge_image_derivatives(self.backend.key_from_url(url))
+                success = self.backend.delete_url(url) and success
+            except Exception as e:
+                print(f"❌ 删除图片失败: {e}")
+                success = False
+        return success
 
 
 # 全局单例
@@ -1,8 +1,24 @@
 # -*- coding: utf-8 -*-
-"""存储服务 - 支持本地存储和阿里云OSS"""
+"""
+存储服务 - 支持本地存储和阿里云OSS
+
+所有上传入口都直接接收内存数据或文件对象，不经过临时文件：
+- upload_bytes：内存中的完整数据
+- upload_fileobj：可读的二进制文件对象（如 UploadFile.file）
+- upload_stream：逐块产生的数据，超过一个分片时 OSS 使用分片上传，本地存储边读边写
+"""
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
+from urllib.parse import urlparse
+import base64
+import hashlib
+import itertools
+import json
+import mimetypes
 import os
+import shutil
+import threading
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -11,11 +27,47 @@ from ..core.config import get_settings
 
 settings = get_settings()
 
+# 从文件对象读取数据的块大小
+STREAM_CHUNK_SIZE = 1024 * 1024
+# OSS 要求除最后一片外每个分片不小于 100KB
+MIN_PART_SIZE = 100 * 1024
+# 上传时写入的对象元数据，记录源文件 MD5（分片上传的 ETag 不是内容 MD5）
+UPLOAD_MD5_META = 'x-oss-meta-content-md5'
+
+
+def iter_fileobj(fileobj: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """按块读取文件对象"""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def iter_parts(chunks: Iterable[bytes], part_size: int) -> Iterator[bytes]:
+    """把任意大小的数据块重新切分为固定大小的分片（最后一片可能较小）"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def guess_content_type(path: str, default: str = "application/octet-stream") -> str:
+    return mimetypes.guess_type(path)[0] or default
+
 
 class StorageService(ABC):
     """存储服务抽象基类"""
 
-    @abstractmethod
+    @property
+    def part_size(self) -> int:
+        """流式上传的分片大小（字节）"""
+        return settings.storage_multipart_part_size_mb * 1024 * 1024
+
     def upload_file(self, file_path: str, destination_path: str) -> str:
         """
         上传文件
@@ -23,6 +75,67 @@ class StorageService(ABC):
         :param destination_path: 目标路径（相对路径）
         :return: 文件访问URL
         """
+        with open(file_path, 'rb') as f:
+            return self.upload_fileobj(f, destination_path, guess_content_type(file_path))
+
+    @abstractmethod
+    def upload_bytes(self, data: bytes, destination_path: str, content_type: str = "image/jpeg") -> str:
+        """
+        上传内存中的数据
+        :param data: 文件内容
+        :param destination_path: 目标路径（相对路径）
+        :param content_type: MIME 类型
+        :return: 文件访问URL
+        """
+        pass
+
+    def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        destination_path: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        上传文件对象（从当前位置读到末尾）
+        :param fileobj: 可读的二进制文件对象
+        :param destination_path: 目标路径（相对路径）
+        :param content_type: MIME 类型
+        :return: 文件访问URL
+        """
+        return self.upload_stream(iter_fileobj(fileobj), destination_path, content_type)
+
+    @abstractmethod
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        destination_path: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        流式上传，数据不需要一次性放入内存
+        :param chunks: 逐块产生的数据
+        :param destination_path: 目标路径（相对路径）
+        :param content_type: MIME 类型
+        :return: 文件访问URL
+        """
+        pass
+
+    @abstractmethod
+    def read_bytes(self, file_path: str) -> Optional[bytes]:
+        """
+        读取文件内容
+        :param file_path: 文件路径（存储键）
+        :return: 文件内容，不存在时返回 None
+        """
+        pass
+
+    @abstractmethod
+    def stat(self, file_path: str) -> Optional["ObjectStat"]:
+        """
+        读取文件元数据（不读取内容）
+        :param file_path: 文件路径（存储键）
+        :return: 版本标识和修改时间，不存在时返回 None
+        """
         pass
 
     @abstractmethod
@@ -43,6 +156,14 @@ class StorageService(ABC):
         """
         pass
 
+    def key_from_url(self, url: str) -> str:
+        """从访问URL（或存储键）还原存储键"""
+        return urlparse(url).path.lstrip('/')
+
+    def delete_url(self, url: str) -> bool:
+        """根据访问URL删除文件"""
+        return self.delete_file(self.key_from_url(url))
+
 
 class LocalStorage(StorageService):
     """本地存储服务"""
@@ -52,6 +173,27 @@ class LocalStorage(StorageService):
         # 确保基础路径存在
         os.makedirs(self.base_path, exist_ok=True)
 
+    def _full_path(self, destination_path: str) -> str:
+        full_destination = os.path.join(self.base_path, destination_path)
+        # 确保目标目录存在
+        os.makedirs(os.path.dirname(full_destination), exist_ok=True)
+        return full_destination
+
+    def _write_chunks(self, chunks: Iterable[bytes], destination_path: str) -> str:
+        """先写入同目录下的 .part 文件再原子替换，读取方不会看到写了一半的文件"""
+        full_destination = self._full_path(destination_path)
+        partial_path = f"{full_destination}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            with open(partial_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(partial_path, full_destination)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return f"/uploads/{destination_path}"
+
     def upload_file(self, file_path: str, destination_path: str) -> str:
         """
         上传文件到本地存储
@@ -60,19 +202,44 @@ class LocalStorage(StorageService):
         :return: 文件访问URL
         """
         # 构建完整的目标路径
-        full_destination = os.path.join(self.base_path, destination_path)
-
-        # 确保目标目录存在
-        os.makedirs(os.path.dirname(full_destination), exist_ok=True)
+        full_destination = self._full_path(destination_path)
 
         # 如果源文件和目标文件不同，则复制
         if os.path.abspath(file_path) != os.path.abspath(full_destination):
-            import shutil
             shutil.copy2(file_path, full_destination)
 
         # 返回相对URL路径
         return f"/uploads/{destination_path}"
 
+    def upload_bytes(self, data: bytes, destination_path: str, content_type: str = "image/jpeg") -> str:
+        """将内存中的数据写入本地存储"""
+        return self._write_chunks((data,), destination_path)
+
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        destination_path: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """边读边写入本地存储"""
+        return self._write_chunks(chunks, destination_path)
+
+    def read_bytes(self, file_path: str) -> Optional[bytes]:
+        """读取本地文件"""
+        try:
+            with open(os.path.join(self.base_path, file_path), 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def stat(self, file_path: str) -> Optional["ObjectStat"]:
+        """本地文件的修改时间和大小"""
+        try:
+            st = os.stat(os.path.join(self.base_path, file_path))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return ObjectStat(version=f"{st.st_mtime_ns:x}-{st.st_size:x}", modified=st.st_mtime)
+
     def delete_file(self, file_path: str) -> bool:
         """删除本地文件"""
         try:
@@ -91,6 +258,12 @@ class LocalStorage(StorageService):
             return file_path
         return f"/uploads/{file_path}"
 
+    def key_from_url(self, url: str) -> str:
+        path = urlparse(url).path
+        if path.startswith('/uploads/'):
+            return path[len('/uploads/'):]
+        return path.lstrip('/')
+
 
 class OSSStorage(StorageService):
     """阿里云OSS存储服务"""
@@ -142,6 +315,73 @@ class OSSStorage(StorageService):
         except Exception as e:
             raise Exception(f"上传到OSS失败: {e}")
 
+    def upload_bytes(self, data: bytes, destination_path: str, content_type: str = "image/jpeg") -> str:
+        """将内存中的数据直接上传到阿里云OSS"""
+        try:
+            self.bucket.put_object(destination_path, data, headers={'Content-Type': content_type})
+            return self.get_file_url(destination_path)
+        except Exception as e:
+            raise Exception(f"上传到OSS失败: {e}")
+
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        destination_path: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        流式上传到阿里云OSS
+        不超过一个分片时直接 put_object；否则使用分片上传，内存中最多保留两个分片，失败时取消分片上传
+        """
+        parts = iter_parts(chunks, self.part_size)
+        first = next(parts, b'')
+        second = next(parts, None)
+        if second is None:
+            return self.upload_bytes(first, destination_path, content_type)
+
+        from oss2.models import PartInfo
+
+        upload_id = self.bucket.init_multipart_upload(
+            destination_path, headers={'Content-Type': content_type}
+        ).upload_id
+        uploaded = []
+        try:
+            for part_number, data in enumerate(itertools.chain((first, second), parts), start=1):
+                result = self.bucket.upload_part(destination_path, upload_id, part_number, data)
+                uploaded.append(PartInfo(part_number, result.etag, size=len(data)))
+            self.bucket.complete_multipart_upload(destination_path, upload_id, uploaded)
+        except Exception as e:
+            try:
+                self.bucket.abort_multipart_upload(destination_path, upload_id)
+            except Exception as abort_error:
+                print(f"取消OSS分片上传失败: {abort_error}")
+            raise Exception(f"上传到OSS失败: {e}")
+
+        return self.get_file_url(destination_path)
+
+    def multipart_uploader(self, **options: Any) -> "MultipartUploader":
+        """基于当前 bucket 创建大文件上传器，参数见 MultipartUploader"""
+        return MultipartUploader(self.bucket, **options)
+
+    def read_bytes(self, file_path: str) -> Optional[bytes]:
+        """读取OSS对象"""
+        try:
+            return self.bucket.get_object(file_path).read()
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise Exception(f"读取OSS对象失败: {e}")
+
+    def stat(self, file_path: str) -> Optional["ObjectStat"]:
+        """OSS对象的 ETag 和修改时间（HEAD 请求）"""
+        try:
+            head = self.bucket.head_object(file_path)
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise Exception(f"读取OSS对象元数据失败: {e}")
+        return ObjectStat(version=head.etag, modified=float(head.last_modified))
+
     def delete_file(self, file_path: str) -> bool:
         """从OSS删除文件"""
         try:
@@ -161,6 +401,251 @@ class OSSStorage(StorageService):
         return f"https://{self.bucket_name}.{self.endpoint}/{file_path}"
 
 
+class ObjectStat(NamedTuple):
+    """存储对象的元数据"""
+    version: str      # 内容变化时随之变化（本地为修改时间+大小，OSS 为 ETag）
+    modified: float   # 修改时间（Unix 时间戳）
+
+
+class UploadResult(NamedTuple):
+    """单个文件的上传结果"""
+    key: str
+    status: str  # uploaded / skipped / failed
+    size: int
+    parts: int = 0  # 本次实际上传的分片数
+    resumed_parts: int = 0  # 从断点恢复、无需重传的分片数
+    error: Optional[str] = None
+    etag: Optional[str] = None  # 上传后对象的 ETag（增量同步用它发现远端被改动的对象）
+
+
+def file_md5(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> str:
+    """计算文件 MD5（十六进制）"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter_fileobj(f, chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _content_md5_header(data: bytes) -> str:
+    """Content-MD5 请求头（base64），服务端据此校验分片完整性"""
+    return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+
+def _is_not_found(error: Exception) -> bool:
+    return getattr(error, 'status', None) == 404
+
+
+class MultipartUploader:
+    """
+    大文件上传器：分片并行上传、断点续传、内容未变化时跳过
+
+    - 超过 multipart_threshold 的文件按 part_size 分片，分片在共享线程池中并行上传（part_workers）
+    - 多个文件同时上传的数量受 file_workers 限制
+    - 每完成一个分片就写入断点文件（checkpoint_dir），中断后重新运行会复用 upload_id，只上传缺失的分片
+    - 上传时把文件 MD5 写入对象元数据，目标对象 MD5 一致时直接跳过
+
+    bucket 只需提供 oss2.Bucket 的以下方法，便于用本地替身（如 MinIO 网关或内存实现）测试：
+    head_object、put_object、init_multipart_upload、upload_part、complete_multipart_upload
+    """
+
+    def __init__(
+        self,
+        bucket,
+        *,
+        part_size: Optional[int] = None,
+        multipart_threshold: Optional[int] = None,
+        part_workers: Optional[int] = None,
+        file_workers: Optional[int] = None,
+        checkpoint_dir: Optional[str] = None,
+        skip_unchanged: bool = True,
+        part_retries: int = 2,
+    ):
+        self.bucket = bucket
+        self.part_size = max(part_size or settings.storage_multipart_part_size_mb * 1024 * 1024, MIN_PART_SIZE)
+        self.multipart_threshold = multipart_threshold or self.part_size
+        self.file_workers = file_workers or settings.storage_upload_file_workers
+        self.checkpoint_dir = Path(checkpoint_dir or settings.storage_upload_checkpoint_dir)
+        self.skip_unchanged = skip_unchanged
+        self.part_retries = part_retries
+        self._part_pool = ThreadPoolExecutor(
+            max_workers=part_workers or settings.storage_upload_part_workers,
+            thread_name_prefix="upload-part",
+        )
+
+    def __enter__(self) -> "MultipartUploader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._part_pool.shutdown(wait=True)
+
+    # ---------- 断点 ----------
+
+    def _checkpoint_path(self, key: str) -> Path:
+        return self.checkpoint_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def _load_checkpoint(self, path: Path, signature: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """读取断点；本地文件内容或分片大小变化时断点作废"""
+        try:
+            state = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if any(state.get(name) != value for name, value in signature.items()):
+            return None
+        return state
+
+    def _save_checkpoint(self, path: Path, state: Dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, path)
+
+    def _drop_checkpoint(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # ---------- 上传 ----------
+
+    def _remote_md5(self, key: str) -> Optional[str]:
+        try:
+            return self.bucket.head_object(key).headers.get(UPLOAD_MD5_META)
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    def upload_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> UploadResult:
+        """上传单个文件，失败时返回 status=failed 的结果而不是抛出异常"""
+        size = 0
+        try:
+            local_path = os.path.abspath(local_path)
+            size = os.path.getsize(local_path)
+            md5 = file_md5(local_path)
+            if self.skip_unchanged and self._remote_md5(key) == md5:
+                return UploadResult(key, "skipped", size)
+
+            headers = {
+                'Content-Type': content_type or guess_content_type(local_path),
+                UPLOAD_MD5_META: md5,
+            }
+            if size <= self.multipart_threshold:
+                with open(local_path, 'rb') as f:
+                    data = f.read()
+                result = self.bucket.put_object(
+                    key, data, headers={**headers, 'Content-MD5': _content_md5_header(data)}
+                )
+                return UploadResult(key, "uploaded", size, parts=1, etag=getattr(result, 'etag', None))
+
+            return self._upload_multipart(local_path, key, size, md5, headers)
+        except Exception as e:
+            return UploadResult(key, "failed", size, error=str(e))
+
+    def _upload_multipart(
+        self, local_path: str, key: str, size: int, md5: str, headers: Dict[str, str]
+    ) -> UploadResult:
+        checkpoint_path = self._checkpoint_path(key)
+        signature = {"key": key, "size": size, "md5": md5, "part_size": self.part_size}
+        state = self._load_checkpoint(checkpoint_path, signature)
+        if state is not None:
+            try:
+                return self._send_parts(local_path, key, size, state, checkpoint_path)
+            except Exception as e:
+                if not _is_not_found(e):
+                    raise
+                # upload_id 已过期或被清理，重新开始
+                print(f"断点已失效，重新上传: {key}")
+
+        upload_id = self.bucket.init_multipart_upload(key, headers=headers).upload_id
+        state = {**signature, "upload_id": upload_id, "parts": {}}
+        self._save_checkpoint(checkpoint_path, state)
+        return self._send_parts(local_path, key, size, state, checkpoint_path)
+
+    def _send_parts(
+        self, local_path: str, key: str, size: int, state: Dict[str, Any], checkpoint_path: Path
+    ) -> UploadResult:
+        from oss2.models import PartInfo
+
+        upload_id = state["upload_id"]
+        completed = {int(number): etag for number, etag in state["parts"].items()}
+        resumed = len(completed)
+        part_count = (size + self.part_size - 1) // self.part_size
+        lock = threading.Lock()
+
+        def send(part_number: int) -> None:
+            with open(local_path, 'rb') as f:
+                f.seek((part_number - 1) * self.part_size)
+                data = f.read(self.part_size)
+            for attempt in range(self.part_retries + 1):
+                try:
+                    result = self.bucket.upload_part(
+                        key, upload_id, part_number, data,
+                        headers={'Content-MD5': _content_md5_header(data)},
+                    )
+                    break
+                except Exception as e:
+                    if _is_not_found(e) or attempt == self.part_retries:
+                        raise
+            with lock:
+                completed[part_number] = result.etag
+                state["parts"][str(part_number)] = result.etag
+                self._save_checkpoint(checkpoint_path, state)
+
+        futures = [
+            self._part_pool.submit(send, number)
+            for number in range(1, part_count + 1)
+            if number not in completed
+        ]
+        # 等待全部分片结束后再抛出第一个错误，让断点尽量多地记录已完成的分片
+        wait(futures)
+        for future in futures:
+            future.result()
+
+        parts = [
+            PartInfo(number, completed[number], size=min(self.part_size, size - (number - 1) * self.part_size))
+            for number in range(1, part_count + 1)
+        ]
+        result = self.bucket.complete_multipart_upload(key, upload_id, parts)
+        self._drop_checkpoint(checkpoint_path)
+        return UploadResult(
+            key, "uploaded", size,
+            parts=len(futures), resumed_parts=resumed, etag=getattr(result, 'etag', None),
+        )
+
+    def upload_files(
+        self,
+        files: Iterable[Tuple[str, str]],
+        progress: Optional[Callable[[UploadResult, int, int], None]] = None,
+    ) -> List[UploadResult]:
+        """
+        并行上传多个文件
+        :param files: (本地路径, 对象键) 列表
+        :param progress: 每个文件完成时的回调 (结果, 已完成数, 总数)
+        :return: 与输入顺序一致的上传结果
+        """
+        files = list(files)
+        results: List[Optional[UploadResult]] = [None] * len(files)
+        with ThreadPoolExecutor(max_workers=self.file_workers, thread_name_prefix="upload-file") as pool:
+            futures = {
+                pool.submit(self.upload_file, local_path, key): index
+                for index, (local_path, key) in enumerate(files)
+            }
+            for finished, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[futures[future]] = result
+                if progress:
+                    progress(result, finished, len(files))
+        return results
+
+
+# 按存储类型缓存的实例（OSS 客户端可在线程间复用，无需每次请求重新创建）
+_storage_instances: Dict[str, StorageService] = {}
+
+
 def get_storage_service(storage_type: str = None) -> StorageService:
     """
     获取存储服务实例
@@ -168,14 +653,15 @@ def get_storage_service(storage_type: str = None) -> StorageService:
     :return: 存储服务实例
     """
     storage_type = storage_type or settings.storage_type
-
-    if storage_type == "oss":
-        return OSSStorage()
-    elif storage_type == "local":
-        return LocalStorage()
-    else:
+    if storage_type != "oss":
         # 默认使用本地存储
-        return LocalStorage()
+        storage_type = "local"
+
+    instance = _storage_instances.get(storage_type)
+    if instance is None:
+        instance = OSSStorage() if storage_type == "oss" else LocalStorage()
+        _storage_instances[storage_type] = instance
+    return instance
 
 
 def generate_unique_filename(original_filename: str) -> str:
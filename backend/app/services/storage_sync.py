@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+本地目录与对象存储的增量同步（音乐库等大体量静态资源）
+
+- 本地清单（JSON）记录每个文件的大小、修改时间和 MD5；大小和修改时间不变的文件直接复用清单中的 MD5，不再重新读取
+- 清单同时记录上次同步写入的对象 ETag，与远端列举结果对比即可判断对象是否未变化，不需要逐个 HEAD
+- 只上传新增和内容变化的文件（MultipartUploader 分片并行上传），可选删除本地已不存在的远端对象
+- plan() 只读取、不写入远端，可用于 dry-run 报告
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .storage_service import (
+    UPLOAD_MD5_META,
+    MultipartUploader,
+    UploadResult,
+    file_md5,
+)
+
+MANIFEST_VERSION = 1
+# batch_delete_objects 单次最多删除的对象数
+DELETE_BATCH_SIZE = 1000
+
+
+class LocalFile(NamedTuple):
+    rel_path: str
+    key: str
+    local_path: str
+    size: int
+    mtime_ns: int
+    md5: str
+
+
+class RemoteObject(NamedTuple):
+    key: str
+    size: int
+    etag: str
+
+
+class SyncPlan(NamedTuple):
+    """同步计划：新增 / 变化 / 未变化的本地文件，以及本地已不存在的远端对象"""
+    new: List[LocalFile]
+    changed: List[LocalFile]
+    unchanged: List[LocalFile]
+    orphans: List[RemoteObject]
+
+    @property
+    def uploads(self) -> List[LocalFile]:
+        return self.new + self.changed
+
+    def report(self, delete_orphans: bool = False, limit: int = 20) -> str:
+        """可读的同步报告（dry-run 输出）"""
+        def megabytes(size: int) -> str:
+            return f"{size / (1024 * 1024):.1f}MB"
+
+        lines = [
+            f"新增: {len(self.new)} 个（{megabytes(sum(f.size for f in self.new))}）",
+            f"变化: {len(self.changed)} 个（{megabytes(sum(f.size for f in self.changed))}）",
+            f"未变化: {len(self.unchanged)} 个（{megabytes(sum(f.size for f in self.unchanged))}）",
+            f"远端多余: {len(self.orphans)} 个（{'将删除' if delete_orphans else '保留'}）",
+        ]
+        for title, items in (("新增", self.new), ("变化", self.changed), ("远端多余", self.orphans)):
+            for item in items[:limit]:
+                lines.append(f"  [{title}] {item.key}  {megabytes(item.size)}")
+            if len(items) > limit:
+                lines.append(f"  [{title}] ... 另有 {len(items) - limit} 个")
+        return "\n".join(lines)
+
+
+class SyncResult(NamedTuple):
+    uploaded: List[UploadResult]
+    failed: List[UploadResult]
+    deleted: List[str]
+
+
+class SyncManifest:
+    """
+    本地同步清单
+    files:  相对路径 -> {size, mtime_ns, md5}
+    remote: 对象键 -> {md5, etag}（最近一次确认远端内容与该 MD5 一致时的 ETag）
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.remote: Dict[str, Dict[str, Any]] = {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.files = data.get("files", {})
+            self.remote = data.get("remote", {})
+
+    def cached_md5(self, rel_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        entry = self.files.get(rel_path)
+        if entry and entry.get("size") == size and entry.get("mtime_ns") == mtime_ns:
+            return entry.get("md5")
+        return None
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        temp_path.write_text(
+            json.dumps(
+                {"version": MANIFEST_VERSION, "files": self.files, "remote": self.remote},
+                ensure_ascii=False,
+            ),
+            encoding='utf-8',
+        )
+        os.replace(temp_path, self.path)
+
+
+class DirectorySync:
+    """
+    将本地目录增量同步到对象存储的 prefix 下
+
+    bucket 需提供 oss2.Bucket 的 list_objects、head_object、batch_delete_objects
+    以及 MultipartUploader 用到的上传方法
+    """
+
+    def __init__(
+        self,
+        bucket,
+        local_dir: str,
+        prefix: str,
+        manifest_path: str,
+        *,
+        hash_workers: int = 4,
+        uploader_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.bucket = bucket
+        self.local_dir = Path(local_dir)
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.manifest = SyncManifest(manifest_path)
+        self.hash_workers = hash_workers
+        self.uploader_options = uploader_options or {}
+
+    def scan_local(self) -> List[LocalFile]:
+        """遍历本地目录；只有大小或修改时间变化的文件才重新计算 MD5"""
+        entries = []
+        for path in sorted(p for p in self.local_dir.rglob('*') if p.is_file()):
+            stat = path.stat()
+            rel_path = path.relative_to(self.local_dir).as_posix()
+            entries.append((rel_path, str(path), stat.st_size, stat.st_mtime_ns))
+
+        def resolve(entry) -> LocalFile:
+            rel_path, local_path, size, mtime_ns = entry
+            md5 = self.manifest.cached_md5(rel_path, size, mtime_ns) or file_md5(local_path)
+            return LocalFile(rel_path, self.prefix + rel_path, local_path, size, mtime_ns, md5)
+
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            files = list(pool.map(resolve, entries))
+
+        self.manifest.files = {
+            f.rel_path: {"size": f.size, "mtime_ns": f.mtime_ns, "md5": f.md5} for f in files
+        }
+        return files
+
+    def list_remote(self) -> Dict[str, RemoteObject]:
+        """分页列举 prefix 下的全部对象"""
+        objects: Dict[str, RemoteObject] = {}
+        marker = ''
+        while True:
+            result = self.bucket.list_objects(prefix=self.prefix, marker=marker, max_keys=1000)
+            for info in result.object_list:
+                if not info.key.endswith('/'):
+                    objects[info.key] = RemoteObject(info.key, info.size, info.etag)
+            if not result.is_truncated:
+                return objects
+            marker = result.next_marker
+
+    def _remote_matches(self, local: LocalFile, remote: RemoteObject) -> bool:
+        """远端对象内容是否与本地文件一致"""
+        if remote.size != local.size:
+            return False
+
+        record = self.manifest.remote.get(remote.key)
+        if record and record.get("etag") and record["etag"] == remote.etag:
+            # 远端自上次同步后未被改动，只需比较本地 MD5
+            return record.get("md5") == local.md5
+
+        # 清单中没有记录（首次同步或远端被其他工具改动）：
+        # 单次 put_object 的 ETag 就是内容 MD5；分片上传的 ETag 带 "-"，需要读取对象元数据中的 MD5
+        if '-' not in remote.etag and remote.etag.lower() == local.md5:
+            matched = True
+        else:
+            headers = self.bucket.head_object(remote.key).headers
+            matched = headers.get(UPLOAD_MD5_META) == local.md5
+        if matched:
+            self.manifest.remote[remote.key] = {"md5": local.md5, "etag": remote.etag}
+        return matched
+
+    def plan(self, force: bool = False) -> SyncPlan:
+        """
+        对比本地清单与远端列举结果，生成同步计划（不修改远端）
+        :param force: 忽略远端现有对象，全部重新上传
+        """
+        local_files = self.scan_local()
+        remote = self.list_remote()
+
+        new, changed, unchanged = [], [], []
+        for local in local_files:
+            remote_object = remote.get(local.key)
+            if remote_object is None:
+                new.append(local)
+            elif force or not self._remote_matches(local, remote_object):
+                changed.append(local)
+            else:
+                unchanged.append(local)
+
+        local_keys = {f.key for f in local_files}
+        orphans = [obj for key, obj in sorted(remote.items()) if key not in local_keys]
+        # 远端已不存在的对象不再保留记录
+        self.manifest.remote = {key: value for key, value in self.manifest.remote.items() if key in remote}
+        self.manifest.save()
+        return SyncPlan(new, changed, unchanged, orphans)
+
+    def execute(
+        self,
+        plan: SyncPlan,
+        *,
+        delete_orphans: bool = False,
+        progress: Optional[Callable[[UploadResult, int, int], None]] = None,
+    ) -> SyncResult:
+        """执行同步计划；每个文件完成后都会写入清单，中断后重新运行只处理剩余的文件"""
+        md5_by_key = {f.key: f.md5 for f in plan.uploads}
+
+        def on_finished(result: UploadResult, finished: int, total: int) -> None:
+            if result.status == "uploaded":
+                self.manifest.remote[result.key] = {"md5": md5_by_key[result.key], "etag": result.etag}
+                self.manifest.save()
+            if progress:
+                progress(result, finished, total)
+
+        options = {**self.uploader_options, "skip_unchanged": False}
+        with MultipartUploader(self.bucket, **options) as uploader:
+            results = uploader.upload_files(
+                [(f.local_path, f.key) for f in plan.uploads], progress=on_finished
+            )
+
+        deleted: List[str] = []
+        if delete_orphans and plan.orphans:
+            keys = [obj.key for obj in plan.orphans]
+            for start in range(0, len(keys), DELETE_BATCH_SIZE):
+                result = self.bucket.batch_delete_objects(keys[start:start + DELETE_BATCH_SIZE])
+                deleted.extend(result.deleted_keys)
+            for key in deleted:
+                self.manifest.remote.pop(key, None)
+            self.manifest.save()
+
+        return SyncResult(
+            uploaded=[r for r in results if r.status == "uploaded"],
+            failed=[r for r in results if r.status == "failed"],
+            deleted=deleted,
+        )
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+标签内容解析
+
+根据标签名称汇总关联的文章、视频、相册和行程（/api/tags/by-name/{tag_name}/contents）。
+- 每种内容类型一条查询，通过 content_tags 子查询过滤并在 SQL 层分页
+- 相册照片数量一次 GROUP BY 批量统计
+- 组装结果按 (标签名, limit) 缓存，主动失效：
+  - 标签关联变化、标签改名或删除时由 TagService 按标签ID失效
+  - 文章、视频、相册（含其中照片）、行程被修改、删除、发布或下架时，Session 钩子在 flush 后
+    用一条查询找出这些内容关联的标签ID，提交后按标签ID失效
+  浏览次数由 view_counter 绕过 ORM 写回，最多滞后 tag_contents_cache_ttl_seconds
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, Select, cast, event, select, tuple_
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.ttl_cache import TTLCache
+from ..crud.gallery import get_photo_counts_by_group
+from ..models.article import Article
+from ..models.gallery_db import Photo, PhotoGroup
+from ..models.schedule_db import Schedule
+from ..models.tag_db import ContentTag, Tag
+from ..models.video import Video
+
+_settings = get_settings()
+
+ContentKey = Tuple[str, str]  # (内容类型, 内容ID)
+
+# 缓存值为 (标签ID, 组装结果)，便于按标签ID失效
+tag_contents_cache: TTLCache[Tuple[int, Dict[str, Any]]] = TTLCache(
+    max_size=_settings.tag_contents_cache_max_size,
+    ttl_seconds=_settings.tag_contents_cache_ttl_seconds,
+)
+
+_CONTENT_TYPES = {Article: "article", Video: "video", PhotoGroup: "gallery", Schedule: "schedule"}
+_STALE_TAGS_KEY = "stale_tag_contents"
+
+
+def invalidate_tag_contents(tag_ids: Iterable[Optional[int]]) -> None:
+    """失效指定标签的内容缓存（关联增删、标签改名或删除，或关联的内容变化后调用）"""
+    stale_ids = {tag_id for tag_id in tag_ids if tag_id is not None}
+    if stale_ids:
+        tag_contents_cache.invalidate_where(lambda _key, value: value[0] in stale_ids)
+
+
+# ==================== 内容变更钩子 ====================
+
+def _content_key(obj: Any) -> Optional[ContentKey]:
+    if isinstance(obj, Photo):
+        # 照片增删改影响所属相册的照片数量
+        return ("gallery", str(obj.photo_group_id)) if obj.photo_group_id else None
+    content_type = _CONTENT_TYPES.get(type(obj))
+    if content_type is None or obj.id is None:
+        return None
+    return content_type, str(obj.id)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_content_changes(session: Session, flush_context: Any) -> None:
+    stale_keys: Set[ContentKey] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        key = _content_key(obj)
+        if key is not None and (obj not in session.dirty or session.is_modified(obj)):
+            stale_keys.add(key)
+    if not stale_keys:
+        return
+    # 一条查询把本次变化的内容换成关联的标签ID（与内容数量相关，与标签大小无关）
+    tag_ids = session.connection().scalars(
+        select(ContentTag.tag_id)
+        .where(tuple_(ContentTag.content_type, ContentTag.content_id).in_(stale_keys))
+        .distinct()
+    ).all()
+    if tag_ids:
+        session.info.setdefault(_STALE_TAGS_KEY, set()).update(tag_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_contents(session: Session) -> None:
+    # 提交后再失效，避免其他请求在提交前用旧数据重新填充缓存
+    stale_tag_ids = session.info.pop(_STALE_TAGS_KEY, None)
+    if stale_tag_ids:
+        invalidate_tag_contents(stale_tag_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_contents(session: Session) -> None:
+    session.info.pop(_STALE_TAGS_KEY, None)
+
+
+def empty_tag_contents(tag_name: str) -> Dict[str, Any]:
+    return {
+        "tag_name": tag_name,
+        "articles": [],
+        "videos": [],
+        "galleries": [],
+        "schedules": []
+    }
+
+
+def _tagged_ids(tag_id: int, content_type: str) -> Select:
+    return select(ContentTag.content_id).where(
+        ContentTag.tag_id == tag_id,
+        ContentTag.content_type == content_type,
+    )
+
+
+def _articles_stmt(tag_id: int, limit: int) -> Select:
+    return (
+        select(Article)
+        .where(
+            Article.id.in_(_tagged_ids(tag_id, "article")),
+            Article.is_deleted == False,
+            Article.is_published == True
+        )
+        .order_by(Article.created_at.desc())
+        .limit(limit)
+    )
+
+
+def _videos_stmt(tag_id: int, limit: int) -> Select:
+    return (
+        select(Video)
+        .where(
+            Video.id.in_(_tagged_ids(tag_id, "video")),
+            Video.is_published == 1
+        )
+        .order_by(Video.created_at.desc())
+        .limit(limit)
+    )
+
+
+def _galleries_stmt(tag_id: int, limit: int) -> Select:
+    return (
+        select(PhotoGroup)
+        .where(
+            PhotoGroup.id.in_(_tagged_ids(tag_id, "gallery")),
+            PhotoGroup.is_deleted == False,
+            PhotoGroup.is_published == True
+        )
+        .order_by(PhotoGroup.created_at.desc())
+        .limit(limit)
+    )
+
+
+def _schedules_stmt(tag_id: int, limit: int) -> Select:
+    # content_id 以字符串存储，行程ID为整数
+    schedule_ids = select(cast(ContentTag.content_id, Integer)).where(
+        ContentTag.tag_id == tag_id,
+        ContentTag.content_type == "schedule",
+    )
+    return (
+        select(Schedule)
+        .where(
+            Schedule.id.in_(schedule_ids),
+            Schedule.is_published == 1,
+            Schedule.review_status == 'approved'
+        )
+        .order_by(Schedule.date.desc())
+        .limit(limit)
+    )
+
+
+def _serialize_articles(articles: List[Article]) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(a.id),
+        "title": a.title,
+        "slug": a.slug,
+        "excerpt": a.excerpt,
+        "cover_url": a.cover_url,
+        "author": a.author,
+        "category_primary": a.category_primary,
+        "category_secondary": a.category_secondary,
+        "created_at": a.created_at.isoformat() if a.created_at else None,
+        "view_count": a.view_count or 0
+    } for a in articles]
+
+
+def _serialize_videos(videos: List[Video]) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(v.id),
+        "title": v.title,
+        "description": v.description,
+        "cover_url": v.cover_url,
+        "video_url": v.bvid,
+        "author": v.author,
+        "category": v.category,
+        "created_at": v.created_at.isoformat() if v.created_at else None,
+        "view_count": 0
+    } for v in videos]
+
+
+def _serialize_galleries(galleries: List[PhotoGroup], photo_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(g.id),
+        "title": g.title,
+        "name": g.title,
+        "description": g.description,
+        "cover_image_url": g.cover_image_url,
+        "cover_image_thumb_url": g.cover_image_thumb_url,
+        "category": g.category,
+        "created_at": g.created_at.isoformat() if g.created_at else None,
+        "photo_count": photo_counts.get(g.id, 0)
+    } for g in galleries]
+
+
+def _serialize_schedules(schedules: List[Schedule]) -> List[Dict[str, Any]]:
+    return [{
+        "id": schedule.id,
+        "theme": schedule.theme,
+        "date": schedule.date,
+        "city": schedule.city,
+        "venue": schedule.venue,
+        "category": schedule.category,
+        "image": schedule.image,
+        "image_thumb": schedule.image_thumb,
+        "description": schedule.description,
+        "created_at": schedule.created_at.isoformat() if schedule.created_at else None
+    } for schedule in schedules]
+
+
+def resolve_tag_contents(db: Session, tag_name: str, limit: int = 100) -> Dict[str, Any]:
+    """根据标签名获取关联内容（每种类型最多 limit 条）"""
+    cache_key = (tag_name, limit)
+    cached = tag_contents_cache.get(cache_key)
+    if cached is not None:
+        return cached[1]
+
+    # 查找标签(按显示名称匹配)；不存在的标签不缓存，避免新建标签后仍返回空结果
+    tag_id = db.scalar(select(Tag.id).where(Tag.name == tag_name).limit(1))
+    if tag_id is None:
+        return empty_tag_contents(tag_name)
+
+    galleries = db.scalars(_galleries_stmt(tag_id, limit)).all()
+    photo_counts = get_photo_counts_by_group(db, [g.id for g in galleries])
+
+    result = {
+        "tag_name": tag_name,
+        "articles": _serialize_articles(db.scalars(_articles_stmt(tag_id, limit)).all()),
+        "videos": _serialize_videos(db.scalars(_videos_stmt(tag_id, limit)).all()),
+        "galleries": _serialize_galleries(galleries, photo_counts),
+        "schedules": _serialize_schedules(db.scalars(_schedules_stmt(tag_id, limit)).all())
+    }
+    tag_contents_cache.set(cache_key, (tag_id, result))
+    return result
@@ -1,11 +1,13 @@
 """Tag Service"""
-from typing import List, Optional, Dict, Tuple, Union
+from typing import List, Optional, Dict, Sequence, Set, Tuple, Union
 
 from fastapi import HTTPException
-from sqlalchemy import or_, func
+from sqlalchemy import Select, and_, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from ..models.tag_db import Tag, ContentTag, TagCategory
+from .tag_content_resolver import invalidate_tag_contents
 from ..schemas.tag import (
     TagCreate,
     TagUpdate,
@@ -17,6 +19,53 @@ from ..schemas.tag import (
 DEFAULT_CATEGORY_NAME = "其他"
 
 
+# ==================== 只读查询语句（同步 / 异步服务共用） ====================
+
+def _list_categories_stmt() -> Select:
+    return select(TagCategory).order_by(TagCategory.name)
+
+
+def _list_tags_stmt(skip: int, limit: int) -> Select:
+    return (
+        select(Tag)
+        .options(joinedload(Tag.category))
+        .order_by(Tag.name)
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def _search_tags_stmt(search: str, limit: int) -> Select:
+    search_pattern = f"%{search}%"
+    return (
+        select(Tag)
+        .options(joinedload(Tag.category))
+        .join(TagCategory, Tag.category_id == TagCategory.id)
+        .where(
+            or_(
+                Tag.name.like(search_pattern),
+                Tag.value.like(search_pattern),
+                TagCategory.name.like(search_pattern),
+            )
+        )
+        .order_by(Tag.name)
+        .limit(limit)
+    )
+
+
+def _content_tags_stmt(content_type: ContentType, content_id: Union[int, str]) -> Select:
+    tag_ids = select(ContentTag.tag_id).where(
+        ContentTag.content_type == content_type,
+        ContentTag.content_id == str(content_id),
+    )
+    return (
+        select(Tag)
+        .options(joinedload(Tag.category))
+        .where(Tag.id.in_(tag_ids))
+        .order_by(Tag.name)
+    )
+
+
 class TagService:
     """标签服务"""
 
@@ -27,7 +76,7 @@ class TagService:
 
     def list_categories(self) -> List[TagCategory]:
         """获取所有标签种类"""
-        return self.db.query(TagCategory).order_by(TagCategory.name).all()
+        return self.db.scalars(_list_categories_stmt()).all()
 
     def get_category(self, category_id: int) -> Optional[TagCategory]:
         """获取标签种类"""
@@ -158,14 +207,7 @@ class TagService:
 
     def list_tags(self, skip: int = 0, limit: int = 100) -> List[Tag]:
         """获取所有标签"""
-        return (
-            self.db.query(Tag)
-            .options(joinedload(Tag.category))
-            .order_by(Tag.name)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self.db.scalars(_list_tags_stmt(skip, limit)).all()
 
     def search_tags(self, query: str, limit: int = 20) -> List[Tag]:
         """搜索标签（模糊搜索）"""
@@ -173,22 +215,7 @@ class TagService:
         if not search:
             return []
 
-        search_pattern = f"%{search}%"
-        return (
-            self.db.query(Tag)
-            .options(joinedload(Tag.category))
-            .join(TagCategory, Tag.category_id == TagCategory.id)
-            .filter(
-                or_(
-                    Tag.name.like(search_pattern),
-                    Tag.value.like(search_pattern),
-                    TagCategory.name.like(search_pattern),
-                )
-            )
-            .order_by(Tag.name)
-            .limit(limit)
-            .all()
-        )
+        return self.db.scalars(_search_tags_stmt(search, limit)).all()
 
     def update_tag(self, tag_id: int, tag_data: TagUpdate) -> Optional[Tag]:
         """更新标签"""
@@ -233,6 +260,7 @@ class TagService:
 
         self.db.commit()
         self.db.refresh(tag)
+        invalidate_tag_contents([tag_id])
         return tag
 
     def delete_tag(self, tag_id: int) -> bool:
@@ -243,6 +271,7 @@ class TagService:
 
         self.db.delete(tag)
         self.db.commit()
+        invalidate_tag_contents([tag_id])
         return True
 
     # ==================== 内容-标签关联 ====================
@@ -275,6 +304,7 @@ class TagService:
         self.db.add(content_tag)
         self.db.commit()
         self.db.refresh(content_tag)
+        invalidate_tag_contents([tag_id])
         return content_tag
 
     def remove_tag_from_content(
@@ -295,6 +325,7 @@ class TagService:
 
         self.db.delete(content_tag)
         self.db.commit()
+        invalidate_tag_contents([tag_id])
         return True
 
     def get_content_tags(
@@ -303,22 +334,7 @@ class TagService:
         content_id: Union[int, str],
     ) -> List[Tag]:
         """获取内容的所有标签"""
-        content_tags = self.db.query(ContentTag).filter(
-            ContentTag.content_type == content_type,
-            ContentTag.content_id == str(content_id),
-        ).all()
-
-        tag_ids = [ct.tag_id for ct in content_tags]
-        if not tag_ids:
-            return []
-
-        return (
-            self.db.query(Tag)
-            .options(joinedload(Tag.category))
-            .filter(Tag.id.in_(tag_ids))
-            .order_by(Tag.name)
-            .all()
-        )
+        return self.db.scalars(_content_tags_stmt(content_type, content_id)).all()
 
     def set_content_tags(
         self,
@@ -327,25 +343,98 @@ class TagService:
         tag_ids: List[int],
     ) -> List[Tag]:
         """设置内容的标签（替换所有标签）"""
-        self.db.query(ContentTag).filter(
-            ContentTag.content_type == content_type,
-            ContentTag.content_id == str(content_id),
-        ).delete()
-
-        for tag_id in tag_ids:
-            tag = self.get_tag(tag_id)
-            if not tag:
-                raise HTTPException(status_code=404, detail=f"标签 ID {tag_id} 不存在")
-
-            content_tag = ContentTag(
-                tag_id=tag_id,
-                content_type=content_type,
-                content_id=str(content_id),
+        return self.batch_set_content_tags([(content_type, content_id, tag_ids)])[0]
+
+    def batch_set_content_tags(
+        self,
+        items: Sequence[Tuple[ContentType, Union[int, str], List[int]]],
+    ) -> List[List[Tag]]:
+        """
+        批量设置多个内容的标签（单个事务）
+
+        按差异更新：一次 IN 查询校验全部标签，一次查询读取现有关联，
+        再用一条 DELETE 和一次批量 INSERT 写入。返回与 items 一一对应的标签列表。
+        """
+        targets: List[Tuple[str, str, List[int]]] = []
+        for content_type, content_id, tag_ids in items:
+            targets.append((content_type, str(content_id), list(dict.fromkeys(tag_ids))))
+        if not targets:
+            return []
+
+        tags_by_id = self._get_tags_by_ids({tag_id for _, _, tag_ids in targets for tag_id in tag_ids})
+
+        content_keys = {(content_type, content_id) for content_type, content_id, _ in targets}
+        existing: Dict[Tuple[str, str], Set[int]] = {key: set() for key in content_keys}
+        for row in self.db.execute(
+            select(ContentTag.content_type, ContentTag.content_id, ContentTag.tag_id)
+            .where(or_(*(
+                and_(ContentTag.content_type == content_type, ContentTag.content_id == content_id)
+                for content_type, content_id in content_keys
+            )))
+        ):
+            existing[(row.content_type, row.content_id)].add(row.tag_id)
+
+        # 同一内容在 items 中出现多次时以最后一次为准
+        wanted: Dict[Tuple[str, str], List[int]] = {
+            (content_type, content_id): tag_ids for content_type, content_id, tag_ids in targets
+        }
+
+        removals = []
+        additions = []
+        changed_tag_ids: Set[int] = set()
+        for (content_type, content_id), tag_ids in wanted.items():
+            current = existing[(content_type, content_id)]
+            removed = current - set(tag_ids)
+            added = [tag_id for tag_id in tag_ids if tag_id not in current]
+            if removed:
+                removals.append(and_(
+                    ContentTag.content_type == content_type,
+                    ContentTag.content_id == content_id,
+                    ContentTag.tag_id.in_(removed),
+                ))
+            additions.extend(
+                {'tag_id': tag_id, 'content_type': content_type, 'content_id': content_id}
+                for tag_id in added
+            )
+            changed_tag_ids.update(removed)
+            changed_tag_ids.update(added)
+
+        if removals:
+            self.db.execute(delete(ContentTag).where(or_(*removals)))
+        if additions:
+            self.db.execute(insert(ContentTag), additions)
+
+        results = [
+            sorted(
+                (tags_by_id[tag_id] for tag_id in wanted[(content_type, content_id)]),
+                key=lambda tag: tag.name,
             )
-            self.db.add(content_tag)
+            for content_type, content_id, _ in targets
+        ]
+        # 提交会让会话中的对象过期，之后序列化时每个标签都要重新 SELECT；
+        # 标签及其种类已完整加载，先移出会话，提交后直接返回
+        for category in {tag.category for tag in tags_by_id.values() if tag.category is not None}:
+            self.db.expunge(category)
+        for tag in tags_by_id.values():
+            self.db.expunge(tag)
 
         self.db.commit()
-        return self.get_content_tags(content_type, content_id)
+        invalidate_tag_contents(changed_tag_ids)
+        return results
+
+    def _get_tags_by_ids(self, tag_ids: Set[int]) -> Dict[int, Tag]:
+        """一次查询加载多个标签，任一不存在时返回 404"""
+        if not tag_ids:
+            return {}
+
+        tags = self.db.scalars(
+            select(Tag).options(joinedload(Tag.category)).where(Tag.id.in_(tag_ids))
+        ).all()
+        tags_by_id = {tag.id: tag for tag in tags}
+        missing = sorted(tag_ids - tags_by_id.keys())
+        if missing:
+            raise HTTPException(status_code=404, detail=f"标签 ID {missing[0]} 不存在")
+        return tags_by_id
 
     def get_contents_by_tag(
         self,
@@ -454,6 +543,7 @@ class TagService:
         tags = self.db.query(Tag).filter(Tag.category_id == category_id).all()
         for tag in tags:
             tag.sync_display_name(category_name)
+        invalidate_tag_contents([tag.id for tag in tags])
 
     def _parse_batch_entry(self, raw_entry: str) -> Optional[Tuple[str, str]]:
         if not raw_entry:
@@ -490,3 +580,39 @@ class TagService:
         self.db.add(category)
         self.db.flush()
         return category
+
+
+class AsyncTagService:
+    """标签服务（异步只读版本，供高频公开接口使用）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_categories(self) -> List[TagCategory]:
+        """获取所有标签种类"""
+        return (await self.db.scalars(_list_categories_stmt())).all()
+
+    async def get_tag(self, tag_id: int) -> Optional[Tag]:
+        """获取单个标签"""
+        stmt = select(Tag).options(joinedload(Tag.category)).where(Tag.id == tag_id)
+        return (await self.db.scalars(stmt)).first()
+
+    async def list_tags(self, skip: int = 0, limit: int = 100) -> List[Tag]:
+        """获取所有标签"""
+        return (await self.db.scalars(_list_tags_stmt(skip, limit))).all()
+
+    async def search_tags(self, query: str, limit: int = 20) -> List[Tag]:
+        """搜索标签（模糊搜索）"""
+        search = query.strip()
+        if not search:
+            return []
+
+        return (await self.db.scalars(_search_tags_stmt(search, limit))).all()
+
+    async def get_content_tags(
+        self,
+        content_type: ContentType,
+        content_id: Union[int, str],
+    ) -> List[Tag]:
+        """获取内容的所有标签"""
+        return (await self.db.scalars(_content_tags_stmt(content_type, content_id))).all()
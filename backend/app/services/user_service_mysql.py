@@ -7,6 +7,7 @@ from ..models.user_db import User
 from ..models.roles import UserRole
 from ..schemas.user import UserCreate
 from ..core.security import get_password_hash, verify_password
+from ..core.user_cache import invalidate_cached_user
 
 
 class UserServiceMySQL:
@@ -78,6 +79,7 @@ class UserServiceMySQL:
             user.last_login = datetime.utcnow()
             user.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_cached_user(user)
 
     def create_super_admin(self, username: str, email: str, password: str) -> Optional[User]:
         """创建超级管理员账户"""
@@ -125,6 +127,7 @@ class UserServiceMySQL:
         user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        invalidate_cached_user(user)
 
         return user
 
@@ -138,6 +141,7 @@ class UserServiceMySQL:
         user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        invalidate_cached_user(user)
 
         return user
 
@@ -151,6 +155,7 @@ class UserServiceMySQL:
         user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        invalidate_cached_user(user)
 
         return user
 
@@ -164,6 +169,7 @@ class UserServiceMySQL:
         user.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(user)
+        invalidate_cached_user(user)
 
         return user
 
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+文章浏览次数的写回缓冲
+
+POST /api/articles/{id}/view 原先每次都读出整行文章（含正文）、在 Python 中加一、提交再刷新，
+热门文章的每次浏览都是一次行锁，并发时还会丢失计数。现在浏览只在内存中累加：
+- 按文章ID分片加锁累加，不同文章之间互不阻塞
+- 后台任务每隔 article_view_flush_interval_seconds 批量写回：
+  UPDATE articles SET view_count = view_count + CASE id ... END WHERE id IN (...)，
+  按ID排序分批执行，原子递增，不会覆盖其他进程写入的计数
+- 写回失败时计数放回缓冲，下一次重试；关闭时写回剩余计数
+- current_view_count() 返回数据库中的值加上本进程尚未写回的增量
+间隔设为 0 时每次浏览立即写回（仍为原子递增）。
+"""
+import asyncio
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..core.executors import run_storage_task
+from ..core.sharded_counter import ShardedCounter
+from ..database import SessionLocal
+from ..models.article import Article
+
+_settings = get_settings()
+
+FLUSH_BATCH_SIZE = 500
+
+view_counter = ShardedCounter(_settings.article_view_counter_shards)
+_flush_task: Optional[asyncio.Task] = None
+
+
+def _apply_increments(db: Session, counts: Dict[str, int]) -> None:
+    """按ID排序分批原子递增（固定加锁顺序，避免多个进程互相死锁）"""
+    article_ids = sorted(counts)
+    for start in range(0, len(article_ids), FLUSH_BATCH_SIZE):
+        batch = article_ids[start:start + FLUSH_BATCH_SIZE]
+        increment = case({article_id: counts[article_id] for article_id in batch}, value=Article.id)
+        db.execute(
+            update(Article)
+            .where(Article.id.in_(batch))
+            # 显式保留 updated_at，浏览不算作文章修改（否则会触发 onupdate）
+            .values(view_count=func.coalesce(Article.view_count, 0) + increment, updated_at=Article.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def flush_view_counts(db: Session) -> int:
+    """把缓冲中的浏览次数写回数据库，返回写回的文章数"""
+    counts = view_counter.drain()
+    if not counts:
+        return 0
+    try:
+        _apply_increments(db, counts)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        view_counter.restore(counts)
+        raise
+    return len(counts)
+
+
+def record_view(db: Session, article_id: str) -> Optional[int]:
+    """
+    记录一次浏览，返回包含本次在内的当前浏览次数；文章不存在时返回 None
+
+    只读取 view_count 一列判断文章是否存在，不加行锁。
+    """
+    stored = db.scalar(
+        select(func.coalesce(Article.view_count, 0))
+        .where(Article.id == article_id, Article.is_deleted == False)  # noqa: E712
+    )
+    if stored is None:
+        return None
+
+    pending = view_counter.add(article_id)
+    if _settings.article_view_flush_interval_seconds <= 0:
+        flush_view_counts(db)
+    return stored + pending
+
+
+def current_view_count(article_id: str, stored: Optional[int]) -> int:
+    """数据库中的浏览次数加上本进程尚未写回的增量"""
+    return (stored or 0) + view_counter.pending(article_id)
+
+
+# ==================== 后台写回任务 ====================
+
+def _flush_in_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return flush_view_counts(db)
+    finally:
+        db.close()
+
+
+async def _flush_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_storage_task(_flush_in_new_session)
+        except Exception as exc:  # 写回失败不应终止循环，计数已放回缓冲
+            print(f"⚠️ 浏览次数写回失败: {exc}")
+
+
+def start_view_counter() -> None:
+    """启动定时写回"""
+    global _flush_task
+    interval = _settings.article_view_flush_interval_seconds
+    if interval > 0 and _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop(interval))
+
+
+async def stop_view_counter() -> None:
+    """停止定时写回，并写回剩余计数"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    try:
+        flushed = await run_storage_task(_flush_in_new_session)
+        if flushed:
+            print(f"✅ 已写回 {flushed} 篇文章的浏览次数")
+    except Exception as exc:
+        print(f"⚠️ 浏览次数写回失败，{len(view_counter)} 篇文章的计数丢失: {exc}")
@@ -5,9 +5,61 @@ B站视频信息抓取工具
 """
 import re
 import requests
-from typing import Optional, Dict
+from typing import Any, Optional, Dict
 from urllib.parse import urlparse, parse_qs
 
+BILIBILI_API_BASE = "https://api.bilibili.com"
+VIDEO_VIEW_PATH = "/x/web-interface/view"
+BILIBILI_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://www.bilibili.com/'
+}
+
+# 同步调用（脚本）共用一个会话，复用 keep-alive 连接；
+# 异步批量抓取见 services.bilibili_fetcher
+_session = requests.Session()
+_session.headers.update(BILIBILI_HEADERS)
+
+
+def match_bvid(url_or_bvid: str) -> Optional[str]:
+    """只用正则从文本中提取BV号，不发起网络请求（短链接返回 None）"""
+    # 如果已经是BV号格式，直接返回
+    match = re.match(r'^(BV[a-zA-Z0-9]+)$', url_or_bvid)
+    if match:
+        return match.group(1)
+
+    # 从URL中提取BV号
+    # 匹配 /video/BVxxxxx 格式
+    match = re.search(r'(?:bilibili\.com/video/|b23\.tv/)?(BV[a-zA-Z0-9]+)', url_or_bvid)
+    if match:
+        return match.group(1)
+    return None
+
+
+def parse_video_info(payload: Dict[str, Any]) -> Optional[Dict]:
+    """
+    将 B站 view 接口的响应整理为视频信息字典
+
+    Returns:
+        视频信息字典（title/description/cover/author/pubdate/duration/view），接口返回错误时为 None
+    """
+    # 检查返回状态
+    if payload.get('code') != 0:
+        print(f"B站API返回错误: {payload.get('message')}")
+        return None
+
+    video_data = payload.get('data') or {}
+
+    return {
+        'title': video_data.get('title', ''),
+        'description': video_data.get('desc', ''),
+        'cover': video_data.get('pic', ''),  # 封面图URL
+        'author': video_data.get('owner', {}).get('name', ''),
+        'pubdate': video_data.get('pubdate', 0),  # Unix时间戳
+        'duration': video_data.get('duration', 0),  # 视频时长(秒)
+        'view': video_data.get('stat', {}).get('view', 0),  # 播放量
+    }
+
 
 def extract_bvid(url_or_bvid: str) -> Optional[str]:
     """
@@ -25,24 +77,15 @@ def extract_bvid(url_or_bvid: str) -> Optional[str]:
     Returns:
         提取出的BV号，失败返回None
     """
-    # 如果已经是BV号格式，直接返回
-    bv_pattern = r'^(BV[a-zA-Z0-9]+)$'
-    match = re.match(bv_pattern, url_or_bvid)
-    if match:
-        return match.group(1)
-
-    # 从URL中提取BV号
-    # 匹配 /video/BVxxxxx 格式
-    url_pattern = r'(?:bilibili\.com/video/|b23\.tv/)?(BV[a-zA-Z0-9]+)'
-    match = re.search(url_pattern, url_or_bvid)
-    if match:
-        return match.group(1)
+    bvid = match_bvid(url_or_bvid)
+    if bvid:
+        return bvid
 
     # 处理短链接 b23.tv
     if 'b23.tv' in url_or_bvid:
         try:
             # 短链接需要请求获取重定向后的真实链接
-            response = requests.head(url_or_bvid, allow_redirects=True, timeout=5)
+            response = _session.head(url_or_bvid, allow_redirects=True, timeout=5)
             real_url = response.url
             match = re.search(r'BV[a-zA-Z0-9]+', real_url)
             if match:
@@ -73,36 +116,12 @@ def get_video_info(bvid: str) -> Optional[Dict]:
     if not bvid:
         return None
 
-    # B站API endpoint
-    api_url = f"https://api.bilibili.com/x/web-interface/view?bvid={bvid}"
-
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://www.bilibili.com/'
-        }
-
-        response = requests.get(api_url, headers=headers, timeout=10)
+        response = _session.get(
+            f"{BILIBILI_API_BASE}{VIDEO_VIEW_PATH}", params={'bvid': bvid}, timeout=10
+        )
         response.raise_for_status()
-
-        data = response.json()
-
-        # 检查返回状态
-        if data.get('code') != 0:
-            print(f"B站API返回错误: {data.get('message')}")
-            return None
-
-        video_data = data.get('data', {})
-
-        return {
-            'title': video_data.get('title', ''),
-            'description': video_data.get('desc', ''),
-            'cover': video_data.get('pic', ''),  # 封面图URL
-            'author': video_data.get('owner', {}).get('name', ''),
-            'pubdate': video_data.get('pubdate', 0),  # Unix时间戳
-            'duration': video_data.get('duration', 0),  # 视频时长(秒)
-            'view': video_data.get('stat', {}).get('view', 0),  # 播放量
-        }
+        return parse_video_info(response.json())
 
     except requests.exceptions.RequestException as e:
         print(f"请求B站API失败: {e}")
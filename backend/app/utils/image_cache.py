@@ -2,15 +2,14 @@
 """图片缓存工具
 下载并缓存B站视频封面到对象存储 (OSS)
 """
-import os
-import tempfile
-import requests
+import asyncio
 import hashlib
 from PIL import Image
 from io import BytesIO
 from typing import Optional, Tuple
 
-from ..services.storage_service import get_storage_service
+from ..services.bilibili_fetcher import BilibiliFetcher, get_bilibili_fetcher
+from ..services.storage_service import get_storage_service, guess_content_type
 
 
 # 配置
@@ -19,17 +18,6 @@ ORIGINAL_SIZE = (640, 360)  # 原图尺寸 16:9 比例
 BASE_PREFIX = "video-covers"
 
 
-_storage_instance = None
-
-
-def _get_storage():
-    """获取存储服务单例"""
-    global _storage_instance
-    if _storage_instance is None:
-        _storage_instance = get_storage_service()
-    return _storage_instance
-
-
 def get_cache_filename(url: str, is_thumbnail: bool = False) -> str:
     """
     根据URL生成缓存文件名
@@ -47,33 +35,6 @@ def get_cache_filename(url: str, is_thumbnail: bool = False) -> str:
     return f"{url_hash}{suffix}.jpg"
 
 
-def download_image(url: str, timeout: int = 10) -> Optional[bytes]:
-    """
-    下载图片
-
-    Args:
-        url: 图片URL
-        timeout: 超时时间(秒)
-
-    Returns:
-        图片二进制数据，失败返回None
-    """
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Referer': 'https://www.bilibili.com/'
-        }
-
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-
-        return response.content
-
-    except Exception as e:
-        print(f"下载图片失败 {url}: {e}")
-        return None
-
-
 def resize_image(image_data: bytes, max_size: Tuple[int, int]) -> Optional[bytes]:
     """
     调整图片大小（保持宽高比）
@@ -136,34 +97,28 @@ def _build_object_key(filename: str, is_thumbnail: bool = False) -> str:
 
 
 def _upload_bytes(data: bytes, object_key: str) -> str:
-    """写入临时文件并通过存储服务上传，返回访问 URL"""
-    storage = _get_storage()
-
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp.write(data)
-        tmp.flush()
-        tmp_path = tmp.name
-
-    try:
-        return storage.upload_file(tmp_path, object_key)
-    finally:
-        try:
-            os.remove(tmp_path)
-        except FileNotFoundError:
-            pass
+    """通过存储服务直接上传内存中的数据，返回访问 URL"""
+    return get_storage_service().upload_bytes(data, object_key, guess_content_type(object_key, "image/jpeg"))
 
 
-def cache_cover_image(cover_url: str, bvid: str = "") -> Tuple[Optional[str], Optional[str]]:
+async def cache_cover_image(
+    cover_url: str,
+    bvid: str = "",
+    fetcher: Optional[BilibiliFetcher] = None,
+) -> Tuple[Optional[str], Optional[str]]:
     """
     下载并缓存视频封面图片到 OSS（使用B站的16:9尺寸参数）
 
     Args:
         cover_url: B站封面URL
         bvid: 视频BV号（用于日志）
+        fetcher: B站抓取器（限速、重试），默认使用应用内共享的实例
 
     Returns:
         (原图访问URL, 缩略图访问URL)，失败返回 (None, None)
     """
+    fetcher = fetcher or get_bilibili_fetcher()
+
     original_filename = get_cache_filename(cover_url, is_thumbnail=False)
     thumb_filename = get_cache_filename(cover_url, is_thumbnail=True)
 
@@ -173,30 +128,29 @@ def cache_cover_image(cover_url: str, bvid: str = "") -> Tuple[Optional[str], Op
     print(f"  → 正在下载封面: {bvid}")
 
     try:
-        # 使用B站的尺寸参数直接获取16:9比例的图片
-        original_url = get_bilibili_resized_url(cover_url, 640, 360)
-        original_data = download_image(original_url)
+        # 使用B站的尺寸参数直接获取16:9比例的原图（640x360）和缩略图（480x270）
+        original_data, thumb_data = await asyncio.gather(
+            fetcher.download(get_bilibili_resized_url(cover_url, 640, 360)),
+            fetcher.download(get_bilibili_resized_url(cover_url, 480, 270)),
+        )
 
         if not original_data:
             return None, None
 
-        # 480x270 缩略图
-        thumb_source_url = get_bilibili_resized_url(cover_url, 480, 270)
-        thumb_data = download_image(thumb_source_url)
-
         if not thumb_data:
             # 如果缩略图下载失败，从原图生成
-            thumb_data = resize_image(original_data, THUMB_SIZE)
-
-        # 上传原图
-        original_access_url = _upload_bytes(original_data, original_key)
+            thumb_data = await asyncio.to_thread(resize_image, original_data, THUMB_SIZE)
 
-        # 上传缩略图（若生成失败则用原图）
-        if thumb_data:
-            thumb_access_url = _upload_bytes(thumb_data, thumb_key)
-        else:
+        if not thumb_data:
+            # 缩略图生成失败则用原图
             print(f"  ⚠️ 缩略图生成失败，使用原图代替: {bvid}")
-            thumb_access_url = _upload_bytes(original_data, thumb_key)
+            thumb_data = original_data
+
+        # 上传原图和缩略图（存储 SDK 是阻塞调用，放到线程中并发执行）
+        original_access_url, thumb_access_url = await asyncio.gather(
+            asyncio.to_thread(_upload_bytes, original_data, original_key),
+            asyncio.to_thread(_upload_bytes, thumb_data, thumb_key),
+        )
 
         print(f"  ✓ 封面缓存成功: {bvid}")
         return original_access_url, thumb_access_url
@@ -211,8 +165,12 @@ if __name__ == "__main__":
     # 测试下载和缓存
     test_url = "http://i1.hdslb.com/bfs/archive/992a333982c608e4861df5da424a432bd596d6a9.jpg"
 
+    async def _test():
+        async with BilibiliFetcher() as fetcher:
+            return await cache_cover_image(test_url, "TEST_BV", fetcher)
+
     print("=== 测试图片缓存 ===")
-    original, thumb = cache_cover_image(test_url, "TEST_BV")
+    original, thumb = asyncio.run(_test())
 
     if original and thumb:
         print(f"\n原图路径: {original}")
@@ -1,91 +1,199 @@
 """图片处理工具"""
 from pathlib import Path
+from typing import Dict, NamedTuple, Optional
 from PIL import Image
 import io
+import math
+
+
+# 估算用的探针图像素数（约 0.25MP），探针编码开销远小于完整编码
+PROBE_PIXELS = 256 * 1024
+# 完整编码次数上限（不含缩小尺寸后的重编码）
+MAX_FULL_ENCODES = 4
+# 缩小尺寸重试的次数上限
+MAX_RESIZE_ATTEMPTS = 3
+
+
+class JpegEncodeResult(NamedTuple):
+    """按目标大小编码的结果"""
+    data: bytes
+    quality: int
+    encodes: int  # 完整编码次数（包括缩小尺寸后的重编码）
+    probe_encodes: int  # 探针编码次数
+    width: int
+    height: int
+
+
+def to_rgb(img: Image.Image) -> Image.Image:
+    """转换为 RGB 模式（透明部分铺白底）"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # 创建白色背景
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def _encode(img: Image.Image, quality: int, optimize: bool, exif: bytes) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=optimize, exif=exif)
+    return buffer.getvalue()
+
+
+def encode_jpeg_to_size(
+    img: Image.Image,
+    max_bytes: int,
+    *,
+    max_quality: int = 90,
+    min_quality: int = 20,
+    tolerance: float = 0.05,
+    max_encodes: int = MAX_FULL_ENCODES,
+    exif: bytes = b'',
+) -> JpegEncodeResult:
+    """
+    以不超过 max_bytes 的最高质量编码 JPEG
 
+    1. 用缩小的探针图估算每个质量对应的大小，二分出候选质量（探针编码很便宜）
+    2. 完整编码候选质量，用实际大小校准探针估算，再在剩余区间内二分
+    3. 结果落在 [max_bytes * (1 - tolerance), max_bytes] 或完整编码次数达到上限时停止
+    4. 最低质量仍超出时按比例缩小尺寸后重新编码
 
-def compress_image(source_path: Path, target_path: Path, max_size_kb: int = 200) -> bool:
+    :param img: RGB 图片
+    :param max_bytes: 目标大小上限（字节）
+    :return: JpegEncodeResult
     """
-    压缩图片到指定文件大小以下
+    full_pixels = img.width * img.height
+    factor = max(1, int(math.sqrt(full_pixels / PROBE_PIXELS)))
+    probe = img.reduce(factor) if factor > 1 else img
+    pixel_ratio = full_pixels / (probe.width * probe.height)
+
+    probe_sizes: Dict[int, int] = {}
+
+    def probe_size(quality: int) -> int:
+        if quality not in probe_sizes:
+            probe_sizes[quality] = len(_encode(probe, quality, False, b''))
+        return probe_sizes[quality]
+
+    def estimate_quality(calibration: float, low: int, high: int) -> int:
+        """在 [low, high] 中二分估算不超过目标大小的最高质量"""
+        # 大多数照片在最高质量下就满足要求，先单独检查上界
+        if probe_size(high) * pixel_ratio * calibration <= max_bytes:
+            return high
+        best = low
+        while low <= high:
+            mid = (low + high) // 2
+            if probe_size(mid) * pixel_ratio * calibration <= max_bytes:
+                best = mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        return best
+
+    low, high = min_quality, max_quality
+    best: Optional[bytes] = None
+    best_quality = min_quality
+    smallest: Optional[bytes] = None
+    smallest_quality = min_quality
+    encodes = 0
+    calibration = 1.0
+    quality = estimate_quality(calibration, low, high)
+
+    while encodes < max_encodes:
+        data = _encode(img, quality, True, exif)
+        encodes += 1
+
+        if len(data) <= max_bytes:
+            if best is None or quality > best_quality:
+                best, best_quality = data, quality
+            low = quality + 1
+            if len(data) >= max_bytes * (1 - tolerance):
+                break
+        else:
+            if smallest is None or len(data) < len(smallest):
+                smallest, smallest_quality = data, quality
+            high = quality - 1
+
+        if low > high:
+            break
+
+        # 用实际大小校准探针估算（探针图缩小后细节更密集，通常会高估）
+        calibration = len(data) / (probe_size(quality) * pixel_ratio)
+        quality = min(max(estimate_quality(calibration, low, high), low), high)
+
+    if best is not None:
+        return JpegEncodeResult(best, best_quality, encodes, len(probe_sizes), img.width, img.height)
+
+    # 最低质量仍然过大：按比例缩小尺寸后重新编码
+    if smallest is None:
+        smallest = _encode(img, min_quality, True, exif)
+        smallest_quality = min_quality
+        encodes += 1
+    data, quality = smallest, smallest_quality
+    resized = img
+    for _ in range(MAX_RESIZE_ATTEMPTS):
+        scale = math.sqrt(max_bytes / len(data)) * 0.95
+        new_size = (max(1, int(resized.width * scale)), max(1, int(resized.height * scale)))
+        resized = resized.resize(new_size, Image.Resampling.LANCZOS)
+        data = _encode(resized, quality, True, exif)
+        encodes += 1
+        if len(data) <= max_bytes:
+            break
+
+    return JpegEncodeResult(data, quality, encodes, len(probe_sizes), resized.width, resized.height)
+
+
+def compress_image_bytes(image_data: bytes, max_size_kb: int = 200) -> Optional[JpegEncodeResult]:
+    """
+    压缩图片数据到指定文件大小以下
 
     Args:
-        source_path: 源图片路径
-        target_path: 目标图片路径
+        image_data: 原始图片数据
         max_size_kb: 最大文件大小（KB），默认200KB
 
     Returns:
-        bool: 是否压缩成功
+        JpegEncodeResult，失败时返回 None
     """
     try:
-        # 打开图片
-        img = Image.open(source_path)
-
-        # 如果是 RGBA 模式（有透明通道），转换为 RGB
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # 创建白色背景
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        # 获取原始EXIF信息（如果有）
-        exif = img.info.get('exif', b'')
-
-        # 二分法查找合适的质量参数
-        quality = 85
-        min_quality = 20
-        max_quality = 95
-
-        # 先尝试用85质量压缩
-        buffer = io.BytesIO()
-        img.save(buffer, format='JPEG', quality=quality, optimize=True, exif=exif)
-        size_kb = buffer.tell() / 1024
-
-        # 如果已经小于目标大小，直接保存
-        if size_kb <= max_size_kb:
-            with open(target_path, 'wb') as f:
-                f.write(buffer.getvalue())
-            return True
-
-        # 使用二分法找到合适的质量参数
-        attempts = 0
-        max_attempts = 10
-
-        while attempts < max_attempts and abs(size_kb - max_size_kb) > 10:
-            if size_kb > max_size_kb:
-                max_quality = quality
-            else:
-                min_quality = quality
-
-            quality = (min_quality + max_quality) // 2
-
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=quality, optimize=True, exif=exif)
-            size_kb = buffer.tell() / 1024
+        with Image.open(io.BytesIO(image_data)) as source:
+            # 获取原始EXIF信息（如果有）
+            exif = source.info.get('exif', b'')
+            img = to_rgb(source)
+            img.load()
 
-            attempts += 1
+        # 质量上限 85，与原先的首次尝试一致
+        return encode_jpeg_to_size(img, max_size_kb * 1024, max_quality=85, min_quality=20, exif=exif)
 
-        # 如果还是太大，尝试缩小尺寸
-        if size_kb > max_size_kb * 1.2:
-            # 计算缩放比例
-            scale = (max_size_kb / size_kb) ** 0.5
-            new_width = int(img.width * scale)
-            new_height = int(img.height * scale)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    except Exception as e:
+        print(f"图片压缩失败: {e}")
+        return None
 
-            # 重新压缩
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=quality, optimize=True, exif=exif)
 
-        # 保存最终结果
-        with open(target_path, 'wb') as f:
-            f.write(buffer.getvalue())
+def compress_image(source_path: Path, target_path: Path, max_size_kb: int = 200) -> bool:
+    """
+    压缩图片到指定文件大小以下
 
-        return True
+    Args:
+        source_path: 源图片路径
+        target_path: 目标图片路径
+        max_size_kb: 最大文件大小（KB），默认200KB
 
-    except Exception as e:
+    Returns:
+        bool: 是否压缩成功
+    """
+    try:
+        image_data = Path(source_path).read_bytes()
+    except OSError as e:
         print(f"图片压缩失败: {e}")
         return False
+
+    result = compress_image_bytes(image_data, max_size_kb)
+    if result is None:
+        return False
+
+    with open(target_path, 'wb') as f:
+        f.write(result.data)
+    return True
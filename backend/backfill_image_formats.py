@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+为历史图廊照片补充 WebP / AVIF 版本
+从存储中读取每张照片的原图，生成中等尺寸和缩略图的替代格式（与 JPEG 同目录），
+写入 photos 的 *_webp_url / *_avif_url 字段；照片组封面从对应照片复制。
+多张照片并发处理，数据库更新在主协程中逐个提交，中断后重新运行只处理剩余的照片。
+
+使用方法:
+python3 backend/backfill_image_formats.py [--formats webp,avif] [--concurrency 4] [--test]
+"""
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import or_
+
+from app.core.executors import run_storage_task
+from app.database import SessionLocal
+from app.models.gallery_db import Photo, PhotoGroup
+from app.models.image_asset import ImageAsset
+from app.services.image_processing import alternate_formats, alternate_name, format_supported
+from app.services.image_upload import upload_alternates
+from app.services.storage_service import get_storage_service
+
+
+def _column(prefix: str, variant: str, fmt: str) -> str:
+    return f"{prefix}{alternate_name(variant, fmt)}_url"
+
+
+def _missing_formats(photo: Photo, formats):
+    return [
+        fmt for fmt in formats
+        if not getattr(photo, _column('image_', 'thumb', fmt)) or not getattr(photo, _column('image_', 'medium', fmt))
+    ]
+
+
+def pending_photos(db, formats):
+    conditions = []
+    for fmt in formats:
+        conditions.append(getattr(Photo, _column('image_', 'thumb', fmt)).is_(None))
+        conditions.append(getattr(Photo, _column('image_', 'medium', fmt)).is_(None))
+    return db.query(Photo).filter(
+        Photo.is_deleted == False,  # noqa: E712
+        Photo.image_medium_url.isnot(None),
+        Photo.image_thumb_url.isnot(None),
+        or_(*conditions),
+    ).order_by(Photo.created_at).all()
+
+
+async def backfill_photos(db, formats, concurrency: int):
+    """生成并上传照片的替代格式"""
+    photos = pending_photos(db, formats)
+    print(f"需要补充的照片: {len(photos)} 张")
+    if not photos:
+        return 0, 0
+
+    storage = get_storage_service()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(photo: Photo):
+        async with semaphore:
+            missing = _missing_formats(photo, formats)
+            content = await run_storage_task(storage.read_bytes, storage.key_from_url(photo.image_url))
+            if content is None:
+                raise FileNotFoundError(f"原图不存在: {photo.image_url}")
+            urls = await upload_alternates(
+                content,
+                storage.key_from_url(photo.image_medium_url),
+                storage.key_from_url(photo.image_thumb_url),
+                formats=missing,
+                storage=storage,
+            )
+            return photo, urls
+
+    success_count = 0
+    fail_count = 0
+    for index, finished in enumerate(asyncio.as_completed([process(photo) for photo in photos]), 1):
+        try:
+            photo, urls = await finished
+            for name, url in urls.items():
+                setattr(photo, f"image_{name}_url", url)
+            # 同步到去重索引，之后重复上传同一张图片时直接复用
+            asset = db.query(ImageAsset).filter(ImageAsset.original_url == photo.image_url).first()
+            if asset is not None:
+                asset.alternate_urls = json.dumps({**asset.alternates, **urls})
+            db.commit()
+            success_count += 1
+            print(f"  [{index}/{len(photos)}] ✓ {photo.id} {', '.join(urls)}")
+        except Exception as e:
+            db.rollback()
+            fail_count += 1
+            print(f"  [{index}/{len(photos)}] ✗ 处理失败: {e}")
+
+    return success_count, fail_count
+
+
+def backfill_covers(db, formats) -> int:
+    """照片组封面缩略图复用对应照片的替代格式"""
+    conditions = [getattr(PhotoGroup, _column('cover_image_', 'thumb', fmt)).is_(None) for fmt in formats]
+    groups = db.query(PhotoGroup).filter(
+        PhotoGroup.cover_image_thumb_url.isnot(None),
+        or_(*conditions),
+    ).all()
+
+    updated = 0
+    for group in groups:
+        photo = db.query(Photo).filter(Photo.image_thumb_url == group.cover_image_thumb_url).first()
+        if photo is None:
+            continue
+        changed = False
+        for fmt in formats:
+            url = getattr(photo, _column('image_', 'thumb', fmt))
+            if url and not getattr(group, _column('cover_image_', 'thumb', fmt)):
+                setattr(group, _column('cover_image_', 'thumb', fmt), url)
+                changed = True
+        if changed:
+            updated += 1
+    db.commit()
+    return updated
+
+
+async def backfill(formats, concurrency: int):
+    db = SessionLocal()
+    try:
+        success_count, fail_count = await backfill_photos(db, formats, concurrency)
+        cover_count = backfill_covers(db, formats)
+
+        print("\n" + "=" * 50)
+        print("补充完成！")
+        print(f"照片成功: {success_count} 张")
+        print(f"照片失败: {fail_count} 张（重新运行会重试）")
+        print(f"照片组封面: {cover_count} 个")
+        print("=" * 50)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='为历史图廊照片补充 WebP / AVIF 版本')
+    parser.add_argument('--formats', type=str, default=None, help='逗号分隔的格式，默认使用 IMAGE_ALTERNATE_FORMATS')
+    parser.add_argument('--concurrency', type=int, default=4, help='同时处理的照片数')
+    parser.add_argument('--test', action='store_true', help='测试模式：只查看需要补充的照片数量')
+
+    args = parser.parse_args()
+
+    if args.formats:
+        formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+        unsupported = [fmt for fmt in formats if fmt == 'jpeg' or not format_supported(fmt)]
+        if unsupported:
+            print(f"不支持的格式: {', '.join(unsupported)}")
+            sys.exit(1)
+    else:
+        formats = alternate_formats()
+    if not formats:
+        print("未启用任何替代格式")
+        sys.exit(0)
+
+    print("=" * 50)
+    print(f"图廊图片替代格式补充工具（{', '.join(formats)}）")
+    print("=" * 50)
+
+    if args.test:
+        db = SessionLocal()
+        try:
+            photos = pending_photos(db, formats)
+            print(f"需要补充的照片数量: {len(photos)}")
+            for photo in photos[:5]:
+                print(f"  - {photo.id} {photo.image_url}")
+            if len(photos) > 5:
+                print(f"  ... 还有 {len(photos) - 5} 张")
+        finally:
+            db.close()
+    else:
+        asyncio.run(backfill(formats, args.concurrency))
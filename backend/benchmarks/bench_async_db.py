@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+同步 / 异步数据库读路径吞吐对比
+
+对比两种实现的 GET /api/articles/ 吞吐量（requests/sec）：
+- before: 同步 def 路由 + Session（FastAPI 线程池执行）
+- after:  异步 async def 路由 + AsyncSession（当前 articles 路由）
+
+默认使用本地 SQLite 文件作为 MySQL 的替身；也可以通过 --sync-url / --async-url
+指向真实的 MySQL（mysql+pymysql:// 与 mysql+aiomysql://）。
+
+额外依赖（仅基准测试需要）：
+    pip install httpx aiosqlite
+
+用法：
+    python benchmarks/bench_async_db.py --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Query
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.crud import article as crud_article
+from app.database import get_async_db, get_db
+from app.models.article import Article
+from app.routers import articles
+from app.schemas.article import ArticleSummary
+
+
+def build_sync_router() -> APIRouter:
+    """改造前的同步路由实现"""
+    router = APIRouter(prefix="/api/articles")
+
+    @router.get("/", response_model=List[ArticleSummary])
+    def get_articles(
+        skip: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=100),
+        db: Session = Depends(get_db)
+    ):
+        return crud_article.get_articles(db=db, skip=skip, limit=limit)
+
+    return router
+
+
+def seed(sync_url: str, count: int) -> None:
+    engine = create_engine(sync_url)
+    Article.__table__.create(engine, checkfirst=True)
+    SessionLocal = sessionmaker(bind=engine)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        if db.query(Article).count() >= count:
+            return
+        db.add_all([
+            Article(
+                id=str(uuid.uuid4()),
+                slug=f"bench-{i}-{uuid.uuid4().hex[:8]}",
+                title=f"基准测试文章 {i}",
+                content="感受峰 感受存在 " * 200,
+                excerpt="基准测试",
+                category="个人感悟",
+                category_primary="峰言峰语",
+                category_secondary="访谈",
+                is_published=True,
+                is_deleted=False,
+                review_status="approved",
+                published_at=now - timedelta(minutes=i),
+            )
+            for i in range(count)
+        ])
+        db.commit()
+    engine.dispose()
+
+
+async def run_load(app: FastAPI, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one_request() -> None:
+            async with semaphore:
+                response = await client.get("/api/articles/", params={"limit": 20})
+                response.raise_for_status()
+
+        await one_request()  # 预热
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="同步/异步数据库读路径吞吐对比")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--concurrency", type=int, default=100, help="并发请求数")
+    parser.add_argument("--articles", type=int, default=500, help="种子文章数")
+    parser.add_argument("--pool-size", type=int, default=20, help="连接池大小")
+    parser.add_argument(
+        "--max-overflow",
+        type=int,
+        default=40,
+        help="连接池溢出上限（同步路径需 ≥ 线程池大小 40，否则 get_db 的清理阶段会与取连接互相等待）"
+    )
+    parser.add_argument("--sync-url", help="同步数据库 URL（默认临时 SQLite 文件）")
+    parser.add_argument("--async-url", help="异步数据库 URL（默认同一 SQLite 文件）")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench-db-")
+    db_path = os.path.join(tmp_dir, "bench.sqlite3")
+    sync_url = args.sync_url or f"sqlite:///{db_path}"
+    async_url = args.async_url or f"sqlite+aiosqlite:///{db_path}"
+
+    seed(sync_url, args.articles)
+
+    # SQLite 默认不使用连接池，这里显式指定，使两条路径都受同样大小的连接池约束
+    sync_connect_args = {"check_same_thread": False} if sync_url.startswith("sqlite") else {}
+    sync_engine = create_engine(
+        sync_url,
+        poolclass=QueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        connect_args=sync_connect_args,
+    )
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_engine(
+        async_url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+    )
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    before_app = FastAPI()
+    before_app.include_router(build_sync_router())
+    before_app.dependency_overrides[get_db] = override_get_db
+
+    after_app = FastAPI()
+    after_app.include_router(articles.router)
+    after_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    before = asyncio.run(run_load(before_app, args.requests, args.concurrency))
+    after = asyncio.run(run_load(after_app, args.requests, args.concurrency))
+
+    print(
+        f"请求数: {args.requests}  并发: {args.concurrency}  "
+        f"连接池: {args.pool_size}+{args.max_overflow}"
+    )
+    print(f"before (sync def + Session):       {before:8.1f} req/s")
+    print(f"after  (async def + AsyncSession): {after:8.1f} req/s")
+
+    sync_engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+B站视频信息批量抓取对比
+
+- before: 原 cache_video_covers.py 的方式，逐个 requests.get（无会话复用），每次间隔 sleep(0.3)
+- after:  BilibiliFetcher（共享 keep-alive 连接、令牌桶限速、并发、重试）
+
+在本地启动一个模拟 B站 view 接口的 HTTP 服务（固定延迟，按 --fail-rate 随机返回 412 风控），不访问真实 B站。
+
+用法：
+    python benchmarks/bench_bilibili_fetcher.py --videos 60 --latency-ms 120 --rate 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from app.services.bilibili_fetcher import BilibiliFetcher
+from app.utils.bilibili import BILIBILI_HEADERS, VIDEO_VIEW_PATH, parse_video_info
+
+
+def start_mock_server(latency: float, fail_rate: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            parsed = urlparse(self.path)
+            if random.random() < fail_rate:
+                body = b'{"code": -412, "message": "request was banned"}'
+                status = 412
+            else:
+                bvid = parse_qs(parsed.query).get('bvid', [''])[0]
+                body = json.dumps({
+                    "code": 0,
+                    "data": {"title": f"视频 {bvid}", "pic": f"http://i0.hdslb.com/{bvid}.jpg",
+                             "owner": {"name": "汪峰"}, "stat": {"view": 1}},
+                }).encode()
+                status = 200
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_fetch(api_base: str, bvids) -> int:
+    ok = 0
+    for index, bvid in enumerate(bvids):
+        try:
+            response = requests.get(f"{api_base}{VIDEO_VIEW_PATH}", params={'bvid': bvid},
+                                    headers=BILIBILI_HEADERS, timeout=10)
+            response.raise_for_status()
+            if parse_video_info(response.json()):
+                ok += 1
+        except requests.RequestException:
+            pass
+        if index < len(bvids) - 1:
+            time.sleep(0.3)
+    return ok
+
+
+async def fetcher_fetch(api_base: str, bvids, rate: float, concurrency: int) -> int:
+    async with BilibiliFetcher(api_base=api_base, requests_per_second=rate, burst=concurrency,
+                               max_concurrency=concurrency, backoff_seconds=0.1) as fetcher:
+        results = await asyncio.gather(*(fetcher.get_video_info(bvid) for bvid in bvids))
+    return sum(1 for info in results if info)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="B站视频信息批量抓取对比")
+    parser.add_argument("--videos", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=120, help="模拟接口延迟")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="模拟 412 风控的比例")
+    parser.add_argument("--rate", type=float, default=10, help="after 的限速（请求/秒）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.latency_ms / 1000, args.fail_rate)
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+    bvids = [f"BV1mock{index:04d}" for index in range(args.videos)]
+
+    start = time.perf_counter()
+    legacy_ok = legacy_fetch(api_base, bvids)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fetcher_ok = asyncio.run(fetcher_fetch(api_base, bvids, args.rate, args.concurrency))
+    after = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"{args.videos} 个视频，接口延迟 {args.latency_ms:.0f} ms，风控失败率 {args.fail_rate:.0%}")
+    print(f"before (串行 + sleep 0.3s):           {before:6.1f} s  成功 {legacy_ok}")
+    print(f"after  (限速 {args.rate:.0f}/s，并发 {args.concurrency}，重试): {after:6.1f} s  成功 {fetcher_ok}")
+
+
+if __name__ == "__main__":
+    main()
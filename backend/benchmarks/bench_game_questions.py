@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏出题吞吐基准（questions/sec）
+
+分别测量歌词猜歌名、填词、专辑配对三种游戏的出题速度，
+所有游戏共享同一份预构建的 LyricCorpus。
+
+语料来源（按优先级）：
+- --lyrics 指定的 song-lyrics.json
+- 仓库根目录 data/汪峰歌词集.txt（通过 parse_lyrics.py 解析）
+
+用法：
+    python benchmarks/bench_game_questions.py --questions 50000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.services.game_service import FillLyrics, LyricCorpus, LyricSong, LyricsGuesser, SongMatcher
+
+
+def load_corpus(lyrics_path: str = None) -> LyricCorpus:
+    if lyrics_path:
+        with open(lyrics_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        from parse_lyrics import parse_lyrics_file
+        data = parse_lyrics_file(str(REPO_ROOT / "data" / "汪峰歌词集.txt"))
+
+    return LyricCorpus([
+        LyricSong(song['id'], song['title'], album['name'], song['lyrics'])
+        for album in data.get('albums', [])
+        for song in album.get('songs', [])
+    ])
+
+
+def measure(game, total: int) -> float:
+    game.generate_question()  # 预热
+    start = time.perf_counter()
+    for _ in range(total):
+        game.generate_question()
+    return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="游戏出题吞吐基准")
+    parser.add_argument("--questions", type=int, default=20000, help="每种游戏的出题次数")
+    parser.add_argument("--lyrics", help="song-lyrics.json 路径（默认解析 data/汪峰歌词集.txt）")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus = load_corpus(args.lyrics)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(
+        f"语料: {len(corpus.songs)} 首歌 / {len(corpus.albums)} 张专辑 / "
+        f"{len(corpus.vocabulary)} 个词  构建耗时 {build_ms:.1f} ms"
+    )
+    for name, game in (
+        ("lyrics_guesser", LyricsGuesser(corpus)),
+        ("fill_lyrics", FillLyrics(corpus)),
+        ("song_matcher", SongMatcher(corpus)),
+    ):
+        if game.generate_question() is None:
+            print(f"{name:15s} 语料不足，跳过")
+            continue
+        print(f"{name:15s} {measure(game, args.questions):12.1f} questions/s")
+
+
+if __name__ == "__main__":
+    main()
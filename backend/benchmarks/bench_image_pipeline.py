@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传图片处理耗时对比（ms / 张）
+
+- before: 全尺寸解码一次，三种尺寸串行缩放编码，写入临时文件后再读回上传
+- after:  ImageProcessor.process_image_bytes（draft 缩小解码 + 进程池并发编码，全程内存）
+
+默认生成一张 4000x3000（12MP）的合成 JPEG；也可以用 --image 指定真实照片。
+
+用法：
+    python benchmarks/bench_image_pipeline.py --runs 10 --workers 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageFilter, ImageOps
+
+from app.services.image_processing import ImageProcessor, get_image_pool, shutdown_image_pool
+from app.core.config import get_settings
+
+
+def synthetic_photo(width: int = 4000, height: int = 3000) -> bytes:
+    """生成带噪点和渐变的合成照片（比纯色图更接近真实照片的编码开销）"""
+    noise = Image.effect_noise((width, height), 64).filter(ImageFilter.GaussianBlur(1))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', (noise, gradient, ImageOps.invert(noise)))
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=92)
+    return output.getvalue()
+
+
+def legacy_process(data: bytes) -> int:
+    """改造前的流程：串行生成三种尺寸并经由临时文件上传"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        input_path = os.path.join(temp_dir, "input.jpg")
+        with open(input_path, 'wb') as f:
+            f.write(data)
+
+        paths = []
+        with Image.open(input_path) as img:
+            orig_width, orig_height = img.size
+            img = ImageOps.exif_transpose(img)
+            if orig_width > ImageProcessor.MAX_ORIGINAL_WIDTH or orig_height > ImageProcessor.MAX_ORIGINAL_HEIGHT:
+                variants = [(ImageProcessor.MAX_ORIGINAL_WIDTH, None, ImageProcessor.ORIGINAL_QUALITY)]
+            else:
+                variants = [(orig_width, orig_height, ImageProcessor.ORIGINAL_QUALITY)]
+            variants += [
+                (ImageProcessor.MEDIUM_WIDTH, None, ImageProcessor.MEDIUM_QUALITY),
+                (ImageProcessor.THUMB_WIDTH, None, ImageProcessor.THUMB_QUALITY),
+            ]
+            for index, (width, height, quality) in enumerate(variants):
+                encoded = ImageProcessor.resize_image(img, target_width=width, target_height=height, quality=quality)
+                path = os.path.join(temp_dir, f"{index}.jpg")
+                with open(path, 'wb') as f:
+                    f.write(encoded.getvalue())
+                paths.append(path)
+
+        # 模拟 storage.upload_file 从磁盘读回
+        total = 0
+        for path in paths:
+            with open(path, 'rb') as f:
+                total += len(f.read())
+        return total
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def new_process(data: bytes) -> int:
+    processed = ImageProcessor.process_image_bytes(data)
+    return len(processed.original) + len(processed.medium) + len(processed.thumb)
+
+
+def measure(func, data: bytes, runs: int) -> float:
+    func(data)  # 预热（包括进程池启动）
+    start = time.perf_counter()
+    for _ in range(runs):
+        func(data)
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="上传图片处理耗时对比")
+    parser.add_argument("--runs", type=int, default=10, help="每种实现的处理次数")
+    parser.add_argument("--workers", type=int, default=3, help="编码进程数（1 表示串行）")
+    parser.add_argument("--image", help="测试图片路径（默认生成 12MP 合成照片）")
+    args = parser.parse_args()
+
+    get_settings().image_pipeline_workers = args.workers
+
+    if args.image:
+        with open(args.image, 'rb') as f:
+            data = f.read()
+    else:
+        data = synthetic_photo()
+
+    with Image.open(BytesIO(data)) as img:
+        print(f"图片: {img.size[0]}x{img.size[1]}  {len(data) / 1024 / 1024:.1f} MB  CPU: {os.cpu_count()}")
+
+    get_image_pool()
+    before = measure(legacy_process, data, args.runs)
+    after = measure(new_process, data, args.runs)
+    shutdown_image_pool()
+
+    print(f"before (串行 + 临时文件):          {before:8.1f} ms/张")
+    print(f"after  (draft + 进程池 x{args.workers} + 内存): {after:8.1f} ms/张")
+
+
+if __name__ == "__main__":
+    main()
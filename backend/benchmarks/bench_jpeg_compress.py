@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按目标大小压缩 JPEG：逐级降质量 vs 探针估算 + 二分
+
+- before: 原 ImageStorage.compress_image，质量 90、80、70…逐级完整编码，仍超出时缩小 0.8 再编码
+- after:  ImageStorage.compress_image_with_stats（utils.image_utils.encode_jpeg_to_size）
+
+对语料中每张照片统计完整编码次数、耗时、输出大小与质量。
+默认生成一组不同尺寸 / 细节程度的合成照片；也可以用 --images 指定真实照片目录。
+
+用法：
+    python benchmarks/bench_jpeg_compress.py --images ~/Pictures/tour --max-mb 1.0
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageFilter, ImageOps
+
+from app.services.storage import ImageStorage
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
+
+
+def synthetic_corpus() -> List[Tuple[str, bytes]]:
+    """不同尺寸、不同噪点强度的合成照片"""
+    corpus = []
+    for width, height in ((4000, 3000), (3024, 4032), (1920, 1080)):
+        for sigma, blur in ((96, 0.5), (48, 1.5), (16, 3)):
+            noise = Image.effect_noise((width, height), sigma).filter(ImageFilter.GaussianBlur(blur))
+            gradient = Image.linear_gradient('L').resize((width, height))
+            image = Image.merge('RGB', (noise, gradient, ImageOps.invert(noise)))
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=95)
+            corpus.append((f"synthetic-{width}x{height}-s{sigma}", output.getvalue()))
+    return corpus
+
+
+def load_corpus(directory: str) -> List[Tuple[str, bytes]]:
+    return [
+        (path.name, path.read_bytes())
+        for path in sorted(Path(directory).iterdir())
+        if path.suffix.lower() in IMAGE_SUFFIXES
+    ]
+
+
+def legacy_compress(image_data: bytes, max_size_mb: float) -> Tuple[bytes, int]:
+    """改造前的实现，返回 (数据, 完整编码次数)"""
+    img = Image.open(io.BytesIO(image_data))
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+
+    width, height = img.size
+    max_dimension = 2048
+    if width > max_dimension or height > max_dimension:
+        if width > height:
+            new_width, new_height = max_dimension, int(height * (max_dimension / width))
+        else:
+            new_width, new_height = int(width * (max_dimension / height)), max_dimension
+        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    quality = 90
+    max_size_bytes = int(max_size_mb * 1024 * 1024)
+    encodes = 0
+    while quality > 20:
+        output = io.BytesIO()
+        img.save(output, format='JPEG', quality=quality, optimize=True)
+        encodes += 1
+        if output.tell() <= max_size_bytes:
+            return output.getvalue(), encodes
+        quality -= 10
+
+    output = io.BytesIO()
+    img = img.resize((int(img.width * 0.8), int(img.height * 0.8)), Image.Resampling.LANCZOS)
+    img.save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue(), encodes + 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JPEG 目标大小压缩对比")
+    parser.add_argument("--images", help="照片目录（默认使用合成照片）")
+    parser.add_argument("--max-mb", type=float, default=1.0, help="目标大小上限（MB）")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.images) if args.images else synthetic_corpus()
+    storage = ImageStorage()
+    max_bytes = int(args.max_mb * 1024 * 1024)
+
+    print(f"{'图片':32s} {'before 编码/ms/KB':>22s} {'after 编码/ms/KB/质量':>26s}")
+    before_ms, after_ms, before_encodes, after_encodes = [], [], [], []
+    for name, data in corpus:
+        start = time.perf_counter()
+        legacy_data, legacy_encodes = legacy_compress(data, args.max_mb)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        result = storage.compress_image_with_stats(data, args.max_mb)
+        new_ms = (time.perf_counter() - start) * 1000
+
+        before_ms.append(legacy_ms)
+        after_ms.append(new_ms)
+        before_encodes.append(legacy_encodes)
+        after_encodes.append(result.encodes)
+        over = " 超出!" if len(result.data) > max_bytes else ""
+        print(
+            f"{name:32s} {legacy_encodes:6d} {legacy_ms:7.0f} {len(legacy_data) / 1024:7.0f}"
+            f" {result.encodes:6d} {new_ms:7.0f} {len(result.data) / 1024:7.0f} {result.quality:4d}{over}"
+        )
+
+    print(
+        f"平均完整编码次数: {statistics.mean(before_encodes):.2f} -> {statistics.mean(after_encodes):.2f}  "
+        f"平均耗时: {statistics.mean(before_ms):.0f} ms -> {statistics.mean(after_ms):.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大文件上传对比：逐个 put_object vs MultipartUploader
+
+- before: 原 scripts/upload_music_to_oss.py，每个文件一次 put_object，串行上传
+- after:  storage_service.MultipartUploader（分片并行、多文件并行、断点续传、MD5 未变化跳过）
+
+使用内存中的 OSS 替身，按单连接带宽（--mbps）模拟传输耗时，不需要真实的 OSS。
+另外演示中断后续传：第一次运行时让一个分片失败，第二次运行只补传缺失的分片；第三次运行全部跳过。
+
+用法：
+    python benchmarks/bench_multipart_upload.py --files 6 --size-mb 40 --mbps 20
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.storage_service import MultipartUploader
+
+
+class NotFound(Exception):
+    status = 404
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class InMemoryBucket:
+    """实现 MultipartUploader 所需 oss2.Bucket 方法的内存替身，按单连接带宽模拟耗时"""
+
+    def __init__(self, mbps: float, fail_part: int = 0, fail_times: int = 0):
+        self.seconds_per_byte = 1 / (mbps * 1024 * 1024)
+        self.fail_part = fail_part
+        self.fail_times = fail_times
+        self.objects: Dict[str, Tuple[bytes, Dict[str, str]]] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.upload_headers: Dict[str, Dict[str, str]] = {}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def _transfer(self, size: int) -> None:
+        with self._lock:
+            self.bytes_sent += size
+        time.sleep(size * self.seconds_per_byte)
+
+    def head_object(self, key):
+        if key not in self.objects:
+            raise NotFound(key)
+        return _Result(headers=self.objects[key][1])
+
+    def put_object(self, key, data, headers=None):
+        if hasattr(data, 'read'):
+            data = data.read()
+        self._transfer(len(data))
+        self.objects[key] = (data, dict(headers or {}))
+        return _Result(etag=str(len(data)))
+
+    def init_multipart_upload(self, key, headers=None):
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {}
+        self.upload_headers[upload_id] = dict(headers or {})
+        return _Result(upload_id=upload_id)
+
+    def upload_part(self, key, upload_id, part_number, data, headers=None):
+        if upload_id not in self.uploads:
+            raise NotFound(upload_id)
+        with self._lock:
+            fail = part_number == self.fail_part and self.fail_times > 0
+            if fail:
+                self.fail_times -= 1
+        if fail:
+            # 传到一半断开
+            self._transfer(len(data) // 2)
+            raise ConnectionError("connection reset")
+        self._transfer(len(data))
+        self.uploads[upload_id][part_number] = data
+        return _Result(etag=f"{upload_id}-{part_number}")
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        stored = self.uploads.pop(upload_id)
+        data = b''.join(stored[part.part_number] for part in parts)
+        self.objects[key] = (data, self.upload_headers.pop(upload_id))
+
+
+def make_files(directory: str, count: int, size_mb: int) -> List[Tuple[str, str]]:
+    files = []
+    for index in range(count):
+        path = os.path.join(directory, f"{index:02d}.flac")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+        files.append((path, f"music/bench/{index:02d}.flac"))
+    return files
+
+
+def legacy_upload(bucket: InMemoryBucket, files: List[Tuple[str, str]]) -> None:
+    for local_path, key in files:
+        with open(local_path, 'rb') as f:
+            bucket.put_object(key, f, headers={'Content-Type': 'audio/flac'})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="大文件上传对比")
+    parser.add_argument("--files", type=int, default=6, help="文件数")
+    parser.add_argument("--size-mb", type=int, default=40, help="每个文件大小（MB）")
+    parser.add_argument("--mbps", type=float, default=20, help="模拟的单连接带宽（MB/s）")
+    parser.add_argument("--part-mb", type=int, default=8, help="分片大小（MB）")
+    parser.add_argument("--part-workers", type=int, default=4)
+    parser.add_argument("--file-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = make_files(work_dir, args.files, args.size_mb)
+        total_mb = args.files * args.size_mb
+        options = dict(
+            part_size=args.part_mb * 1024 * 1024,
+            part_workers=args.part_workers,
+            file_workers=args.file_workers,
+            checkpoint_dir=os.path.join(work_dir, "checkpoints"),
+        )
+
+        bucket = InMemoryBucket(args.mbps)
+        start = time.perf_counter()
+        legacy_upload(bucket, files)
+        before = time.perf_counter() - start
+
+        bucket = InMemoryBucket(args.mbps)
+        with MultipartUploader(bucket, **options) as uploader:
+            start = time.perf_counter()
+            uploader.upload_files(files)
+            after = time.perf_counter() - start
+
+        print(f"{args.files} 个文件，共 {total_mb} MB，单连接 {args.mbps:.0f} MB/s")
+        print(f"before (串行 put_object):                 {before:6.1f} s")
+        print(f"after  (分片 x{args.part_workers}，文件 x{args.file_workers}):            {after:6.1f} s")
+
+        # 断点续传：第一次运行时第 2 个分片连续失败（超过重试次数），第二次只补传缺失的分片
+        bucket = InMemoryBucket(args.mbps, fail_part=2, fail_times=3)
+        with MultipartUploader(bucket, **options) as uploader:
+            first = uploader.upload_files(files[:1])[0]
+            sent_first = bucket.bytes_sent
+            second = uploader.upload_files(files[:1])[0]
+            sent_second = bucket.bytes_sent - sent_first
+            third = uploader.upload_files(files[:1])[0]
+        print(
+            f"续传: 第一次 {first.status}（{first.error}），"
+            f"第二次 {second.status}，恢复 {second.resumed_parts} 片、补传 {second.parts} 片 "
+            f"{sent_second / 1024 / 1024:.0f} MB（整文件重传需 {args.size_mb} MB）；第三次 {third.status}"
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,12 @@
 """
 批量缓存视频封面脚本
 下载B站封面到本地并保存为16:9比例的图片
+多个视频并发处理，请求频率由 BilibiliFetcher 的全局限速控制
 
 使用方法:
-python3 backend/cache_video_covers.py
+python3 backend/cache_video_covers.py [--concurrency 8]
 """
+import asyncio
 import sys
 import os
 
@@ -15,12 +17,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app.database import SessionLocal
 from app.models.video import Video
+from app.services.bilibili_fetcher import BilibiliFetcher
 from app.utils.image_cache import cache_cover_image
-import time
 
 
-def cache_all_video_covers(force_update: bool = False):
-    """批量缓存所有视频的封面"""
+async def cache_all_video_covers(force_update: bool = False, concurrency: int = 8):
+    """批量缓存所有视频的封面（并发下载和上传，数据库更新在主协程中逐个提交）"""
     db = SessionLocal()
 
     try:
@@ -46,38 +48,40 @@ def cache_all_video_covers(force_update: bool = False):
         skip_count = 0
         fail_count = 0
 
-        for index, video in enumerate(videos, 1):
-            print(f"\n[{index}/{len(videos)}] {video.title}")
-            print(f"  BV号: {video.bvid}")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def cache_one(index, video):
+            async with semaphore:
+                print(f"\n[{index}/{len(videos)}] {video.title}")
+                print(f"  BV号: {video.bvid}")
+                return video, await cache_cover_image(video.cover_url, video.bvid, fetcher)
 
+        pending = []
+        for index, video in enumerate(videos, 1):
             # 如果已经有本地缓存且不是强制更新，跳过
             if not force_update and video.cover_local and video.cover_thumb:
-                print(f"  ✓ 已有本地缓存，跳过")
+                print(f"  ✓ 已有本地缓存，跳过: {video.bvid}")
                 skip_count += 1
                 continue
-
-            # 缓存封面
-            try:
-                cover_local, cover_thumb = cache_cover_image(video.cover_url, video.bvid)
-
-                if cover_local and cover_thumb:
-                    # 更新数据库
-                    video.cover_local = cover_local
-                    video.cover_thumb = cover_thumb
-                    db.commit()
-                    success_count += 1
-                else:
-                    print(f"  ✗ 缓存失败")
+            pending.append((index, video))
+
+        async with BilibiliFetcher() as fetcher:
+            for finished in asyncio.as_completed([cache_one(index, video) for index, video in pending]):
+                video, (cover_local, cover_thumb) = await finished
+                try:
+                    if cover_local and cover_thumb:
+                        # 更新数据库
+                        video.cover_local = cover_local
+                        video.cover_thumb = cover_thumb
+                        db.commit()
+                        success_count += 1
+                    else:
+                        print(f"  ✗ 缓存失败: {video.bvid}")
+                        fail_count += 1
+                except Exception as e:
+                    print(f"  ✗ 缓存失败 {video.bvid}: {e}")
                     fail_count += 1
-
-            except Exception as e:
-                print(f"  ✗ 缓存失败: {e}")
-                fail_count += 1
-                db.rollback()
-
-            # 避免请求过快
-            if index < len(videos):
-                time.sleep(0.3)
+                    db.rollback()
 
         print("\n" + "=" * 50)
         print("缓存完成！")
@@ -94,7 +98,7 @@ def cache_all_video_covers(force_update: bool = False):
         db.close()
 
 
-def cache_single_video_cover(bvid: str):
+async def cache_single_video_cover(bvid: str):
     """缓存单个视频的封面"""
     db = SessionLocal()
 
@@ -112,7 +116,8 @@ def cache_single_video_cover(bvid: str):
         print(f"正在缓存视频封面: {video.title}")
         print(f"BV号: {video.bvid}")
 
-        cover_local, cover_thumb = cache_cover_image(video.cover_url, video.bvid)
+        async with BilibiliFetcher() as fetcher:
+            cover_local, cover_thumb = await cache_cover_image(video.cover_url, video.bvid, fetcher)
 
         if cover_local and cover_thumb:
             video.cover_local = cover_local
@@ -138,6 +143,7 @@ if __name__ == "__main__":
     parser.add_argument('--bvid', type=str, help='单个视频的BV号')
     parser.add_argument('--force', action='store_true', help='强制更新已缓存的封面')
     parser.add_argument('--test', action='store_true', help='测试模式：只查看需要缓存的视频数量')
+    parser.add_argument('--concurrency', type=int, default=8, help='同时处理的视频数')
 
     args = parser.parse_args()
 
@@ -147,7 +153,7 @@ if __name__ == "__main__":
 
     if args.bvid:
         # 缓存单个视频
-        cache_single_video_cover(args.bvid)
+        asyncio.run(cache_single_video_cover(args.bvid))
     elif args.test:
         # 测试模式
         print("\n[测试模式] 正在检查需要缓存的视频...")
@@ -166,6 +172,6 @@ if __name__ == "__main__":
         # 批量缓存
         confirm = input(f"\n确认要批量缓存视频封面吗？{'(强制更新模式)' if args.force else '(增量更新模式)'} (yes/no): ")
         if confirm.lower() in ['yes', 'y']:
-            cache_all_video_covers(force_update=args.force)
+            asyncio.run(cache_all_video_covers(force_update=args.force, concurrency=args.concurrency))
         else:
             print("已取消操作")
@@ -0,0 +1,19 @@
+-- 行程发布状态归一化迁移脚本
+-- 版本: 008_normalize_schedule_publish_status
+-- 描述: 将所有历史行程一次性标记为已审核且已发布
+--       （原先由 ScheduleServiceMySQL 在每次构造时全表扫描完成）
+
+USE wangfeng_fan_website;
+
+UPDATE schedules
+SET review_status = 'approved',
+    reviewed_at = COALESCE(reviewed_at, NOW())
+WHERE review_status != 'approved';
+
+UPDATE schedules
+SET is_published = 1
+WHERE is_published != 1;
+
+COMMIT;
+
+SELECT 'Schedule publish status normalization completed successfully!' AS status;
@@ -0,0 +1,34 @@
+-- 文章全文索引迁移脚本
+-- 版本: 009_add_article_fulltext_index
+-- 描述: 为 articles 表添加 ngram FULLTEXT 索引，替代 LIKE '%q%' 全表扫描
+-- 要求: MySQL 5.7.6+（内置 ngram 分词器，默认 ngram_token_size = 2）
+
+USE wangfeng_fan_website;
+
+-- 标题索引（用于标题命中加权）
+SET @idx_exists = (SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = 'wangfeng_fan_website'
+    AND table_name = 'articles'
+    AND index_name = 'ft_articles_title');
+
+SET @sql = IF(@idx_exists = 0,
+    'ALTER TABLE articles ADD FULLTEXT INDEX ft_articles_title (title) WITH PARSER ngram',
+    'SELECT ''Index ft_articles_title already exists'' AS msg');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 标题 + 正文索引（用于检索与相关度排序）
+SET @idx_exists = (SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = 'wangfeng_fan_website'
+    AND table_name = 'articles'
+    AND index_name = 'ft_articles_title_content');
+
+SET @sql = IF(@idx_exists = 0,
+    'ALTER TABLE articles ADD FULLTEXT INDEX ft_articles_title_content (title, content) WITH PARSER ngram',
+    'SELECT ''Index ft_articles_title_content already exists'' AS msg');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT 'Article fulltext index migration completed successfully!' AS status;
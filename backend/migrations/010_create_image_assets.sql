@@ -0,0 +1,26 @@
+-- 图片内容去重索引
+-- 版本: 010_create_image_assets
+-- 描述: 按源文件 SHA-256 记录已生成的原图/中图/缩略图URL，重复上传直接复用，引用计数归零才删除对象
+
+USE wangfeng_fan_website;
+
+CREATE TABLE IF NOT EXISTS image_assets (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    content_hash CHAR(64) NOT NULL COMMENT '源文件 SHA-256（十六进制）',
+    kind VARCHAR(32) NOT NULL COMMENT '处理方式：variants / editor / avatar',
+    original_url VARCHAR(500) NOT NULL COMMENT '原图URL',
+    medium_url VARCHAR(500) NULL COMMENT '中等尺寸URL',
+    thumb_url VARCHAR(500) NULL COMMENT '缩略图URL',
+    file_size INT NULL COMMENT '原图大小（字节）',
+    width INT NULL,
+    height INT NULL,
+    ref_count INT NOT NULL DEFAULT 1 COMMENT '引用次数',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_image_assets_hash_kind (content_hash, kind),
+    INDEX ix_image_assets_original_url (original_url),
+    INDEX ix_image_assets_medium_url (medium_url),
+    INDEX ix_image_assets_thumb_url (thumb_url)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='图片内容去重索引';
+
+SELECT 'Image asset table migration completed successfully!' AS status;
@@ -0,0 +1,21 @@
+-- 图廊图片的 WebP / AVIF 版本
+-- 版本: 011_add_image_alternate_formats
+-- 描述: 照片和照片组封面增加替代格式URL字段，图片去重索引记录替代格式URL
+-- 历史照片执行 python backend/backfill_image_formats.py 补齐
+
+USE wangfeng_fan_website;
+
+ALTER TABLE photos
+    ADD COLUMN image_thumb_webp_url VARCHAR(500) NULL AFTER image_medium_url,
+    ADD COLUMN image_medium_webp_url VARCHAR(500) NULL AFTER image_thumb_webp_url,
+    ADD COLUMN image_thumb_avif_url VARCHAR(500) NULL AFTER image_medium_webp_url,
+    ADD COLUMN image_medium_avif_url VARCHAR(500) NULL AFTER image_thumb_avif_url;
+
+ALTER TABLE photo_groups
+    ADD COLUMN cover_image_thumb_webp_url VARCHAR(500) NULL AFTER cover_image_thumb_url,
+    ADD COLUMN cover_image_thumb_avif_url VARCHAR(500) NULL AFTER cover_image_thumb_webp_url;
+
+ALTER TABLE image_assets
+    ADD COLUMN alternate_urls TEXT NULL COMMENT '替代格式URL（JSON，如 {"thumb_webp": "..."}）' AFTER thumb_url;
+
+SELECT 'Migration 011: Added WebP/AVIF url columns' AS status;
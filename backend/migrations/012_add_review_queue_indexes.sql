@@ -0,0 +1,19 @@
+-- 审核队列索引
+-- 版本: 012_add_review_queue_indexes
+-- 描述: /api/admin/reviews 按 (review_status, created_at) 键集分页，各表需要对应的复合索引
+
+USE wangfeng_fan_website;
+
+CREATE INDEX ix_articles_review_status_created_at ON articles (review_status, created_at);
+CREATE INDEX ix_articles_created_at ON articles (created_at);
+
+CREATE INDEX ix_videos_review_status_created_at ON videos (review_status, created_at);
+CREATE INDEX ix_videos_created_at ON videos (created_at);
+
+CREATE INDEX ix_schedules_review_status_created_at ON schedules (review_status, created_at);
+CREATE INDEX ix_schedules_created_at ON schedules (created_at);
+
+CREATE INDEX ix_photo_groups_review_status_created_at ON photo_groups (review_status, created_at);
+CREATE INDEX ix_photo_groups_created_at ON photo_groups (created_at);
+
+SELECT 'Migration 012: Added review queue indexes' AS status;
@@ -0,0 +1,23 @@
+-- 仪表盘每日汇总表
+-- 版本: 013_create_daily_stats
+-- 描述: /api/admin/dashboard 改为读取按天预先统计的新增用户 / 文章 / 行程数量；
+--       users.created_at 补充索引，供按天重算时的范围查询使用。
+--       表为空时应用启动会自动全量重建，也可运行 backend/rebuild_dashboard_stats.py
+
+USE wangfeng_fan_website;
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    stat_date DATE NOT NULL COMMENT '统计日期（UTC）',
+    metric VARCHAR(20) NOT NULL COMMENT '指标：users / articles / schedules',
+    category VARCHAR(50) NOT NULL DEFAULT '' COMMENT '文章一级分类',
+    review_status VARCHAR(20) NOT NULL DEFAULT '' COMMENT '文章审核状态',
+    count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    UNIQUE KEY uq_daily_stats_key (stat_date, metric, category, review_status),
+    KEY ix_daily_stats_metric_date (metric, stat_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='仪表盘每日汇总';
+
+CREATE INDEX ix_users_created_at ON users (created_at);
+
+SELECT 'Migration 013: Created daily_stats table' AS status;
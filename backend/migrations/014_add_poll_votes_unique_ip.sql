@@ -0,0 +1,23 @@
+-- 投票防重复唯一约束
+-- 版本: 014_add_poll_votes_unique_ip
+-- 描述: 同一 IP 对同一投票只能投一次，由 (poll_id, user_ip) 唯一约束保证；
+--       先删除并发竞态留下的重复记录（保留最早的一条），再按投票记录重算计数
+
+USE wangfeng_fan_website;
+
+DELETE v1 FROM poll_votes v1
+JOIN poll_votes v2
+  ON v1.poll_id = v2.poll_id
+ AND v1.user_ip = v2.user_ip
+ AND (v1.created_at > v2.created_at OR (v1.created_at = v2.created_at AND v1.id > v2.id));
+
+ALTER TABLE poll_votes ADD UNIQUE KEY uq_poll_votes_poll_ip (poll_id, user_ip);
+
+UPDATE poll_options o
+SET o.vote_count = (SELECT COUNT(*) FROM poll_votes v WHERE v.option_id = o.id);
+
+UPDATE polls p
+SET p.total_votes = (SELECT COUNT(*) FROM poll_votes v WHERE v.poll_id = p.id),
+    p.updated_at = p.updated_at;
+
+SELECT 'Migration 014: Added unique (poll_id, user_ip) on poll_votes' AS status;
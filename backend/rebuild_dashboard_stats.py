@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全量重建仪表盘每日汇总（daily_stats）
+汇总表与源数据不一致时（例如直接用 SQL 批量修改过用户或文章）运行一次即可；
+应用运行期间的变化由 services/dashboard_rollup 自动维护。
+
+使用方法:
+python3 backend/rebuild_dashboard_stats.py [--test]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func
+
+from app.database import SessionLocal, engine
+from app.models.daily_stat import DailyStat
+from app.services.dashboard_rollup import rebuild_rollups
+
+
+def print_summary(db) -> None:
+    for metric, days, total in db.query(
+        DailyStat.metric,
+        func.count(func.distinct(DailyStat.stat_date)),
+        func.sum(DailyStat.count),
+    ).group_by(DailyStat.metric).all():
+        print(f"  - {metric}: {days} 天，共 {int(total or 0)} 条")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='全量重建仪表盘每日汇总')
+    parser.add_argument('--test', action='store_true', help='测试模式：只查看当前汇总，不重建')
+    args = parser.parse_args()
+
+    DailyStat.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        if args.test:
+            print("当前汇总:")
+            print_summary(db)
+        else:
+            written = rebuild_rollups(db)
+            print(f"✅ 已重建 {written} 行汇总")
+            print_summary(db)
+    finally:
+        db.close()
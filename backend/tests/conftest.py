@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共夹具：每个测试使用独立的 SQLite 文件数据库（不依赖 MySQL）
+
+app.database 在导入时只创建 MySQL 引擎而不连接，因此可以直接导入模型和服务。
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import Base, get_async_db, get_db  # noqa: E402
+from app.models import article, game, gallery_db, image_asset, schedule_db, tag_db, user_db, video  # noqa: E402,F401
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def engine(db_path):
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    for metadata in {Base.metadata, article.Base.metadata, video.Base.metadata, game.Base.metadata}:
+        metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """统计 with 块内执行的 SQL 条数：with count_queries() as statements: ..."""
+    class _Counter:
+        def __enter__(self):
+            self.statements = []
+            event.listen(engine, "before_cursor_execute", self._record)
+            return self.statements
+
+        def __exit__(self, *exc):
+            event.remove(engine, "before_cursor_execute", self._record)
+
+        def _record(self, conn, cursor, statement, *args):
+            self.statements.append(statement)
+
+    return _Counter
+
+
+@pytest.fixture
+def api_client(engine, session_factory, db_path):
+    """挂载指定路由的测试客户端，同步/异步数据库依赖都指向测试库：api_client(router)"""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def _get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def _get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    def _client(*routers):
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_async_db] = _get_async_db
+        return _SyncClient(app)
+
+    yield _client
+    asyncio.run(async_engine.dispose())
+
+
+class _SyncClient:
+    """同步调用 ASGI 应用（当前 starlette 版本的 TestClient 与 httpx 0.28 不兼容）"""
+
+    def __init__(self, app: FastAPI) -> None:
+        self.app = app
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async def _send():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, **kwargs)
+
+        return asyncio.run(_send())
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""认证依赖的用户缓存：未命中时从数据库加载并写入缓存"""
+import pytest
+
+from app.core import dependencies
+from app.core.user_cache import token_user_cache
+from app.models.user_db import User
+from app.services.user_service_mysql import UserServiceMySQL
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    token_user_cache.clear()
+    yield
+    token_user_cache.clear()
+
+
+def _add_user(db, username="fan"):
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_cache_miss_loads_user_and_fills_cache(db, count_queries):
+    _add_user(db)
+    service = UserServiceMySQL(db)
+
+    with count_queries() as statements:
+        user = dependencies._load_user_for_token("fan", service)
+    assert user is not None and user.username == "fan"
+    assert len(statements) == 1
+    assert token_user_cache.get("fan") is not None
+
+    # 命中缓存时不再查询
+    with count_queries() as statements:
+        cached = dependencies._load_user_for_token("fan", service)
+    assert cached.id == user.id
+    assert statements == []
+
+
+def test_cache_miss_for_unknown_user_returns_none(db):
+    assert dependencies._load_user_for_token("nobody", UserServiceMySQL(db)) is None
+    assert token_user_cache.get("nobody") is None
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""B站抓取器的重试等待时间"""
+import asyncio
+
+import httpx
+
+from app.services.bilibili_fetcher import BilibiliFetcher
+
+
+def _fetcher():
+    return BilibiliFetcher(backoff_seconds=0.5, transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+
+def test_retry_after_is_capped():
+    fetcher = _fetcher()
+    try:
+        response = httpx.Response(429, headers={"Retry-After": "3600"})
+        assert fetcher._retry_delay(0, response) == fetcher.max_retry_after_seconds
+
+        response = httpx.Response(429, headers={"Retry-After": "1"})
+        assert fetcher._retry_delay(0, response) == 1.0
+    finally:
+        asyncio.run(fetcher.aclose())
+
+
+def test_backoff_without_retry_after():
+    fetcher = _fetcher()
+    try:
+        assert 1.0 <= fetcher._retry_delay(1, httpx.Response(503)) <= 1.5
+    finally:
+        asyncio.run(fetcher.aclose())
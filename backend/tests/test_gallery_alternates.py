@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""创建照片 / 照片组时从 image_assets 补全 WebP / AVIF 地址"""
+import json
+from datetime import datetime
+
+from app.crud.gallery import batch_create_photos, create_photo, create_photo_group
+from app.models.image_asset import ImageAsset
+from app.schemas.gallery import PhotoCreate, PhotoGroupCreate
+
+ALTERNATES = {
+    "thumb_webp": "/g/1_thumb.webp",
+    "medium_webp": "/g/1_medium.webp",
+    "thumb_avif": "/g/1_thumb.avif",
+    "medium_avif": "/g/1_medium.avif",
+}
+
+
+def _add_asset(db, digest="h1", thumb_url="/g/1_thumb.jpg"):
+    db.add(ImageAsset(
+        content_hash=digest,
+        kind="variants",
+        original_url="/g/1.jpg",
+        medium_url="/g/1_medium.jpg",
+        thumb_url=thumb_url,
+        alternate_urls=json.dumps(ALTERNATES),
+    ))
+    db.commit()
+
+
+def _photo(thumb_url="/g/1_thumb.jpg", **fields):
+    return PhotoCreate(
+        photo_group_id="g1",
+        original_filename="1.jpg",
+        image_url="/g/1.jpg",
+        image_thumb_url=thumb_url,
+        storage_path="g/1.jpg",
+        **fields,
+    )
+
+
+def test_create_photo_fills_alternates_from_asset(db):
+    _add_asset(db)
+
+    photo = create_photo(db, _photo())
+
+    assert photo.image_thumb_webp_url == ALTERNATES["thumb_webp"]
+    assert photo.image_medium_webp_url == ALTERNATES["medium_webp"]
+    assert photo.image_thumb_avif_url == ALTERNATES["thumb_avif"]
+    assert photo.image_medium_avif_url == ALTERNATES["medium_avif"]
+
+
+def test_create_photo_keeps_submitted_alternates(db):
+    _add_asset(db)
+
+    photo = create_photo(db, _photo(image_thumb_webp_url="/cdn/thumb.webp"))
+
+    assert photo.image_thumb_webp_url == "/cdn/thumb.webp"
+    assert photo.image_medium_webp_url == ALTERNATES["medium_webp"]
+
+
+def test_batch_create_photos_without_asset(db, count_queries):
+    _add_asset(db)
+
+    with count_queries() as statements:
+        photos = batch_create_photos(db, [_photo(), _photo(thumb_url="/unknown_thumb.jpg")])
+
+    assert sum(1 for sql in statements if "image_assets" in sql) == 1
+    assert photos[0].image_thumb_webp_url == ALTERNATES["thumb_webp"]
+    assert photos[1].image_thumb_webp_url is None
+
+
+def test_create_photo_group_fills_cover_alternates(db):
+    _add_asset(db)
+
+    group = create_photo_group(db, PhotoGroupCreate(
+        title="相册",
+        category="巡演返图",
+        date=datetime(2024, 1, 1),
+        cover_image_url="/g/1.jpg",
+        cover_image_thumb_url="/g/1_thumb.jpg",
+    ))
+
+    assert group.cover_image_thumb_webp_url == ALTERNATES["thumb_webp"]
+    assert group.cover_image_thumb_avif_url == ALTERNATES["thumb_avif"]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""图廊公开路由：照片组详情与总数"""
+import uuid
+from datetime import datetime
+
+from app.models.gallery_db import Photo, PhotoGroup
+from app.routers import gallery
+
+
+def _add_group(db, is_published=True):
+    group = PhotoGroup(
+        id=str(uuid.uuid4()),
+        title="演唱会",
+        category="巡演返图",
+        date=datetime(2026, 1, 1),
+        storage_type="oss",
+        is_published=is_published,
+        review_status="approved",
+    )
+    db.add(group)
+    db.commit()
+    return group.id
+
+
+def test_group_detail_returns_photos(db, api_client):
+    group_id = _add_group(db)
+    db.add(Photo(id=str(uuid.uuid4()), photo_group_id=group_id, image_url="/uploads/a.jpg",
+                 storage_type="oss", storage_path="gallery/a.jpg"))
+    db.commit()
+
+    response = api_client(gallery.router).get(f"/api/gallery/groups/{group_id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == group_id
+    assert [photo["image_url"] for photo in body["photos"]] == ["/uploads/a.jpg"]
+
+
+def test_group_detail_missing_returns_404(api_client):
+    assert api_client(gallery.router).get("/api/gallery/groups/nope").status_code == 404
+
+
+def test_group_count_is_not_shadowed_by_detail_route(db, api_client):
+    _add_group(db)
+    _add_group(db)
+    _add_group(db, is_published=False)
+
+    response = api_client(gallery.router).get("/api/gallery/groups/count")
+    assert response.status_code == 200
+    assert response.json() == {"count": 2}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""歌词语料抽样：成员判断使用预先构建的集合"""
+from app.services.game_service import LyricCorpus, LyricSong, LyricsGuesser, _sample_distinct
+
+
+class _NoScanTuple(tuple):
+    def __contains__(self, item):
+        raise AssertionError("不应线性扫描抽样池")
+
+
+def _corpus():
+    return LyricCorpus([
+        LyricSong(str(i), f"歌{i}", f"专辑{i % 3}", "第一行 歌词\n第二行 歌词")
+        for i in range(6)
+    ])
+
+
+def test_sample_distinct_uses_member_set():
+    pool = _NoScanTuple(("a", "b", "c", "d"))
+
+    picked = _sample_distinct(pool, frozenset(pool), "a", 3)
+
+    assert sorted(picked) == ["b", "c", "d"]
+
+
+def test_sample_distinct_caps_at_available():
+    pool = ("a", "b")
+    assert sorted(_sample_distinct(pool, frozenset(pool), "z", 5)) == ["a", "b"]
+    assert _sample_distinct(pool, frozenset(pool), "a", 5) == ["b"]
+
+
+def test_corpus_member_sets_match_pools():
+    corpus = _corpus()
+
+    assert corpus.title_set == set(corpus.titles)
+    assert corpus.album_set == {"专辑0", "专辑1", "专辑2"}
+    assert corpus.vocabulary_set == set(corpus.vocabulary)
+
+
+def test_lyrics_guesser_options_are_distinct():
+    question = LyricsGuesser(_corpus()).generate_question()
+
+    assert len(set(question["options"])) == 4
+    assert question["correct_answer"] in question["options"]
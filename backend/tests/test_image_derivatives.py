@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""按需缩放图片：ETag 在读取衍生图之前确定，源图删除时清理衍生图"""
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.routers import images
+from app.services import image_derivatives
+from app.services.image_derivatives import DiskLRUCache, ImageDerivativeService
+from app.services.storage_service import LocalStorage
+
+SOURCE_KEY = "gallery/2024/01/01/a.jpg"
+
+
+class _CountingStorage(LocalStorage):
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self.reads = []
+
+    def read_bytes(self, file_path):
+        self.reads.append(file_path)
+        return super().read_bytes(file_path)
+
+
+def _jpeg(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = _CountingStorage(str(tmp_path / "storage"))
+    storage.upload_bytes(_jpeg("red"), SOURCE_KEY)
+    return storage
+
+
+@pytest.fixture
+def service(tmp_path, storage, monkeypatch):
+    service = ImageDerivativeService(
+        storage,
+        DiskLRUCache(str(tmp_path / "cache"), 10 * 1024 * 1024),
+        widths=(32,),
+    )
+    monkeypatch.setattr(image_derivatives, "_service", service)
+    return service
+
+
+def _overwrite_source(storage, color):
+    storage.upload_bytes(_jpeg(color), SOURCE_KEY)
+    path = os.path.join(storage.base_path, SOURCE_KEY)
+    stat = os.stat(path)
+    # 保证修改时间晚于已生成的衍生图
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+
+
+def test_if_none_match_returns_304_without_loading(api_client, storage, service, monkeypatch):
+    client = api_client(images.router)
+    first = client.get(f"/img/{SOURCE_KEY}?w=32")
+    assert first.status_code == 200
+    assert Image.open(io.BytesIO(first.content)).size == (32, 24)
+
+    storage.reads.clear()
+    cache_reads = []
+    monkeypatch.setattr(service.cache, "get", cache_reads.append)
+    second = client.get(f"/img/{SOURCE_KEY}?w=32", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    assert storage.reads == []
+    assert cache_reads == []
+
+
+def test_overwritten_source_changes_etag_and_content(api_client, storage, service):
+    client = api_client(images.router)
+    first = client.get(f"/img/{SOURCE_KEY}?w=32")
+
+    _overwrite_source(storage, "blue")
+    service.sources.invalidate(SOURCE_KEY)
+    second = client.get(f"/img/{SOURCE_KEY}?w=32", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    red, green, blue = Image.open(io.BytesIO(second.content)).convert("RGB").getpixel((16, 12))
+    assert blue > red
+
+
+def test_purge_removes_stored_and_cached_derivatives(api_client, storage, service):
+    client = api_client(images.router)
+    assert client.get(f"/img/{SOURCE_KEY}?w=32&fmt=jpeg").status_code == 200
+    assert client.get(f"/img/{SOURCE_KEY}").status_code == 200
+    assert len(service.cache) == 2
+
+    removed = service.purge(SOURCE_KEY)
+    storage.delete_file(SOURCE_KEY)
+
+    assert removed == 2
+    assert len(service.cache) == 0
+    assert not any(files for _, _, files in os.walk(os.path.join(storage.base_path, "derivatives")))
+    assert client.get(f"/img/{SOURCE_KEY}?w=32").status_code == 404
+
+
+def test_purge_ignores_non_source_keys(service):
+    assert service.purge("avatars/readme.txt") == 0
+    assert service.purge("derivatives/w32/a.jpg.jpeg") == 0
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""标签内容缓存：内容修改、下架、发布、删除后失效"""
+from datetime import datetime
+
+import pytest
+
+from app.models.article import Article
+from app.models.gallery_db import Photo, PhotoGroup
+from app.models.tag_db import ContentTag, Tag, TagCategory
+from app.services.tag_content_resolver import resolve_tag_contents, tag_contents_cache
+
+TAG_NAME = "单曲：存在"
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    tag_contents_cache.clear()
+    yield
+    tag_contents_cache.clear()
+
+
+def _add_tag(db):
+    category = TagCategory(name="单曲")
+    db.add(category)
+    db.flush()
+    tag = Tag(category_id=category.id, value="存在", name=TAG_NAME)
+    db.add(tag)
+    db.flush()
+    return tag
+
+
+def _add_article(db, tag, article_id="a1", is_published=True):
+    db.add(Article(id=article_id, title="原标题", slug=article_id, content="正文", is_published=is_published))
+    db.add(ContentTag(tag_id=tag.id, content_type="article", content_id=article_id))
+    db.commit()
+
+
+def _article_titles(db):
+    return [article["title"] for article in resolve_tag_contents(db, TAG_NAME)["articles"]]
+
+
+def test_article_update_invalidates_cache(db):
+    _add_article(db, _add_tag(db))
+    assert _article_titles(db) == ["原标题"]
+
+    db.get(Article, "a1").title = "新标题"
+    db.commit()
+
+    assert _article_titles(db) == ["新标题"]
+
+
+def test_unpublish_and_delete_invalidate_cache(db):
+    tag = _add_tag(db)
+    _add_article(db, tag, "a1")
+    _add_article(db, tag, "a2")
+    assert sorted(_article_titles(db)) == ["原标题", "原标题"]
+
+    db.get(Article, "a1").is_published = False
+    db.commit()
+    assert len(_article_titles(db)) == 1
+
+    db.get(Article, "a2").is_deleted = True
+    db.commit()
+    assert _article_titles(db) == []
+
+
+def test_publishing_tagged_content_invalidates_cache(db):
+    _add_article(db, _add_tag(db), is_published=False)
+    assert _article_titles(db) == []
+
+    db.get(Article, "a1").is_published = True
+    db.commit()
+
+    assert _article_titles(db) == ["原标题"]
+
+
+def test_photo_changes_invalidate_gallery_count(db):
+    tag = _add_tag(db)
+    db.add(PhotoGroup(id="g1", title="相册", category="其他", date=datetime(2024, 1, 1), is_published=True))
+    db.add(ContentTag(tag_id=tag.id, content_type="gallery", content_id="g1"))
+    db.commit()
+    assert resolve_tag_contents(db, TAG_NAME)["galleries"][0]["photo_count"] == 0
+
+    db.add(Photo(id="p1", photo_group_id="g1", image_url="/1.jpg", storage_path="1.jpg"))
+    db.commit()
+
+    assert resolve_tag_contents(db, TAG_NAME)["galleries"][0]["photo_count"] == 1
+
+
+def test_rolled_back_and_untagged_changes_keep_cache(db):
+    tag = _add_tag(db)
+    _add_article(db, tag)
+    db.add(Article(id="other", title="无标签", slug="other", content="正文", is_published=True))
+    db.commit()
+    _article_titles(db)
+
+    db.get(Article, "a1").title = "未提交"
+    db.flush()
+    db.rollback()
+    db.get(Article, "other").title = "改名"
+    db.commit()
+
+    assert len(tag_contents_cache) == 1
+
+
+def test_cache_fill_and_invalidation_stay_bounded(db, count_queries):
+    tag = _add_tag(db)
+    for i in range(5):
+        _add_article(db, tag, f"a{i}")
+
+    with count_queries() as fill:
+        assert len(_article_titles(db)) == 5
+    # 标签一次，文章 / 视频 / 相册 / 行程各一次（无相册时不统计照片数）
+    assert len(fill) == 5
+
+    article = db.get(Article, "a0")
+    article.title = "新标题"
+    with count_queries() as commit:
+        db.commit()
+    assert sum(1 for sql in commit if "content_tags" in sql) == 1
+    assert len(tag_contents_cache) == 0
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""TagService.batch_set_content_tags：查询条数不随标签数量增加"""
+from app.models.tag_db import ContentTag, Tag, TagCategory
+from app.services.tag_service import TagService
+
+
+def _add_tags(db, count):
+    category = TagCategory(name="单曲")
+    db.add(category)
+    db.flush()
+    tags = [Tag(category_id=category.id, value=f"歌{i}", name=f"单曲：歌{i}") for i in range(count)]
+    db.add_all(tags)
+    db.commit()
+    return [tag.id for tag in tags]
+
+
+def _set_and_serialize(session_factory, count_queries, items):
+    session = session_factory()
+    try:
+        with count_queries() as statements:
+            results = TagService(session).batch_set_content_tags(items)
+            serialized = [[tag.to_dict() for tag in tags] for tags in results]
+        return serialized, statements
+    finally:
+        session.close()
+
+
+def test_batch_set_content_tags_query_count_is_constant(db, session_factory, count_queries):
+    tag_ids = _add_tags(db, 5)
+
+    _, one_tag = _set_and_serialize(session_factory, count_queries, [("article", "a1", tag_ids[:1])])
+    serialized, five_tags = _set_and_serialize(session_factory, count_queries, [("article", "a2", tag_ids)])
+
+    assert len(five_tags) == len(one_tag)
+    # 标签一次、现有关联一次，写入后不再重新加载标签
+    assert sum(1 for statement in five_tags if statement.lstrip().upper().startswith("SELECT")) == 2
+    assert [tag["name"] for tag in serialized[0]] == sorted(f"单曲：歌{i}" for i in range(5))
+    assert all(tag["category_name"] == "单曲" for tag in serialized[0])
+
+
+def test_batch_set_content_tags_replaces_associations(db, session_factory, count_queries):
+    tag_ids = _add_tags(db, 3)
+    _set_and_serialize(session_factory, count_queries, [("video", "v1", tag_ids[:2])])
+    serialized, _ = _set_and_serialize(session_factory, count_queries, [("video", "v1", tag_ids[1:])])
+
+    stored = {row.tag_id for row in db.query(ContentTag).filter(ContentTag.content_id == "v1")}
+    assert stored == set(tag_ids[1:])
+    assert [tag["id"] for tag in serialized[0]] == tag_ids[1:]
@@ -29,6 +29,10 @@ interface UploadedImage {
     original: string;
     medium: string;
     thumb: string;
+    thumbWebp?: string | null;
+    mediumWebp?: string | null;
+    thumbAvif?: string | null;
+    mediumAvif?: string | null;
   };
   error?: string;
 }
@@ -169,7 +173,11 @@ const GalleryUpload = () => {
         uploadedUrls: {
           original: result.file_url,
           medium: result.medium_url,
-          thumb: result.thumb_url
+          thumb: result.thumb_url,
+          thumbWebp: result.thumb_webp_url,
+          mediumWebp: result.medium_webp_url,
+          thumbAvif: result.thumb_avif_url,
+          mediumAvif: result.medium_avif_url
         }
       };
 
@@ -268,6 +276,8 @@ const GalleryUpload = () => {
         description: description || null,
         cover_image_url: firstSuccessImage.uploadedUrls?.original || '',
         cover_image_thumb_url: firstSuccessImage.uploadedUrls?.thumb || '',
+        cover_image_thumb_webp_url: firstSuccessImage.uploadedUrls?.thumbWebp || null,
+        cover_image_thumb_avif_url: firstSuccessImage.uploadedUrls?.thumbAvif || null,
         storage_type: 'oss',
         is_published: false,  // 提交审核时不发布
         review_status: 'pending',  // 待审核状态
@@ -306,6 +316,10 @@ const GalleryUpload = () => {
           image_url: image.uploadedUrls!.original,
           image_medium_url: image.uploadedUrls!.medium,
           image_thumb_url: image.uploadedUrls!.thumb,
+          image_medium_webp_url: image.uploadedUrls!.mediumWebp || null,
+          image_thumb_webp_url: image.uploadedUrls!.thumbWebp || null,
+          image_medium_avif_url: image.uploadedUrls!.mediumAvif || null,
+          image_thumb_avif_url: image.uploadedUrls!.thumbAvif || null,
           file_size: image.file.size,
           mime_type: image.file.type,
           storage_type: 'oss',
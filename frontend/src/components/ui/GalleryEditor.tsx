@@ -62,6 +62,8 @@ interface Photo {
   image_url: string;
   image_thumb_url?: string;
   image_medium_url?: string;
+  image_thumb_webp_url?: string | null;
+  image_thumb_avif_url?: string | null;
   file_size?: number;
   width?: number;
   height?: number;
@@ -84,6 +86,8 @@ interface PhotoGroup {
   description?: string;
   cover_image_url?: string;
   cover_image_thumb_url?: string;
+  cover_image_thumb_webp_url?: string | null;
+  cover_image_thumb_avif_url?: string | null;
   storage_type: string;
   is_published: boolean;
   is_deleted: boolean;
@@ -102,6 +106,10 @@ interface UploadedImage {
     original: string;
     medium: string;
     thumb: string;
+    thumbWebp?: string | null;
+    mediumWebp?: string | null;
+    thumbAvif?: string | null;
+    mediumAvif?: string | null;
   };
   error?: string;
 }
@@ -295,7 +303,11 @@ const GalleryEditor = ({
           uploadedUrls: {
             original: result.file_url,
             medium: result.medium_url,
-            thumb: result.thumb_url
+            thumb: result.thumb_url,
+            thumbWebp: result.thumb_webp_url,
+            mediumWebp: result.medium_webp_url,
+            thumbAvif: result.thumb_avif_url,
+            mediumAvif: result.medium_avif_url
           }
         };
         return arr;
@@ -352,6 +364,8 @@ const GalleryEditor = ({
       });
 
       const coverFromNewImage = newImages.find(img => img.uploadedUrls)?.uploadedUrls;
+      // 替代格式与所选封面缩略图保持一致
+      const coverPhoto = existingPhotos[0]?.image_thumb_url ? existingPhotos[0] : undefined;
 
       return {
         title: title.trim(),
@@ -362,6 +376,8 @@ const GalleryEditor = ({
         description: description?.trim() || null,
         cover_image_url: existingPhotos[0]?.image_url || coverFromNewImage?.original || '',
         cover_image_thumb_url: existingPhotos[0]?.image_thumb_url || coverFromNewImage?.thumb || '',
+        cover_image_thumb_webp_url: (coverPhoto ? coverPhoto.image_thumb_webp_url : coverFromNewImage?.thumbWebp) || null,
+        cover_image_thumb_avif_url: (coverPhoto ? coverPhoto.image_thumb_avif_url : coverFromNewImage?.thumbAvif) || null,
         storage_type: 'oss',
         is_published: publish,
         review_status: status,
@@ -448,6 +464,10 @@ const GalleryEditor = ({
             image_url: image.uploadedUrls!.original,
             image_medium_url: image.uploadedUrls!.medium,
             image_thumb_url: image.uploadedUrls!.thumb,
+            image_medium_webp_url: image.uploadedUrls!.mediumWebp || null,
+            image_thumb_webp_url: image.uploadedUrls!.thumbWebp || null,
+            image_medium_avif_url: image.uploadedUrls!.mediumAvif || null,
+            image_thumb_avif_url: image.uploadedUrls!.thumbAvif || null,
             file_size: image.file.size,
             mime_type: image.file.type,
             storage_type: 'oss',
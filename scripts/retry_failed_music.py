@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 
 """
-重新上传单个失败的音乐文件
+重新上传失败的音乐文件（分片并行上传，支持断点续传）
+使用: python3 scripts/retry_failed_music.py [本地路径 OSS路径] ...
+      不带参数时重传默认的失败文件
 """
 
 import os
@@ -21,15 +23,30 @@ except ImportError:
     print("   pip install oss2")
     sys.exit(1)
 
-# 从环境变量读取配置
-ACCESS_KEY_ID = os.getenv('OSS_ACCESS_KEY', '').strip()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from app.services.storage_service import MultipartUploader
+
+# 从环境变量读取配置（与 upload_music_to_oss.py 一致）
+ACCESS_KEY_ID = (os.getenv('OSS_ACCESS_KEY_ID') or os.getenv('OSS_ACCESS_KEY', '')).strip()
 ACCESS_KEY_SECRET = os.getenv('OSS_ACCESS_KEY_SECRET', '').strip()
 BUCKET_NAME = os.getenv('OSS_BUCKET_NAME', '').strip()
 ENDPOINT = os.getenv('OSS_ENDPOINT', '').strip()
 
-# 失败的文件路径
+# 默认的失败文件路径
 FAILED_FILE = Path('frontend/public/music/live/2013-存在超级巡回上海演唱会/27.光明.flac')
 OSS_PATH = 'music/live/2013-存在超级巡回上海演唱会/27.光明.flac'
+# 与 upload_music_to_oss.py 共用断点，可以接着批量上传中断的位置续传
+CHECKPOINT_DIR = Path(__file__).parent / '.upload-checkpoints'
+
+def parse_files(argv):
+    """命令行参数按 (本地路径, OSS 路径) 成对解析"""
+    if not argv:
+        return [(FAILED_FILE, OSS_PATH)]
+    if len(argv) % 2:
+        print("❌ 参数需成对出现: 本地路径 OSS路径")
+        sys.exit(1)
+    return [(Path(argv[i]), argv[i + 1]) for i in range(0, len(argv), 2)]
 
 def main():
     print("=" * 80)
@@ -42,16 +59,18 @@ def main():
         print("❌ OSS 配置不完整")
         sys.exit(1)
 
-    # 验证文件存在
-    if not FAILED_FILE.exists():
-        print(f"❌ 文件不存在: {FAILED_FILE}")
-        sys.exit(1)
+    files = parse_files(sys.argv[1:])
 
-    file_size = FAILED_FILE.stat().st_size / (1024 * 1024)
-    print(f"📄 文件: {FAILED_FILE}")
-    print(f"📊 大小: {file_size:.1f}MB")
+    # 验证文件存在
+    for local_path, oss_path in files:
+        if not local_path.exists():
+            print(f"❌ 文件不存在: {local_path}")
+            sys.exit(1)
+        print(f"📄 文件: {local_path}")
+        print(f"📊 大小: {local_path.stat().st_size / (1024 * 1024):.1f}MB")
+        print(f"📤 OSS 路径: {oss_path}")
+        print()
     print(f"🪣 Bucket: {BUCKET_NAME}")
-    print(f"📤 OSS 路径: {OSS_PATH}")
     print()
 
     # 初始化 OSS 客户端
@@ -68,20 +87,20 @@ def main():
 
     # 上传文件
     print("📤 开始上传...")
-    try:
-        with open(FAILED_FILE, 'rb') as f:
-            bucket.put_object(
-                OSS_PATH,
-                f,
-                headers={'Content-Type': 'audio/flac'}
-            )
-        print("✅ 上传成功!")
-        print()
-        oss_base_url = f"https://{BUCKET_NAME}.{ENDPOINT.replace('oss-', '').replace('.aliyuncs.com', '')}.aliyuncs.com"
-        print(f"🌐 访问地址:")
-        print(f"   {oss_base_url}/{OSS_PATH}")
-    except Exception as e:
-        print(f"❌ 上传失败: {e}")
+    with MultipartUploader(bucket, checkpoint_dir=str(CHECKPOINT_DIR)) as uploader:
+        results = uploader.upload_files((str(local_path), oss_path) for local_path, oss_path in files)
+
+    oss_base_url = f"https://{BUCKET_NAME}.{ENDPOINT.replace('oss-', '').replace('.aliyuncs.com', '')}.aliyuncs.com"
+    failed = False
+    for result in results:
+        if result.status == 'failed':
+            failed = True
+            print(f"❌ 上传失败: {result.key} ({result.error})，重新运行可从断点续传")
+        else:
+            status = "内容未变化，已跳过" if result.status == 'skipped' else "上传成功"
+            print(f"✅ {status}: {oss_base_url}/{result.key}")
+
+    if failed:
         sys.exit(1)
 
 if __name__ == '__main__':
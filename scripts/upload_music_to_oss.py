@@ -3,13 +3,16 @@
 
 """
 阿里云 OSS 音乐上传工具
-功能: 将 frontend/public/music 目录完整上传到 OSS
-使用: python3 scripts/upload_music_to_oss.py
+功能: 将 frontend/public/music 目录增量同步到 OSS
+      根据本地清单和远端列举结果只上传新增或变化的文件，可选删除远端多余的文件
+      大文件分片并行上传，中断后重新运行会断点续传
+使用: python3 scripts/upload_music_to_oss.py --dry-run          # 只输出同步报告
+      python3 scripts/upload_music_to_oss.py [--yes] [--delete-orphans] [--force]
 """
 
+import argparse
 import os
 import sys
-import mimetypes
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -24,6 +27,10 @@ except ImportError:
     print("   pip install oss2")
     sys.exit(1)
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from app.services.storage_sync import DirectorySync
+
 # 从环境变量读取配置
 ACCESS_KEY_ID = os.getenv('OSS_ACCESS_KEY_ID', '').strip()
 ACCESS_KEY_SECRET = os.getenv('OSS_ACCESS_KEY_SECRET', '').strip()
@@ -32,6 +39,10 @@ ENDPOINT = os.getenv('OSS_ENDPOINT', '').strip()
 
 # 音乐目录 (相对于脚本位置)
 MUSIC_DIR = Path(__file__).parent.parent / 'frontend' / 'public' / 'music'
+# 断点文件目录
+CHECKPOINT_DIR = Path(__file__).parent / '.upload-checkpoints'
+# 本地同步清单（文件大小 / 修改时间 / MD5，以及上次同步的对象 ETag）
+MANIFEST_PATH = Path(__file__).parent / '.upload-checkpoints' / 'music-manifest.json'
 
 def validate_config():
     """验证 OSS 配置"""
@@ -57,69 +68,49 @@ def validate_config():
 
     return True
 
-def get_all_music_files():
-    """获取所有音乐文件"""
-    files = []
-    for root, dirs, filenames in os.walk(MUSIC_DIR):
-        for filename in filenames:
-            full_path = Path(root) / filename
-            # 相对于 music 目录的相对路径
-            rel_path = full_path.relative_to(MUSIC_DIR)
-            files.append((full_path, f'music/{rel_path}'))
-    return sorted(files)
-
-def upload_files(bucket, files):
-    """上传文件到 OSS"""
-    total = len(files)
-    success = 0
-    failed = []
-
-    print(f"\n📤 开始上传 {total} 个文件...\n")
-
-    for idx, (local_path, oss_path) in enumerate(files, 1):
-        try:
-            # 转换为 Unix 路径格式 (OSS 要求)
-            oss_path = str(oss_path).replace('\\', '/')
-
-            # 获取文件大小
-            file_size = local_path.stat().st_size
-            file_size_mb = file_size / (1024 * 1024)
-
-            # 获取 MIME 类型
-            mime_type, _ = mimetypes.guess_type(str(local_path))
-            if mime_type is None:
-                # 根据扩展名手动设置
-                ext = local_path.suffix.lower()
-                mime_types_map = {
-                    '.mp3': 'audio/mpeg',
-                    '.flac': 'audio/flac',
-                    '.wav': 'audio/wav',
-                    '.m4a': 'audio/mp4',
-                }
-                mime_type = mime_types_map.get(ext, 'application/octet-stream')
-
-            # 上传
-            with open(local_path, 'rb') as f:
-                bucket.put_object(
-                    oss_path,
-                    f,
-                    headers={'Content-Type': mime_type}
-                )
-
-            success += 1
-            percent = int((idx / total) * 100)
-            print(f"[{percent:3d}%] ✅ {idx:4d}/{total} {oss_path:60s} {file_size_mb:8.1f}MB")
-
-        except Exception as e:
-            failed.append((oss_path, str(e)))
-            print(f"[    ] ❌ {idx:4d}/{total} {oss_path:60s} 错误: {e}")
-
-    return success, failed
+def connect_bucket():
+    """初始化 OSS 客户端并测试连接"""
+    print("\n🔗 连接到 OSS...")
+    try:
+        auth = oss2.Auth(ACCESS_KEY_ID, ACCESS_KEY_SECRET)
+        bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
+        # 测试连接
+        bucket.list_objects(max_keys=1)
+        print("✅ 连接成功\n")
+        return bucket
+    except Exception as e:
+        print(f"❌ 连接失败: {e}")
+        sys.exit(1)
+
+def print_progress(result, finished, total):
+    """单个文件完成时输出进度"""
+    percent = int((finished / total) * 100)
+    size_mb = result.size / (1024 * 1024)
+    if result.status == 'failed':
+        print(f"[    ] ❌ {finished:4d}/{total} {result.key:60s} 错误: {result.error}")
+    elif result.status == 'skipped':
+        print(f"[{percent:3d}%] ⏭️  {finished:4d}/{total} {result.key:60s} {size_mb:8.1f}MB 未变化，跳过")
+    else:
+        resumed = f" (续传 {result.resumed_parts} 片)" if result.resumed_parts else ""
+        print(f"[{percent:3d}%] ✅ {finished:4d}/{total} {result.key:60s} {size_mb:8.1f}MB{resumed}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="将音乐目录增量同步到阿里云 OSS")
+    parser.add_argument("--dry-run", action="store_true", help="只输出同步报告，不上传也不删除")
+    parser.add_argument("--delete-orphans", action="store_true", help="删除远端存在但本地已删除的文件")
+    parser.add_argument("--yes", "-y", action="store_true", help="跳过确认")
+    parser.add_argument("--part-workers", type=int, default=4, help="并行上传的分片数")
+    parser.add_argument("--file-workers", type=int, default=2, help="同时上传的文件数")
+    parser.add_argument("--part-mb", type=int, default=8, help="分片大小（MB）")
+    parser.add_argument("--force", action="store_true", help="不比较内容，全部重新上传")
+    return parser.parse_args()
 
 def main():
     """主程序"""
+    args = parse_args()
+
     print("=" * 80)
-    print("🎵 阿里云 OSS 音乐上传工具 v1.0")
+    print("🎵 阿里云 OSS 音乐上传工具 v2.0")
     print("=" * 80)
     print()
 
@@ -133,50 +124,67 @@ def main():
     print(f"  Endpoint: {ENDPOINT}")
     print(f"  音乐目录: {MUSIC_DIR}")
     print(f"  目录大小: {sum(f.stat().st_size for f in MUSIC_DIR.rglob('*') if f.is_file()) / (1024**3):.2f}GB")
+    print(f"  并发: 分片 x{args.part_workers}，文件 x{args.file_workers}，分片大小 {args.part_mb}MB")
     print()
 
-    # 获取文件列表
-    files = get_all_music_files()
-    if not files:
-        print("❌ 未找到任何音乐文件")
-        sys.exit(1)
-
-    print(f"📊 找到 {len(files)} 个文件")
+    bucket = connect_bucket()
+
+    sync = DirectorySync(
+        bucket,
+        str(MUSIC_DIR),
+        'music',
+        str(MANIFEST_PATH),
+        uploader_options=dict(
+            part_size=args.part_mb * 1024 * 1024,
+            part_workers=args.part_workers,
+            file_workers=args.file_workers,
+            checkpoint_dir=str(CHECKPOINT_DIR),
+        ),
+    )
+
+    # 生成同步计划（只读取远端列表）
+    print("🔍 对比本地清单与 OSS...")
+    plan = sync.plan(force=args.force)
+    print()
+    print(plan.report(delete_orphans=args.delete_orphans))
     print()
 
-    # 确认上传
-    response = input("👉 确认上传到 OSS 吗？(yes/no) [默认: no]: ").strip().lower()
-    if response not in ['yes', 'y']:
-        print("❌ 已取消")
+    if args.dry_run:
+        print("📝 dry-run，未做任何修改")
         sys.exit(0)
 
-    # 初始化 OSS 客户端
-    print("\n🔗 连接到 OSS...")
-    try:
-        auth = oss2.Auth(ACCESS_KEY_ID, ACCESS_KEY_SECRET)
-        bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
-        # 测试连接
-        bucket.list_objects(max_keys=1)
-        print("✅ 连接成功\n")
-    except Exception as e:
-        print(f"❌ 连接失败: {e}")
-        sys.exit(1)
+    if not plan.uploads and not (args.delete_orphans and plan.orphans):
+        print("🎉 已是最新，无需上传")
+        sys.exit(0)
+
+    # 确认上传
+    if not args.yes:
+        response = input("👉 确认按以上计划同步到 OSS 吗？(yes/no) [默认: no]: ").strip().lower()
+        if response not in ['yes', 'y']:
+            print("❌ 已取消")
+            sys.exit(0)
 
     # 上传文件
-    success, failed = upload_files(bucket, files)
+    print(f"\n📤 开始上传 {len(plan.uploads)} 个文件...\n")
+    result = sync.execute(plan, delete_orphans=args.delete_orphans, progress=print_progress)
+    uploaded, failed = result.uploaded, result.failed
+    total = len(plan.uploads) + len(plan.unchanged)
 
     # 显示结果
     print(f"\n" + "=" * 80)
     print("📊 上传结果统计")
     print("=" * 80)
-    print(f"  ✅ 成功: {success}/{len(files)}")
-    print(f"  ❌ 失败: {len(failed)}/{len(files)}")
+    print(f"  ✅ 上传: {len(uploaded)}/{total}")
+    print(f"  ⏭️  未变化: {len(plan.unchanged)}/{total}")
+    print(f"  ❌ 失败: {len(failed)}/{total}")
+    if args.delete_orphans:
+        print(f"  🗑️  删除远端多余: {len(result.deleted)}")
 
     if failed:
-        print(f"\n❌ 失败的文件:")
-        for path, error in failed:
-            print(f"  - {path}")
-            print(f"    错误: {error}")
+        print(f"\n❌ 失败的文件（重新运行即可从断点续传）:")
+        for item in failed:
+            print(f"  - {item.key}")
+            print(f"    错误: {item.error}")
         sys.exit(1)
     else:
         print(f"\n🎉 所有文件上传成功!")
@@ -189,7 +197,7 @@ if __name__ == '__main__':
     try:
         main()
     except KeyboardInterrupt:
-        print("\n\n⚠️  用户中断")
+        print("\n\n⚠️  用户中断（重新运行即可从断点续传）")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ 发生错误: {e}")